@@ -0,0 +1,84 @@
+"""Benchmark for finding the algebraic loops in a system with many connections
+
+Builds a system of 10k simulators in chains of 100 with 100k variable
+connections directed by the causalities of the variables and a signal path
+through a function closing every tenth chain into a loop, then times the
+export of the connection graph and the search for the loops. Run from the
+repository root:
+
+    python -m benchmarks.bench_algebraic_loops
+"""
+import random
+import time
+
+from pyOSPParser.model_description import Causality
+from pyOSPParser.system_configuration import OspConnections, OspVariableConnection, \
+    OspVariableEndpoint, OspSignalConnection, OspSignalEndpoint
+
+NUMBER_SIMULATORS = 10_000
+CHAIN_LENGTH = 100
+NUMBER_CONNECTIONS = 100_000
+
+
+def create_connections() -> OspConnections:
+    variable_connections = []
+    for i in range(NUMBER_CONNECTIONS):
+        source = random.randrange(NUMBER_SIMULATORS)
+        chain_end = (source // CHAIN_LENGTH + 1) * CHAIN_LENGTH
+        if source + 1 == chain_end:
+            continue
+        target = random.randrange(source + 1, chain_end)
+        variable_connections.append(OspVariableConnection(
+            Variable=[
+                OspVariableEndpoint(simulator=f'sim{source}', name=f'y{i}'),
+                OspVariableEndpoint(simulator=f'sim{target}', name=f'u{i}')
+            ]
+        ))
+    signal_connections = []
+    for chain in range(0, NUMBER_SIMULATORS // CHAIN_LENGTH, 10):
+        first = chain * CHAIN_LENGTH
+        last = first + CHAIN_LENGTH - 1
+        function = f'gain{chain}'
+        signal_connections.append(OspSignalConnection(
+            Signal=OspSignalEndpoint(function=function, name='in'),
+            Variable=OspVariableEndpoint(simulator=f'sim{last}', name='y')
+        ))
+        signal_connections.append(OspSignalConnection(
+            Signal=OspSignalEndpoint(function=function, name='out'),
+            Variable=OspVariableEndpoint(simulator=f'sim{first}', name='u')
+        ))
+    return OspConnections(
+        VariableConnection=variable_connections, SignalConnection=signal_connections
+    )
+
+
+def get_causalities(connections: OspConnections):
+    """Returns the causalities of the variables connected, 'y*' outputs and 'u*' inputs"""
+    causalities = {}
+    for connection in connections.VariableConnection:
+        for endpoint in connection.Variable:
+            causalities.setdefault(endpoint.simulator, {})[endpoint.name] = \
+                Causality.output if endpoint.name.startswith('y') else Causality.input
+    return causalities
+
+
+def main():
+    random.seed(0)
+    connections = create_connections()
+    causalities = get_causalities(connections)
+    simulator_names = [f'sim{i}' for i in range(NUMBER_SIMULATORS)]
+    start = time.perf_counter()
+    graph = connections.get_connection_graph(
+        simulator_names=simulator_names, causalities=causalities
+    )
+    elapsed_graph = time.perf_counter() - start
+    start = time.perf_counter()
+    loops = graph.find_algebraic_loops()
+    elapsed_loops = time.perf_counter() - start
+    print(f'{graph.number_nodes} nodes, {graph.number_edges} edges, {len(loops)} loops')
+    print(f'{"Graph:":15s}{elapsed_graph * 1000:10.1f} ms')
+    print(f'{"Loops:":15s}{elapsed_loops * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark for the memory use of the leaf objects of the documents
+
+Measures the memory kept by the endpoints of a system with 100k variable
+connections and 100k signal connections, the initial values of its simulators,
+the variables of a model description with 50k variables and the variables of a
+logging configuration, and the time to create them. Run from the repository
+root:
+
+    python -m benchmarks.bench_leaf_memory
+"""
+import time
+import tracemalloc
+
+from pyOSPParser.logging_configuration import OspVariableForLogging
+from pyOSPParser.model_description import OspVariableType
+from pyOSPParser.system_configuration import OspVariableEndpoint, OspSignalEndpoint, \
+    OspInitialValue
+
+NUMBER_CONNECTIONS = 100_000
+NUMBER_VARIABLES = 50_000
+NUMBER_SIMULATORS = 100
+
+
+def measure(function):
+    """Returns the elapsed time and the memory kept by the result of the function
+
+    The time is measured without tracing the memory allocations that slow it down.
+    """
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = function()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, memory
+
+
+def create_variable_endpoints():
+    return [
+        OspVariableEndpoint(dict_xml={
+            '@simulator': 'simulator %d' % (i % NUMBER_SIMULATORS),
+            '@name': 'variable %d' % (i % NUMBER_VARIABLES)
+        }) for i in range(2 * NUMBER_CONNECTIONS)
+    ]
+
+
+def create_signal_endpoints():
+    return [
+        OspSignalEndpoint(dict_xml={
+            '@function': 'function %d' % (i % NUMBER_SIMULATORS),
+            '@name': 'in[%d]' % (i % 10)
+        }) for i in range(NUMBER_CONNECTIONS)
+    ]
+
+
+def create_initial_values():
+    value_types = [
+        ('Real', 1.0), ('Integer', 1), ('Boolean', True), ('String', 'value')
+    ]
+    return [
+        OspInitialValue(dict_xml={
+            '@variable': 'variable %d' % i,
+            value_types[i % 4][0]: {'@value': value_types[i % 4][1]}
+        }) for i in range(NUMBER_VARIABLES)
+    ]
+
+
+def create_variables():
+    return [
+        OspVariableType(dict_xml={'@ref': 'variable %d' % i, '@unit': 'm/s'})
+        for i in range(NUMBER_VARIABLES)
+    ]
+
+
+def create_variables_for_logging():
+    return [
+        OspVariableForLogging(dict_xml={'@name': 'variable %d' % i})
+        for i in range(NUMBER_VARIABLES)
+    ]
+
+
+def main():
+    for name, function, number_objects in [
+        ('OspVariableEndpoint', create_variable_endpoints, 2 * NUMBER_CONNECTIONS),
+        ('OspSignalEndpoint', create_signal_endpoints, NUMBER_CONNECTIONS),
+        ('OspInitialValue', create_initial_values, NUMBER_VARIABLES),
+        ('OspVariableType', create_variables, NUMBER_VARIABLES),
+        ('OspVariableForLogging', create_variables_for_logging, NUMBER_VARIABLES),
+    ]:
+        elapsed, memory = measure(function)
+        print(f'{name + ":":25s}{number_objects:8d} objects {elapsed * 1000:10.1f} ms '
+              f'{memory / 2 ** 20:10.1f} MiB {memory / number_objects:8.0f} B/object')
+
+
+if __name__ == '__main__':
+    main()
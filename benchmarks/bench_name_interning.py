@@ -0,0 +1,64 @@
+"""Benchmark for the memory use of the names in a system with many connections
+
+Builds the connections of a system with 100k variable connections from the
+dictionary of the XML document, with and without interning the names of the
+simulators and the variables in the endpoints. The dictionary is created from
+JSON so that every name is a separate string as from the XML decoder. Run from
+the repository root:
+
+    python -m benchmarks.bench_name_interning
+"""
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from pyOSPParser.system_configuration import OspConnections, OspVariableEndpoint
+
+NUMBER_CONNECTIONS = 100_000
+NUMBER_SIMULATORS = 100
+NUMBER_VARIABLES = 50
+
+
+def create_connections_json(number_connections: int) -> str:
+    def create_endpoint():
+        return {
+            '@simulator': 'simulator_%d' % random.randrange(NUMBER_SIMULATORS),
+            '@name': 'variable_%d' % random.randrange(NUMBER_VARIABLES)
+        }
+    return json.dumps({'VariableConnection': [
+        {'Variable': [create_endpoint(), create_endpoint()]} for _ in range(number_connections)
+    ]})
+
+
+def measure(connections_json: str):
+    """Returns the time to build the connections and the memory kept by them"""
+    gc.collect()
+    tracemalloc.start()
+    dict_xml = json.loads(connections_json)
+    start = time.perf_counter()
+    connections = OspConnections(dict_xml=dict_xml)
+    elapsed = time.perf_counter() - start
+    del dict_xml
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del connections
+    return elapsed, memory
+
+
+def main():
+    random.seed(0)
+    connections_json = create_connections_json(NUMBER_CONNECTIONS)
+    print(f'{NUMBER_CONNECTIONS} variable connections')
+    name_keys = OspVariableEndpoint._name_keys
+    for label, keys in [('not interned', []), ('interned', name_keys)]:
+        OspVariableEndpoint._name_keys = keys
+        elapsed, memory = measure(connections_json)
+        print(f'{label + ":":15s}{elapsed * 1000:10.1f} ms {memory / 2 ** 20:10.1f} MiB')
+    OspVariableEndpoint._name_keys = name_keys
+
+
+if __name__ == '__main__':
+    main()
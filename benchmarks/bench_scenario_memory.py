@@ -0,0 +1,108 @@
+"""Benchmark for the memory use and construction time of scenario events
+
+Compares OSPEvent, whose attributes are stored in slots, with an equivalent
+event class that stores its attributes in an instance dictionary and validates
+the action against a list, and measures loading a scenario with the interned
+model and variable names. Run from the repository root:
+
+    python -m benchmarks.bench_scenario_memory
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from pyOSPParser.scenario import OSPScenario, OSPEvent, EventAction
+
+NUMBER_EVENTS = 1_000_000
+NUMBER_VARIABLES = 100
+
+
+class DictEvent:
+    """Event with an instance dictionary as OSPEvent used to be"""
+    OVERRIDE = 1
+    BIAS = 2
+    RESET = 3
+
+    def __init__(self, time: float, model: str, variable: str, action: int, value: float):
+        self.time = time
+        self.model = model
+        self.variable = variable
+        self.action = action
+        self.value = value
+
+    @property
+    def action(self):
+        return self._action
+
+    @action.setter
+    def action(self, value):
+        if value in [self.OVERRIDE, self.BIAS, self.RESET]:
+            self._action = value
+        else:
+            raise TypeError('The action should be either "OSPEvent.OVERRIDE", '
+                            '"OSPEvent.BIAS" or "OSPEvent.RESET"')
+
+
+def create_event_args(number_events: int):
+    actions = [action.value for action in EventAction]
+    return [(
+        random.random() * 1000,
+        'model %d' % (i % NUMBER_VARIABLES),
+        'variable %d' % (i % NUMBER_VARIABLES),
+        random.choice(actions),
+        random.random()
+    ) for i in range(number_events)]
+
+
+def create_events(event_class, event_args):
+    return [event_class(*args) for args in event_args]
+
+
+def measure(function, *args):
+    """Returns the elapsed time and the memory kept by the result of function(*args)
+
+    The time is measured without tracing the memory allocations that slow it down.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = function(*args)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, memory
+
+
+def main():
+    random.seed(0)
+    event_args = create_event_args(NUMBER_EVENTS)
+    print(f'{NUMBER_EVENTS} events')
+    for event_class in [DictEvent, OSPEvent]:
+        elapsed, memory = measure(create_events, event_class, event_args)
+        print(f'{event_class.__name__ + ":":20s}{elapsed * 1000:10.1f} ms '
+              f'{memory / 2 ** 20:10.1f} MiB')
+
+    scenario = OSPScenario(name='benchmark', end=1000)
+    scenario.events = create_events(OSPEvent, event_args)
+
+    def load(path: str) -> OSPScenario:
+        loaded = OSPScenario(name='benchmark', end=0)
+        with open(path, 'rt') as file:
+            loaded.load(file)
+        return loaded
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, scenario.get_file_name())
+        with open(path, 'wt') as file:
+            scenario.dump(file, compact=True)
+        del scenario
+        elapsed, memory = measure(load, path)
+    print(f'{"load:":20s}{elapsed * 1000:10.1f} ms {memory / 2 ** 20:10.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark for applying scenario events to a recorded signal
+
+Compares the vectorized OSPScenarioTimeline.apply_to_signal with a loop over
+the events that masks the signal event by event. Run from the repository root:
+
+    python -m benchmarks.bench_scenario_playback
+"""
+import random
+import time
+
+import numpy as np
+
+from pyOSPParser.scenario import OSPScenario, OSPEvent, EventAction
+
+NUMBER_SAMPLES = 10_000_000
+NUMBER_EVENTS = 1000
+END_TIME = 1000.0
+
+
+def create_scenario(number_events: int) -> OSPScenario:
+    scenario = OSPScenario(name='benchmark', end=END_TIME)
+    times = sorted(random.sample(range(1, int(END_TIME * 10)), number_events))
+    for event_time in times:
+        scenario.events.append(OSPEvent(
+            time=event_time / 10,
+            model='model',
+            variable='variable',
+            action=random.choice([action for action in EventAction]).value,
+            value=random.random()
+        ))
+    return scenario
+
+
+def apply_by_event_loop(scenario: OSPScenario, times: np.ndarray, signal: np.ndarray):
+    """Applies the events one by one on the part of the signal until the next event"""
+    result = signal.astype(float)
+    events = sorted(scenario.events, key=lambda event: event.time)
+    for i, event in enumerate(events):
+        end = events[i + 1].time if i + 1 < len(events) else np.inf
+        mask = (times >= event.time) & (times < end)
+        if event.action == EventAction.override.value:
+            result[mask] = event.value
+        elif event.action == EventAction.bias.value:
+            result[mask] += event.value
+    return result
+
+
+def main():
+    random.seed(0)
+    scenario = create_scenario(NUMBER_EVENTS)
+    times = np.linspace(0, END_TIME, NUMBER_SAMPLES)
+    signal = np.sin(times)
+
+    start = time.perf_counter()
+    timeline = scenario.compile()
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = timeline.apply_to_signal('model', 'variable', times, signal)
+    vectorized_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result_ref = apply_by_event_loop(scenario, times, signal)
+    loop_time = time.perf_counter() - start
+
+    assert np.allclose(result, result_ref)
+    print(f'{NUMBER_SAMPLES} samples, {NUMBER_EVENTS} events')
+    print(f'compile:          {compile_time * 1000:10.1f} ms')
+    print(f'apply_to_signal:  {vectorized_time * 1000:10.1f} ms')
+    print(f'loop over events: {loop_time * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark for converting logged samples between units
+
+Converts 10M samples from degC to degF with UnitConverter into a new array and
+in place, and compares them with a conversion of each value in Python on 1M
+samples. Run from the repository root:
+
+    python -m benchmarks.bench_unit_conversion
+"""
+import time
+
+import numpy as np
+
+from pyOSPParser.model_description import OspUnitType
+from pyOSPParser.units import UnitConverter
+
+NUMBER_SAMPLES = 10_000_000
+NUMBER_SAMPLES_PER_VALUE = 1_000_000
+
+
+def main():
+    converter = UnitConverter([OspUnitType(dict_xml={
+        '@name': 'K',
+        'BaseUnit': {'@K': 1, '@factor': 1.0, '@offset': 0.0},
+        'DisplayUnit': [
+            {'@name': 'degC', '@factor': 1.0, '@offset': -273.15},
+            {'@name': 'degF', '@factor': 1.8, '@offset': -459.67},
+        ]
+    })])
+    samples = np.random.default_rng(0).uniform(-40, 40, NUMBER_SAMPLES)
+
+    values = samples[:NUMBER_SAMPLES_PER_VALUE].tolist()
+    start = time.perf_counter()
+    factor, offset = converter.get_conversion('degC', 'degF')
+    [factor * value + offset for value in values]
+    elapsed = (time.perf_counter() - start) * NUMBER_SAMPLES / NUMBER_SAMPLES_PER_VALUE
+    print(f'{NUMBER_SAMPLES} samples')
+    print(f'{"Per value:":15s}{elapsed * 1000:10.1f} ms (extrapolated)')
+
+    start = time.perf_counter()
+    converter.convert(samples, 'degC', 'degF')
+    print(f'{"Array:":15s}{(time.perf_counter() - start) * 1000:10.1f} ms')
+
+    start = time.perf_counter()
+    converter.convert(samples, 'degC', 'degF', out=samples)
+    print(f'{"In place:":15s}{(time.perf_counter() - start) * 1000:10.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,707 @@
+""" Contains caches of parsed documents for co-simulation from Open Simulation Platform
+
+A document parsed from a file is kept in memory together with the signature of the
+file, i.e. the modification time and the size and optionally the hash of its content.
+Loading the file again returns the cached document as long as the signature is the
+same, so the XSD decoding is skipped. An edit of the file on disk changes the signature
+and the file is parsed again. The least recently used documents are evicted when the
+estimated memory use exceeds the budget of the cache.
+
+The parsed documents can also be persisted in a cache directory as pickles keyed by the
+hash of the content of the source file and the version of the library, so that other
+processes skip the XSD decoding for the files that have not changed. The directory is
+inspected and cleared from the command line:
+
+    python -m pyOSPParser.cache info
+    python -m pyOSPParser.cache list
+    python -m pyOSPParser.cache prune --max-size 100
+    python -m pyOSPParser.cache clear
+
+Classes:
+    FileSignature: Signature of a file used to detect the changes in it
+    CacheInfo: Statistics of a cache
+    ParseCache: LRU cache of parsed documents keyed by the path and signature of the files
+    DiskCacheEntry: Document persisted in a cache directory
+    DiskCache: Cache of parsed documents in a directory keyed by the hash of the content
+    ModelDescriptionStore: Store of frozen model descriptions shared by the simulators
+    that use the same FMU
+
+Functions:
+    get_file_signature: Returns the signature of a file
+    get_model_description_path: Returns the path to the model description for a simulator
+    get_size: Returns the estimated memory use of a parsed document
+    load_system_structure: Loads OspSystemStructure using the default cache
+    load_model_description: Loads OspModelDescription using the default cache
+    load_logging_configuration: Loads OspLoggingConfiguration using the default cache
+
+Attributes:
+    default_cache(ParseCache): Cache used by the load functions of the module
+    PATH_TO_DEFAULT_CACHE_DIRECTORY(str): Directory for DiskCache if not given. It is
+    given by the environment variable PYOSPPARSER_CACHE_DIR if it is set.
+
+Example:
+    The documents are copied from the cache by default. The instance in the cache is returned
+    with copy=False, which is faster but is shared and not frozen: it must not be modified by
+    the caller. Use ModelDescriptionStore for model descriptions that are frozen.
+
+        system = load_system_structure('OspSystemStructure.xml')
+        model = load_model_description('chassis_OspModelDescription.xml', copy=False)
+"""
+
+import argparse
+import copy as copy_module
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Union, Tuple, Type, Any, List, Dict, Callable
+
+import xmlschema
+
+from . import __version__
+from .logging_configuration import OspLoggingConfiguration
+from .model_description import OspModelDescription
+from .system_configuration import OspSystemStructure, OspSimulator
+
+Document = Union[OspSystemStructure, OspModelDescription, OspLoggingConfiguration]
+
+PATH_TO_DEFAULT_CACHE_DIRECTORY = os.environ.get(
+    'PYOSPPARSER_CACHE_DIR',
+    os.path.join(
+        os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+        'pyOSPParser'
+    )
+)
+_ENTRY_EXTENSION = '.pickle'
+
+
+class FileSignature(NamedTuple):
+    """Signature of a file
+
+    Attributes:
+        mtime_ns(int): Time of the last modification in nanoseconds
+        size(int): Size of the file in bytes
+        content_hash(str, optional): Hash of the content of the file if requested
+    """
+    mtime_ns: int
+    size: int
+    content_hash: Union[str, None] = None
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache"""
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+    max_size: int
+
+
+def get_content_hash(path: str) -> str:
+    """Returns the SHA-256 hash of the content of a file"""
+    content_hash = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(2 ** 20), b''):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def get_file_signature(path: str, hash_content: bool = False) -> FileSignature:
+    """Returns the signature of a file
+
+    Args:
+        path(str): Path to the file
+        hash_content(bool): Includes the hash of the content if True. It detects the changes
+            that keep the modification time and the size, at the cost of reading the file.
+    """
+    stat = os.stat(path)
+    return FileSignature(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        content_hash=get_content_hash(path) if hash_content else None
+    )
+
+
+def get_size(obj: Any) -> int:
+    """Returns the estimated memory use of an object and the objects it refers to in bytes
+
+    The XML schemas are shared among the documents and are not counted.
+    """
+    size = 0
+    visited = set()
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in visited or isinstance(obj, (type, xmlschema.XMLSchemaBase)):
+            continue
+        visited.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return size
+
+
+def copy_document(document: Document) -> Document:
+    """Returns a deep copy of a document. The XML schema is shared, not copied."""
+    return copy_module.deepcopy(document)
+
+
+class _CacheEntry(NamedTuple):
+    signature: FileSignature
+    document: Document
+    size: int
+
+
+class ParseCache:
+    """LRU cache of the documents parsed from files
+
+    The documents are keyed by the type of the document and the absolute path of the file. The
+    signature of the file is checked on every load and the file is parsed again if it has
+    changed. The cache is safe to use from multiple threads.
+    """
+    max_size: int
+    hash_content: bool
+    disk_cache: Union['DiskCache', None]
+
+    def __init__(
+            self,
+            max_size: int = 256 * 2 ** 20,
+            hash_content: bool = False,
+            disk_cache: 'DiskCache' = None
+    ):
+        """Constructor for ParseCache
+
+        Args:
+            max_size(int): Memory budget of the cache in bytes. Default is 256 MiB.
+            hash_content(bool): Includes the hash of the content of the files in the signature
+                if True. Default is False.
+            disk_cache(DiskCache, optional): Cache directory to load the documents from
+                instead of parsing the files when they are not found in memory
+        """
+        self.max_size = max_size
+        self.hash_content = hash_content
+        self.disk_cache = disk_cache
+        self._entries: 'OrderedDict[Tuple[type, str], _CacheEntry]' = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def load(self, document_type: Type[Document], path: str, copy: bool = True) -> Document:
+        """Returns the document parsed from the file, from the cache if the file has not changed
+
+        Args:
+            document_type: OspSystemStructure, OspModelDescription or OspLoggingConfiguration
+            path(str): Path to the file
+            copy(bool): Returns a copy of the cached document if True. Otherwise, the instance in
+                the cache is returned. It is shared by all the callers and is not frozen, so it
+                must not be modified: a change would be seen by every caller until the file
+                changes. Default is True.
+
+        Returns:
+            The document
+        """
+        key = (document_type, os.path.abspath(path))
+        signature = get_file_signature(path, self.hash_content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                entry = None
+                self._misses += 1
+        if entry is None:
+            entry = self._parse(document_type, key[1], signature)
+        return copy_document(entry.document) if copy else entry.document
+
+    def _parse(self, document_type: Type[Document], path: str, signature: FileSignature):
+        if self.disk_cache is None:
+            document = document_type(xml_source=path)
+        else:
+            document = self.disk_cache.load(document_type, path)
+        entry = _CacheEntry(signature=signature, document=document, size=get_size(document))
+        key = (document_type, path)
+        with self._lock:
+            self._remove(key)
+            if entry.size <= self.max_size:
+                self._entries[key] = entry
+                self._size += entry.size
+                while self._size > self.max_size:
+                    self._remove(next(iter(self._entries)))
+                    self._evictions += 1
+        return entry
+
+    def _remove(self, key: Tuple[type, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def invalidate(self, path: str):
+        """Removes the documents parsed from the file from the cache"""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == path]:
+                self._remove(key)
+
+    def clear(self):
+        """Removes all the documents and resets the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Returns the statistics of the cache"""
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size=self._size,
+                max_size=self.max_size
+            )
+
+
+class DiskCacheEntry(NamedTuple):
+    """Document persisted in a cache directory
+
+    Attributes:
+        path(str): Path to the pickle file
+        document_type(str): Name of the class of the document
+        version(str): Version of the library that parsed the document
+        content_hash(str): SHA-256 hash of the content of the source file
+        size(int): Size of the pickle file in bytes
+        last_used(float): Time when the document was last written or loaded
+    """
+    path: str
+    document_type: str
+    version: str
+    content_hash: str
+    size: int
+    last_used: float
+
+
+class DiskCache:
+    """Cache of the parsed documents in a directory
+
+    A document is stored as a pickle file named by the type of the document, the version of
+    the library and the hash of the content of the source file. The source files with the
+    same content share the entry regardless of their paths, and the entries of other versions
+    of the library are never loaded. When the total size of the files exceeds the size cap,
+    the least recently used entries are removed. The cache can be shared by multiple
+    processes.
+    """
+    directory: str
+    max_size: int
+
+    def __init__(self, directory: str = None, max_size: int = 2 ** 30):
+        """Constructor for DiskCache
+
+        Args:
+            directory(str, optional): Cache directory. PATH_TO_DEFAULT_CACHE_DIRECTORY is used
+                if not given. It is created if it does not exist.
+            max_size(int): Size cap of the cache in bytes. Default is 1 GiB.
+        """
+        self.directory = PATH_TO_DEFAULT_CACHE_DIRECTORY if directory is None else directory
+        self.max_size = max_size
+        self._size = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get_entry_path(self, document_type: Type[Document], content_hash: str) -> str:
+        """Returns the path to the pickle file for the document of the content"""
+        return os.path.join(
+            self.directory,
+            f'{document_type.__name__}-{__version__}-{content_hash}{_ENTRY_EXTENSION}'
+        )
+
+    def load(
+            self, document_type: Type[Document], path: str, content_hash: str = None
+    ) -> Document:
+        """Returns the document parsed from the file, from the cache if the content is found
+
+        Args:
+            document_type: OspSystemStructure, OspModelDescription or OspLoggingConfiguration
+            path(str): Path to the file
+            content_hash(str, optional): Hash of the content of the file if already known
+
+        Returns:
+            The document
+        """
+        if content_hash is None:
+            content_hash = get_content_hash(path)
+        document = self.get(document_type, content_hash)
+        if document is None:
+            document = document_type(xml_source=path)
+            self.put(document_type, content_hash, document)
+        return document
+
+    def get(self, document_type: Type[Document], content_hash: str) -> Union[Document, None]:
+        """Returns the document of the content from the cache or None if it is not found"""
+        document = self._read(self.get_entry_path(document_type, content_hash))
+        with self._lock:
+            if document is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return document
+
+    def put(self, document_type: Type[Document], content_hash: str, document: Document):
+        """Stores the document parsed from a file with the content in the cache"""
+        self._write(self.get_entry_path(document_type, content_hash), document)
+
+    def _read(self, entry_path: str) -> Union[Document, None]:
+        try:
+            with open(entry_path, 'rb') as file:
+                document = pickle.load(file)
+            os.utime(entry_path)
+            return document
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # A corrupted entry or an entry that cannot be unpickled is parsed again.
+            self._remove(entry_path)
+            return None
+
+    def _write(self, entry_path: str, document: Document):
+        os.makedirs(self.directory, exist_ok=True)
+        # Written to a temporary file first so that other processes never read a partial entry
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                pickle.dump(document, file, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            self._remove(temp_path)
+            raise
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            prune = self._size is None or self._size > self.max_size
+        if prune:
+            self.prune()
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def entries(self) -> List[DiskCacheEntry]:
+        """Returns the entries in the cache directory from the least recently used"""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for dir_entry in os.scandir(self.directory):
+            if not dir_entry.name.endswith(_ENTRY_EXTENSION):
+                continue
+            try:
+                stat = dir_entry.stat()
+            except FileNotFoundError:
+                continue
+            # Other files in the directory are skipped
+            parts = dir_entry.name[:-len(_ENTRY_EXTENSION)].split('-', 1)
+            if len(parts) != 2 or '-' not in parts[1]:
+                continue
+            document_type, rest = parts
+            version, content_hash = rest.rsplit('-', 1)
+            entries.append(DiskCacheEntry(
+                path=dir_entry.path,
+                document_type=document_type,
+                version=version,
+                content_hash=content_hash,
+                size=stat.st_size,
+                last_used=stat.st_mtime
+            ))
+        entries.sort(key=lambda entry: entry.last_used)
+        return entries
+
+    def prune(self, max_size: int = None) -> int:
+        """Removes the least recently used entries until the total size is within the cap
+
+        Args:
+            max_size(int, optional): Size cap in bytes. The one of the cache is used if not given.
+
+        Returns:
+            int: Number of the entries removed
+        """
+        max_size = self.max_size if max_size is None else max_size
+        entries = self.entries()
+        size = sum(entry.size for entry in entries)
+        number_removed = 0
+        for entry in entries:
+            if size <= max_size:
+                break
+            if self._remove(entry.path):
+                number_removed += 1
+            size -= entry.size
+        with self._lock:
+            self._size = size
+            self._evictions += number_removed
+        return number_removed
+
+    def clear(self) -> int:
+        """Removes all the entries and returns the number of the entries removed"""
+        return self.prune(max_size=-1)
+
+    def info(self) -> CacheInfo:
+        """Returns the statistics of the cache
+
+        The hits, misses and evictions are counted in the current process.
+        """
+        entries = self.entries()
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(entries),
+                size=sum(entry.size for entry in entries),
+                max_size=self.max_size
+            )
+
+
+def _decode_model_description(path: str) -> OspModelDescription:
+    return OspModelDescription(xml_source=path)
+
+
+def get_model_description_path(simulator: OspSimulator, directory: str) -> str:
+    """Returns the path to the OSP model description for the FMU of a simulator
+
+    The model description is expected next to the FMU and named after it as in the convention of
+    Open Simulation Platform, e.g. 'wheel_OspModelDescription.xml' for 'wheel.fmu'.
+
+    Args:
+        simulator(OspSimulator): Simulator
+        directory(str): Directory that the source of the simulator is relative to, i.e. the
+            directory of the system structure file
+    """
+    fmu_name = os.path.splitext(simulator.source)[0]
+    return os.path.join(
+        directory, simulator.fmu_rel_path, '%s_OspModelDescription.xml' % fmu_name
+    )
+
+
+class ModelDescriptionStore:
+    """Store of frozen model descriptions addressed by the hash of the content of the files
+
+    Each distinct model description is parsed once and frozen, and the instance is shared by all
+    the simulators whose FMU resolves to the file or to another file with the same content. The
+    memory use and the load time therefore depend on the number of the distinct FMUs, not on the
+    number of the simulators. The store is safe to use from multiple threads.
+    """
+    disk_cache: Union[DiskCache, None]
+
+    def __init__(self, disk_cache: DiskCache = None):
+        """Constructor for ModelDescriptionStore
+
+        Args:
+            disk_cache(DiskCache, optional): Cache directory to load the model descriptions from
+                instead of parsing the files
+        """
+        self.disk_cache = disk_cache
+        self._model_descriptions: Dict[str, OspModelDescription] = {}
+        self._content_hashes: Dict[str, Tuple[FileSignature, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._model_descriptions)
+
+    def get_content_hash(self, path: str) -> str:
+        """Returns the hash of the content of the file, reading it only if it has changed"""
+        path = os.path.abspath(path)
+        signature = get_file_signature(path)
+        with self._lock:
+            signature_hash = self._content_hashes.get(path)
+        if signature_hash is not None and signature_hash[0] == signature:
+            return signature_hash[1]
+        content_hash = get_content_hash(path)
+        with self._lock:
+            self._content_hashes[path] = (signature, content_hash)
+        return content_hash
+
+    def load(self, path: str) -> OspModelDescription:
+        """Returns the frozen model description of the file
+
+        Exceptions:
+            FileNotFoundError if the file is not found
+        """
+        content_hash = self.get_content_hash(path)
+        with self._lock:
+            model_description = self._model_descriptions.get(content_hash)
+        if model_description is not None:
+            return model_description
+        if self.disk_cache is None:
+            model_description = OspModelDescription(xml_source=path)
+        else:
+            model_description = self.disk_cache.load(OspModelDescription, path, content_hash)
+        return self._add(content_hash, model_description)
+
+    def _add(self, content_hash: str, model_description: OspModelDescription) \
+            -> OspModelDescription:
+        model_description.freeze()
+        with self._lock:
+            # Another thread may have loaded the same content in the meantime.
+            return self._model_descriptions.setdefault(content_hash, model_description)
+
+    def load_for_system(
+            self,
+            system: OspSystemStructure,
+            directory: str,
+            get_path: Callable[[OspSimulator, str], str] = get_model_description_path,
+            max_workers: int = None
+    ) -> Dict[str, OspModelDescription]:
+        """Returns the frozen model descriptions for the simulators of a system
+
+        Each distinct content is loaded once. The files that are neither in the store nor in the
+        disk cache are decoded in a pool of processes, since the XSD decoding is bound by the
+        CPU. The results are frozen and added to the store in the current process. The
+        simulators without a model description file are omitted.
+
+        Args:
+            system(OspSystemStructure): System
+            directory(str): Directory of the system structure file that the sources of the
+                simulators are relative to
+            get_path(Callable, optional): Function that returns the path to the model description
+                for a simulator and the directory. Default is get_model_description_path.
+            max_workers(int, optional): Maximum number of processes. The number of CPUs is used
+                if not given. The files are decoded in the current process if it is 1.
+
+        Returns:
+            Dict[str, OspModelDescription]: Model descriptions by the names of the simulators
+        """
+        paths = {
+            simulator.name: os.path.abspath(get_path(simulator, directory))
+            for simulator in system.Simulators or []
+        }
+        content_hashes = {
+            path: self.get_content_hash(path) for path in dict.fromkeys(paths.values())
+            if os.path.isfile(path)
+        }
+        model_descriptions = {}
+        paths_to_decode = {}
+        for path, content_hash in content_hashes.items():
+            if content_hash in model_descriptions or content_hash in paths_to_decode:
+                continue
+            with self._lock:
+                model_description = self._model_descriptions.get(content_hash)
+            if model_description is None and self.disk_cache is not None:
+                model_description = self.disk_cache.get(OspModelDescription, content_hash)
+            if model_description is None:
+                paths_to_decode[content_hash] = path
+            else:
+                model_descriptions[content_hash] = self._add(content_hash, model_description)
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers <= 1 or len(paths_to_decode) <= 1:
+            decoded = map(_decode_model_description, paths_to_decode.values())
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=min(max_workers, len(paths_to_decode))
+            ) as executor:
+                decoded = list(executor.map(_decode_model_description, paths_to_decode.values()))
+        for content_hash, model_description in zip(paths_to_decode, decoded):
+            if self.disk_cache is not None:
+                self.disk_cache.put(OspModelDescription, content_hash, model_description)
+            model_descriptions[content_hash] = self._add(content_hash, model_description)
+
+        model_descriptions_by_path = {
+            path: model_descriptions[content_hash]
+            for path, content_hash in content_hashes.items()
+        }
+        return {
+            name: model_descriptions_by_path[path] for name, path in paths.items()
+            if path in model_descriptions_by_path
+        }
+
+    def clear(self):
+        """Removes all the model descriptions from the store"""
+        with self._lock:
+            self._model_descriptions.clear()
+            self._content_hashes.clear()
+
+
+default_cache = ParseCache()
+
+
+def load_system_structure(path: str, copy: bool = True) -> OspSystemStructure:
+    """Loads a system structure file using the default cache. See ParseCache.load"""
+    return default_cache.load(OspSystemStructure, path, copy=copy)
+
+
+def load_model_description(path: str, copy: bool = True) -> OspModelDescription:
+    """Loads a model description file using the default cache. See ParseCache.load"""
+    return default_cache.load(OspModelDescription, path, copy=copy)
+
+
+def load_logging_configuration(path: str, copy: bool = True) -> OspLoggingConfiguration:
+    """Loads a logging configuration file using the default cache. See ParseCache.load"""
+    return default_cache.load(OspLoggingConfiguration, path, copy=copy)
+
+
+def main(argv: List[str] = None):
+    """Command line interface to inspect and clear a cache directory"""
+    parser = argparse.ArgumentParser(
+        prog='python -m pyOSPParser.cache',
+        description='Inspects and clears the cache of parsed documents of pyOSPParser.'
+    )
+    parser.add_argument(
+        '--directory', default=PATH_TO_DEFAULT_CACHE_DIRECTORY,
+        help='Cache directory. Default is %(default)s'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('info', help='Shows the number of the entries and the total size')
+    subparsers.add_parser('list', help='Lists the entries from the least recently used')
+    prune_parser = subparsers.add_parser(
+        'prune', help='Removes the least recently used entries down to the size cap'
+    )
+    prune_parser.add_argument('--max-size', type=float, required=True, help='Size cap in MiB')
+    subparsers.add_parser('clear', help='Removes all the entries')
+    args = parser.parse_args(argv)
+
+    disk_cache = DiskCache(directory=args.directory)
+    if args.command == 'info':
+        info = disk_cache.info()
+        print(f'Directory: {disk_cache.directory}')
+        print(f'Entries:   {info.entries}')
+        print(f'Size:      {info.size / 2 ** 20:.2f} MiB')
+    elif args.command == 'list':
+        for entry in disk_cache.entries():
+            last_used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.last_used))
+            print(f'{last_used}  {entry.size:>10d}  {entry.version:<8s}  '
+                  f'{entry.document_type:<24s}  {entry.content_hash}')
+    elif args.command == 'prune':
+        number_removed = disk_cache.prune(max_size=int(args.max_size * 2 ** 20))
+        print(f'Removed {number_removed} entries')
+    elif args.command == 'clear':
+        print(f'Removed {disk_cache.clear()} entries')
+
+
+if __name__ == '__main__':
+    main()
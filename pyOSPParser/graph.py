@@ -0,0 +1,1067 @@
+""" Contains classes for the connection graph of a system for co-simulation
+from Open Simulation Platform
+
+The simulators and the functions of a system are the nodes of the graph and the
+connections are the edges. The graph is stored in the compressed sparse
+row (CSR) format as NumPy arrays: the edges from the node i are found at
+indptr[i]:indptr[i + 1] of 'indices' and of the arrays of the edge attributes.
+
+The direction of an edge is given as follows:
+    - Variable connections: from the output to the input. The order of the endpoints in a
+      connection does not matter. The direction is taken from the causalities of the
+      variables, see get_connection_directions. Only one of the two causalities is needed
+      if it is an input or an output.
+    - Variable group connections: the variables of the groups are paired in order and each
+      pair is directed as a variable connection. A group connection that carries variables in
+      both directions, e.g. a power bond of a force and a velocity, gives an edge in each
+      direction.
+    - Signal and signal group connections: from the function to the simulator if the
+      signal is an output of the function, i.e. its name starts with 'out', and from the
+      simulator to the function otherwise.
+
+The direction of a variable (group) connection is unknown if the causalities are not given
+or contradict each other, e.g. two outputs. Such a connection is kept in the graph as an
+undirected edge, stored from the first endpoint to the second, so that the connectivity of
+the system is complete. The undirected edges are not followed for the loops and the stepping
+order. No direction is guessed.
+
+A loop is a strongly connected component of the directed edges with more than one node or
+a node connected to itself. Whether a loop is algebraic depends on the feedthrough of the
+simulators, i.e. whether their outputs depend directly on their inputs, which is not known
+from the system structure or the OSP model descriptions. A simulator known to have no
+feedthrough breaks the loops through it. The loops with a simulator of unknown feedthrough
+are reported as potential algebraic loops. The functions always feed through.
+
+The stepping plan of a system orders the strongly connected components of the
+directed edges topologically. A simulator is placed in the stage after the last
+stage of the simulators it depends on, directly or through functions, so that the
+simulators in the same stage can be stepped concurrently. The simulators in a
+loop are placed in the same stage as a group to be stepped together. The plan
+does not depend on the order of the endpoints in the connections, and the
+connections of unknown direction do not make dependencies.
+
+A system is split into independent sub-systems by the weakly connected
+components of the graph, i.e. the simulators and the functions that are
+connected to each other regardless of the direction of the connections.
+
+Classes:
+    NodeKind: Enumerator for the kind of a node
+    OspGraphEdge: An edge of the graph given by names
+    AlgebraicLoop: Nodes and edges of a cycle in the graph
+    OspConnectionGraph: Connection graph of a system in the CSR format
+    OspSteppingPlan: Order and stages for stepping the simulators of a system
+    OspSystemIndex: Adjacency index of a system by the names
+
+Functions:
+    is_function_output: Returns True if a signal is an output of a function
+    get_member_causalities: Returns the causality of the variables in each variable group
+    get_connection_directions: Returns the direction of the variable (group) connections
+    get_stepping_plan: Returns the stepping plan of a system
+    split_system: Returns the independent sub-systems of a system
+    get_subsystem: Returns a system with the simulators selected and their neighbors
+    write_systems: Writes the XML documents of systems concurrently
+
+Example:
+    The graph can be passed to scipy.sparse for analysis.
+
+        graph = system.get_connection_graph()
+        matrix = scipy.sparse.csr_matrix(
+            (np.ones(graph.number_edges), graph.indices, graph.indptr),
+            shape=(graph.number_nodes, graph.number_nodes)
+        )
+
+    The algebraic loops are found from the graph directed by the causalities.
+
+        graph = system.get_connection_graph(causalities, model_descriptions)
+        for loop in graph.find_algebraic_loops(feedthrough={'chassis': False}):
+            print(loop.simulators, loop.functions, loop.potential)
+
+    The stepping plan can be saved as JSON for a master algorithm.
+
+        json.dumps(get_stepping_plan(system).to_dict())
+"""
+
+import copy
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from functools import reduce
+from typing import List, Dict, Tuple, Iterable, Union, Any, NamedTuple
+
+import numpy as np
+
+from .model_description import OspModelDescription, Causality, get_variables_in_group, \
+    get_variable_groups_in_group
+from .system_configuration import OspConnections, InterfaceType, OspSystemStructure, \
+    OspFunctions, FunctionType
+
+#: Interface types in the order of the codes used in OspConnectionGraph.edge_kinds
+INTERFACE_TYPES = list(InterfaceType)
+
+
+class NodeKind(Enum):
+    simulator = 0
+    function = 1
+
+
+class OspGraphEdge(NamedTuple):
+    """An edge of the graph given by the names of the nodes and the endpoints"""
+    source: str
+    source_endpoint: str
+    target: str
+    target_endpoint: str
+    interface_type: InterfaceType
+
+
+class AlgebraicLoop(NamedTuple):
+    """Nodes and edges of a strongly connected component that forms a cycle
+
+    Attributes:
+        simulators(List[str]): Names of the simulators in the loop in the order of the node ids
+        functions(List[str]): Names of the functions in the loop in the order of the node ids
+        edges(List[OspGraphEdge]): Connections between the nodes in the loop
+        potential(bool): True if the feedthrough of any simulator in the loop is not known, so
+            that the loop may not be algebraic
+    """
+    simulators: List[str]
+    functions: List[str]
+    edges: List[OspGraphEdge]
+    potential: bool = True
+
+
+#: Direction of a connection as (from the first endpoint to the second, from the second to the
+#: first). It is (False, False) if the direction is unknown.
+Direction = Tuple[bool, bool]
+
+UNKNOWN_DIRECTION: Direction = (False, False)
+
+
+def is_function_output(signal_name: str) -> bool:
+    """Returns True if the signal is an output of a function, e.g. 'out' or 'out[0]'"""
+    return signal_name.startswith('out')
+
+
+def get_member_causalities(
+        model_description: OspModelDescription,
+        causalities: Dict[str, Causality]
+) -> Dict[str, Tuple[Causality, ...]]:
+    """Returns the causality of the variables in each variable group by the name of the group
+
+    The causality of a variable not found in the causalities given is None.
+    """
+    return {
+        var_group.name: tuple(
+            causalities.get(variable.ref) for variable in get_variables_in_group(var_group)
+        )
+        for var_group in get_variable_groups_in_group(model_description.VariableGroups)
+    }
+
+
+def _get_variable_direction(
+        causality1: Causality, causality2: Causality,
+        output: Causality = Causality.output, input_: Causality = Causality.input
+) -> Direction:
+    forward = causality1 is output or causality2 is input_
+    backward = causality1 is input_ or causality2 is output
+    if forward and backward:
+        return UNKNOWN_DIRECTION
+    return forward, backward
+
+
+def get_connection_directions(
+        connections: Union[OspConnections, None],
+        causalities: Dict[str, Dict[str, Causality]] = None,
+        model_descriptions: Dict[str, OspModelDescription] = None
+) -> Dict[InterfaceType, List[Direction]]:
+    """Returns the direction of the variable and the variable group connections
+
+    A variable connection goes from the output to the input. It is enough that one of the
+    variables is known to be an input or an output as long as the other does not contradict it.
+    The variables of the groups of a variable group connection are paired in order and the
+    connection has the directions of all the pairs. Its direction is unknown if the groups are
+    not found in the model descriptions, have different numbers of variables or any pair has
+    an unknown direction. The variables of a group are found once for each distinct model
+    description.
+
+    Args:
+        connections(OspConnections): Connections of a system
+        causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables for
+            the simulators given by the simulator names and the variable names
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names, used for the variable group connections
+
+    Returns:
+        Dict[InterfaceType, List[Direction]]: Directions of the connections in their order in
+            the lists for InterfaceType.Variable and InterfaceType.VariableGroup
+    """
+    causalities = causalities or {}
+    member_causalities_by_model_description = {}
+    member_causalities = {}
+    for simulator_name, model_description in (model_descriptions or {}).items():
+        key = (id(model_description), id(causalities.get(simulator_name)))
+        if key not in member_causalities_by_model_description:
+            member_causalities_by_model_description[key] = get_member_causalities(
+                model_description, causalities.get(simulator_name, {})
+            )
+        member_causalities[simulator_name] = member_causalities_by_model_description[key]
+
+    directions = {InterfaceType.Variable: [], InterfaceType.VariableGroup: []}
+    if connections is None:
+        return directions
+    no_causalities = {}
+    variable_directions = directions[InterfaceType.Variable]
+    for connection in connections.VariableConnection or []:
+        endpoint1, endpoint2 = connection.Variable
+        variable_directions.append(_get_variable_direction(
+            causalities.get(endpoint1.simulator, no_causalities).get(endpoint1.name),
+            causalities.get(endpoint2.simulator, no_causalities).get(endpoint2.name)
+        ))
+    for connection in connections.VariableGroupConnection or []:
+        endpoint1, endpoint2 = connection.VariableGroup
+        group_causalities1 = member_causalities.get(endpoint1.simulator, {}).get(endpoint1.name)
+        group_causalities2 = member_causalities.get(endpoint2.simulator, {}).get(endpoint2.name)
+        direction = UNKNOWN_DIRECTION
+        if group_causalities1 and group_causalities2 and \
+                len(group_causalities1) == len(group_causalities2):
+            pair_directions = [
+                _get_variable_direction(causality1, causality2)
+                for causality1, causality2 in zip(group_causalities1, group_causalities2)
+            ]
+            if UNKNOWN_DIRECTION not in pair_directions:
+                direction = (
+                    any(forward for forward, _ in pair_directions),
+                    any(backward for _, backward in pair_directions)
+                )
+        directions[InterfaceType.VariableGroup].append(direction)
+    return directions
+
+
+class OspConnectionGraph:
+    """Connection graph of a system in the compressed sparse row (CSR) format
+
+    The node ids are stable for the same system: the simulators come first in the order they are
+    given, the functions next and then the names that are referred to by the connections without
+    being given, in the order they are first referred to.
+
+    The variable (group) connections are directed by the causalities given. See the module
+    documentation for the direction of the edges and the undirected edges.
+
+    Attributes:
+        node_names(np.ndarray): Names of the nodes by the node ids
+        node_kinds(np.ndarray): NodeKind values of the nodes by the node ids
+        indptr(np.ndarray): Index of the first edge from each node and the number of edges at the
+            end
+        indices(np.ndarray): Target node of the edges
+        edge_kinds(np.ndarray): Index of the InterfaceType in INTERFACE_TYPES for the edges
+        source_endpoints(np.ndarray): Name of the variable or signal at the source of the edges
+        target_endpoints(np.ndarray): Name of the variable or signal at the target of the edges
+        connection_indices(np.ndarray): Index of the connection of the edges in the list of the
+            connections of its kind in OspConnections. A variable group connection in both
+            directions has two edges.
+        is_directed(np.ndarray): False for the edges of the connections whose direction is
+            unknown
+    """
+    node_names: np.ndarray
+    node_kinds: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    edge_kinds: np.ndarray
+    source_endpoints: np.ndarray
+    target_endpoints: np.ndarray
+    connection_indices: np.ndarray
+    is_directed: np.ndarray
+
+    def __init__(
+            self,
+            connections: Union[OspConnections, None],
+            simulator_names: Iterable[str] = (),
+            function_names: Iterable[str] = (),
+            causalities: Dict[str, Dict[str, Causality]] = None,
+            model_descriptions: Dict[str, OspModelDescription] = None
+    ):
+        """Constructor for OspConnectionGraph
+
+        Args:
+            connections(OspConnections): Connections of the system
+            simulator_names(Iterable[str], optional): Names of the simulators of the system
+            function_names(Iterable[str], optional): Names of the functions of the system
+            causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables
+                for the simulators given by the simulator names and the variable names
+            model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions
+                for the simulators given by the simulator names to direct the variable group
+                connections
+        """
+        self._node_ids: Dict[Tuple[int, str], int] = {}
+        node_names = []
+        node_kinds = []
+
+        def get_node_id(kind: NodeKind, name: str) -> int:
+            key = (kind.value, name)
+            node_id = self._node_ids.get(key)
+            if node_id is None:
+                node_id = self._node_ids[key] = len(node_names)
+                node_names.append(name)
+                node_kinds.append(kind.value)
+            return node_id
+
+        for name in simulator_names:
+            get_node_id(NodeKind.simulator, name)
+        for name in function_names:
+            get_node_id(NodeKind.function, name)
+
+        sources = []
+        targets = []
+        edge_kinds = []
+        source_endpoints = []
+        target_endpoints = []
+        connection_indices = []
+        is_directed = []
+
+        def add_edge(source: int, target: int, kind: InterfaceType, source_endpoint: str,
+                     target_endpoint: str, index: int, directed: bool = True):
+            sources.append(source)
+            targets.append(target)
+            edge_kinds.append(INTERFACE_TYPES.index(kind))
+            source_endpoints.append(source_endpoint)
+            target_endpoints.append(target_endpoint)
+            connection_indices.append(index)
+            is_directed.append(directed)
+
+        simulator = NodeKind.simulator
+        function = NodeKind.function
+        if connections is not None:
+            directions = get_connection_directions(connections, causalities, model_descriptions)
+            for kind, attribute in [
+                (InterfaceType.Variable, 'Variable'),
+                (InterfaceType.VariableGroup, 'VariableGroup')
+            ]:
+                for index, (connection, (forward, backward)) in enumerate(
+                        zip(getattr(connections, kind.value) or [], directions[kind])
+                ):
+                    endpoint1, endpoint2 = getattr(connection, attribute)
+                    node1 = get_node_id(simulator, endpoint1.simulator)
+                    node2 = get_node_id(simulator, endpoint2.simulator)
+                    if forward or not backward:
+                        add_edge(node1, node2, kind, endpoint1.name, endpoint2.name, index,
+                                 directed=forward)
+                    if backward:
+                        add_edge(node2, node1, kind, endpoint2.name, endpoint1.name, index)
+            for kind, signal_attribute, variable_attribute in [
+                (InterfaceType.Signal, 'Signal', 'Variable'),
+                (InterfaceType.SignalGroup, 'SignalGroup', 'VariableGroup')
+            ]:
+                for index, connection in enumerate(getattr(connections, kind.value) or []):
+                    signal = getattr(connection, signal_attribute)
+                    variable = getattr(connection, variable_attribute)
+                    function_id = get_node_id(function, signal.function)
+                    simulator_id = get_node_id(simulator, variable.simulator)
+                    if is_function_output(signal.name):
+                        add_edge(function_id, simulator_id, kind, signal.name, variable.name,
+                                 index)
+                    else:
+                        add_edge(simulator_id, function_id, kind, variable.name, signal.name,
+                                 index)
+
+        self.node_names = np.array(node_names, dtype=object)
+        self.node_kinds = np.array(node_kinds, dtype=np.int8)
+        sources = np.array(sources, dtype=np.int64)
+        order = np.argsort(sources, kind='stable')
+        self.indptr = np.zeros(len(node_names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(node_names)), out=self.indptr[1:])
+        self.indices = np.array(targets, dtype=np.int64)[order]
+        self.edge_kinds = np.array(edge_kinds, dtype=np.int8)[order]
+        self.source_endpoints = np.array(source_endpoints, dtype=object)[order]
+        self.target_endpoints = np.array(target_endpoints, dtype=object)[order]
+        self.connection_indices = np.array(connection_indices, dtype=np.int64)[order]
+        self.is_directed = np.array(is_directed, dtype=bool)[order]
+
+    @property
+    def number_nodes(self) -> int:
+        return len(self.node_names)
+
+    @property
+    def number_edges(self) -> int:
+        return len(self.indices)
+
+    def get_node_id(self, name: str, kind: NodeKind = NodeKind.simulator) -> int:
+        """Returns the id of the node for the name of a simulator or a function
+
+        Exceptions:
+            KeyError if the node is not found
+        """
+        return self._node_ids[(kind.value, name)]
+
+    def get_sources(self) -> np.ndarray:
+        """Returns the source node of the edges"""
+        return np.repeat(np.arange(self.number_nodes, dtype=np.int64), np.diff(self.indptr))
+
+    def get_successors(self, node_id: int) -> np.ndarray:
+        """Returns the target nodes of the edges from the node including the undirected edges"""
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def get_edge_ids(self, node_id: int) -> range:
+        """Returns the ids of the edges from the node, i.e. the indices for the edge arrays"""
+        return range(self.indptr[node_id], self.indptr[node_id + 1])
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """Returns the graph as a dictionary of lists that can be serialized, e.g. to JSON"""
+        return {
+            'node_names': self.node_names.tolist(),
+            'node_kinds': [NodeKind(kind).name for kind in self.node_kinds],
+            'indptr': self.indptr.tolist(),
+            'indices': self.indices.tolist(),
+            'edge_kinds': [INTERFACE_TYPES[kind].value for kind in self.edge_kinds],
+            'source_endpoints': self.source_endpoints.tolist(),
+            'target_endpoints': self.target_endpoints.tolist(),
+            'connection_indices': self.connection_indices.tolist(),
+            'is_directed': self.is_directed.tolist(),
+        }
+
+    def get_edge(self, edge_id: int) -> OspGraphEdge:
+        """Returns the edge by its id given by the names"""
+        return OspGraphEdge(
+            source=self.node_names[np.searchsorted(self.indptr, edge_id, side='right') - 1],
+            source_endpoint=self.source_endpoints[edge_id],
+            target=self.node_names[self.indices[edge_id]],
+            target_endpoint=self.target_endpoints[edge_id],
+            interface_type=INTERFACE_TYPES[self.edge_kinds[edge_id]]
+        )
+
+    def get_strongly_connected_components(self, edge_mask: np.ndarray = None) -> np.ndarray:
+        """Returns the strongly connected component of the nodes
+
+        The components are found by Tarjan's algorithm in O(V+E) without recursion. They are
+        numbered in the reverse topological order, i.e. no edge followed goes from a component
+        to another with a larger number.
+
+        Args:
+            edge_mask(np.ndarray, optional): True for the edges to follow. The directed edges
+                are followed if not given.
+
+        Returns:
+            np.ndarray: Number of the component for each node
+        """
+        number_nodes = self.number_nodes
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        to_follow = (self.is_directed if edge_mask is None else edge_mask).tolist()
+        index = [-1] * number_nodes
+        low = [0] * number_nodes
+        on_stack = [False] * number_nodes
+        components = [-1] * number_nodes
+        stack = []
+        counter = 0
+        number_components = 0
+        for root in range(number_nodes):
+            if index[root] >= 0:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            # Nodes being visited with the next edge to follow
+            work = [[root, indptr[root]]]
+            while work:
+                item = work[-1]
+                node, edge = item
+                if edge < indptr[node + 1]:
+                    item[1] = edge + 1
+                    if not to_follow[edge]:
+                        continue
+                    successor = indices[edge]
+                    if index[successor] < 0:
+                        index[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack[successor] = True
+                        work.append([successor, indptr[successor]])
+                    elif on_stack[successor] and index[successor] < low[node]:
+                        low[node] = index[successor]
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        components[member] = number_components
+                        if member == node:
+                            break
+                    number_components += 1
+        return np.array(components, dtype=np.int64)
+
+    def get_weakly_connected_components(self) -> np.ndarray:
+        """Returns the weakly connected component of the nodes
+
+        The nodes connected by an edge in either direction are in the same component. The
+        components are found by union-find over the edges and numbered in the order of the
+        smallest node id in them.
+
+        Returns:
+            np.ndarray: Number of the component for each node
+        """
+        parents = list(range(self.number_nodes))
+
+        def find_root(node: int) -> int:
+            while parents[node] != node:
+                parents[node] = parents[parents[node]]
+                node = parents[node]
+            return node
+
+        for source, target in zip(self.get_sources().tolist(), self.indices.tolist()):
+            source_root = find_root(source)
+            target_root = find_root(target)
+            # The smallest node id is kept as the root of the component
+            if source_root < target_root:
+                parents[target_root] = source_root
+            elif target_root < source_root:
+                parents[source_root] = target_root
+        roots = np.array([find_root(node) for node in range(self.number_nodes)], dtype=np.int64)
+        return np.unique(roots, return_inverse=True)[1].astype(np.int64)
+
+    def find_algebraic_loops(self, feedthrough: Dict[str, bool] = None) -> List[AlgebraicLoop]:
+        """Returns the potential and the known algebraic loops of the system
+
+        The directed edges are followed except those from the simulators without feedthrough.
+        Every strongly connected component with more than one node or with an edge from a node
+        to itself is then a loop. A loop is potential, i.e. 'potential' is True, if the
+        feedthrough of any simulator in it is not given, and algebraic otherwise. The loops are
+        ordered by the smallest node id in them.
+
+        Args:
+            feedthrough(Dict[str, bool], optional): True for the simulators whose outputs depend
+                directly on their inputs and False for those whose outputs do not, by the names.
+                All the loops with a simulator not found in it are potential.
+
+        Returns:
+            List[AlgebraicLoop]: Loops found. Empty if there is none.
+        """
+        feedthrough = feedthrough or {}
+        is_simulator = self.node_kinds == NodeKind.simulator.value
+        node_feedthrough = [
+            feedthrough.get(name) if simulator else True
+            for name, simulator in zip(self.node_names.tolist(), is_simulator.tolist())
+        ]
+        is_known = np.array([value is not None for value in node_feedthrough], dtype=bool)
+        has_feedthrough = np.array([value is not False for value in node_feedthrough], dtype=bool)
+        sources = self.get_sources()
+        edge_mask = self.is_directed & has_feedthrough[sources]
+        components = self.get_strongly_connected_components(edge_mask)
+        if len(components) == 0:
+            return []
+        source_components = components[sources]
+        is_internal = (source_components == components[self.indices]) & edge_mask
+        number_components = components.max() + 1
+        is_loop = np.bincount(components, minlength=number_components) > 1
+        is_loop[source_components[is_internal & (sources == self.indices)]] = True
+
+        is_potential = np.zeros(number_components, dtype=bool)
+        is_potential[components[~is_known]] = True
+
+        loops = {}
+        for node in np.flatnonzero(is_loop[components]).tolist():
+            component = components[node]
+            if component not in loops:
+                loops[component] = AlgebraicLoop(
+                    simulators=[], functions=[], edges=[],
+                    potential=bool(is_potential[component])
+                )
+            if self.node_kinds[node] == NodeKind.simulator.value:
+                loops[component].simulators.append(self.node_names[node])
+            else:
+                loops[component].functions.append(self.node_names[node])
+        node_names = self.node_names.tolist()
+        for edge in np.flatnonzero(is_internal & is_loop[source_components]).tolist():
+            loops[source_components[edge]].edges.append(OspGraphEdge(
+                source=node_names[sources[edge]],
+                source_endpoint=self.source_endpoints[edge],
+                target=node_names[self.indices[edge]],
+                target_endpoint=self.target_endpoints[edge],
+                interface_type=INTERFACE_TYPES[self.edge_kinds[edge]]
+            ))
+        return list(loops.values())
+
+
+class OspSteppingPlan(NamedTuple):
+    """Order and stages for stepping the simulators of a system
+
+    Attributes:
+        base_step_size(float): Step size of the system. None if neither the system nor any
+            simulator has a step size.
+        order(List[str]): Simulators in a topological order of the dependencies. The simulators
+            in a loop are next to each other.
+        stages(List[List[List[str]]]): Groups of the simulators in each stage. The groups of a
+            stage do not depend on each other and can be stepped concurrently after the previous
+            stages. A group has more than one simulator for a loop.
+        decimation_factors(Dict[str, int]): Number of base steps for a step of each simulator
+    """
+    base_step_size: Union[float, None]
+    order: List[str]
+    stages: List[List[List[str]]]
+    decimation_factors: Dict[str, int]
+
+    @property
+    def hyperperiod(self) -> int:
+        """Number of base steps after which the pattern of the stepping repeats"""
+        return reduce(
+            lambda a, b: a * b // math.gcd(a, b), self.decimation_factors.values(), 1
+        )
+
+    def get_stages(self, step: int) -> List[List[List[str]]]:
+        """Returns the stages with the simulators that step at the base step given
+
+        A simulator steps at the base steps that are multiples of its decimation factor.
+        The stages without any simulator to step are omitted.
+        """
+        stages = []
+        for stage in self.stages:
+            groups = [
+                [name for name in group if step % self.decimation_factors[name] == 0]
+                for group in stage
+            ]
+            groups = [group for group in groups if len(group) > 0]
+            if len(groups) > 0:
+                stages.append(groups)
+        return stages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the plan as a dictionary that can be serialized, e.g. to JSON"""
+        return self._asdict()
+
+
+def get_decimation_factors(
+        system: OspSystemStructure, names: Iterable[str]
+) -> Tuple[Union[float, None], Dict[str, int]]:
+    """Returns the base step size and the number of base steps for a step of the simulators
+
+    The smallest step size of the simulators is used as the base step size if the system does not
+    have one. The simulators without a step size step at every base step.
+
+    Exceptions:
+        ValueError if a step size is not a multiple of the base step size
+    """
+    step_sizes = {
+        simulator.name: float(simulator.stepSize)
+        for simulator in system.Simulators or [] if simulator.stepSize is not None
+    }
+    base_step_size = system.BaseStepSize
+    if base_step_size is None and len(step_sizes) > 0:
+        base_step_size = min(step_sizes.values())
+    decimation_factors = {}
+    for name in names:
+        if name not in step_sizes:
+            decimation_factors[name] = 1
+            continue
+        ratio = step_sizes[name] / float(base_step_size)
+        factor = round(ratio)
+        if factor < 1 or not math.isclose(ratio, factor, rel_tol=1e-9):
+            raise ValueError(
+                f'The step size of "{name}", {step_sizes[name]}, should be a multiple of the '
+                f'base step size, {base_step_size}.'
+            )
+        decimation_factors[name] = factor
+    return base_step_size, decimation_factors
+
+
+def get_stepping_plan(
+        system: OspSystemStructure,
+        causalities: Dict[str, Dict[str, Causality]] = None,
+        model_descriptions: Dict[str, OspModelDescription] = None
+) -> OspSteppingPlan:
+    """Returns the order and the stages for stepping the simulators of a system
+
+    The strongly connected components of the connection graph are visited once in a topological
+    order, which is given by Tarjan's algorithm, so the plan is computed in O(V+E). A component
+    starts at the stage after the last stage of the components it depends on. The functions do
+    not take a stage of their own but pass on the dependencies. The variable (group)
+    connections are directed from the outputs to the inputs by the causalities given, and
+    those of unknown direction are not dependencies.
+
+    Args:
+        system(OspSystemStructure): System to step
+        causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables to
+            direct the variable connections. See OspConnectionGraph.
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions to
+            direct the variable group connections. See OspConnectionGraph.
+
+    Returns:
+        OspSteppingPlan: The plan for stepping
+
+    Exceptions:
+        ValueError if a step size of a simulator is not a multiple of the base step size
+    """
+    graph = system.get_connection_graph(causalities, model_descriptions)
+    components = graph.get_strongly_connected_components()
+    number_components = len(components) and int(components.max()) + 1
+    is_simulator = graph.node_kinds == NodeKind.simulator.value
+    has_simulator = np.zeros(number_components, dtype=bool)
+    has_simulator[components[is_simulator]] = True
+
+    # Nodes grouped by component in the topological order, i.e. the decreasing component number
+    nodes = np.argsort(-components, kind='stable').tolist()
+    components = components.tolist()
+    has_simulator = has_simulator.tolist()
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    is_directed = graph.is_directed.tolist()
+    node_names = graph.node_names.tolist()
+    is_simulator = is_simulator.tolist()
+
+    start = [0] * number_components
+    finish = [-1] * number_components
+    order = []
+    for node in nodes:
+        component = components[node]
+        if finish[component] < 0:
+            finish[component] = start[component] + has_simulator[component]
+        if is_simulator[node]:
+            order.append(node_names[node])
+        for edge in range(indptr[node], indptr[node + 1]):
+            if not is_directed[edge]:
+                continue
+            successor = components[indices[edge]]
+            if successor != component and start[successor] < finish[component]:
+                start[successor] = finish[component]
+
+    # The groups are added to the stages in the order of the simulators in the system
+    stages = [[] for _ in range(max(finish, default=0))]
+    groups = {}
+    for node in range(graph.number_nodes):
+        if is_simulator[node]:
+            component = components[node]
+            if component not in groups:
+                groups[component] = []
+                stages[start[component]].append(groups[component])
+            groups[component].append(node_names[node])
+
+    base_step_size, decimation_factors = get_decimation_factors(system, order)
+    return OspSteppingPlan(
+        base_step_size=base_step_size,
+        order=order,
+        stages=stages,
+        decimation_factors=decimation_factors
+    )
+
+
+class OspSystemIndex:
+    """Adjacency index of a system by the names of the simulators and the functions
+
+    The connections of a simulator or a function are found without going through all the
+    connections of the system. The positions of the simulators, the functions and the connections
+    in their lists of the system are kept so that a part of the system keeps their order.
+
+    The index is for the system as it is when created. 'is_current' tells if the system has been
+    modified since then. The system counts its modifications by its methods, by replacing its
+    simulators, functions or connections and by rolling back or committing a batch. The changes
+    made to the elements in place, e.g. the endpoints of a connection, are counted only if
+    OspSystemStructure.mark_modified is called after.
+
+    Attributes:
+        simulators(Dict[str, Tuple[int, OspSimulator]]): Position and simulator by the name
+        functions(Dict[str, Tuple[int, FunctionType, Any]]): Position, type and function by the
+            name
+        simulator_connections(Dict[str, List[Tuple[InterfaceType, int, Any]]]): Interface type,
+            position and connection of the connections of the simulators by the name
+        function_connections(Dict[str, List[Tuple[InterfaceType, int, Any]]]): Interface type,
+            position and connection of the connections of the functions by the name
+    """
+
+    def __init__(self, system: OspSystemStructure):
+        """Constructor for OspSystemIndex
+
+        Args:
+            system(OspSystemStructure): System to index
+        """
+        self.key = self.get_key(system)
+        self.simulators = {
+            simulator.name: (position, simulator)
+            for position, simulator in enumerate(system.Simulators or [])
+        }
+        self.functions = {}
+        position = 0
+        for function_type in FunctionType:
+            for function in getattr(system.Functions, function_type.name, None) or []:
+                self.functions[function.name] = (position, function_type, function)
+                position += 1
+        self.simulator_connections = defaultdict(list)
+        self.function_connections = defaultdict(list)
+        connections = system.Connections
+        for interface_type, attribute in [
+            (InterfaceType.Variable, 'Variable'),
+            (InterfaceType.VariableGroup, 'VariableGroup')
+        ]:
+            for position, connection in enumerate(
+                    getattr(connections, interface_type.value, None) or []
+            ):
+                endpoint1, endpoint2 = getattr(connection, attribute)
+                item = (interface_type, position, connection)
+                self.simulator_connections[endpoint1.simulator].append(item)
+                if endpoint2.simulator != endpoint1.simulator:
+                    self.simulator_connections[endpoint2.simulator].append(item)
+        for interface_type, signal_attribute, variable_attribute in [
+            (InterfaceType.Signal, 'Signal', 'Variable'),
+            (InterfaceType.SignalGroup, 'SignalGroup', 'VariableGroup')
+        ]:
+            for position, connection in enumerate(
+                    getattr(connections, interface_type.value, None) or []
+            ):
+                item = (interface_type, position, connection)
+                self.simulator_connections[
+                    getattr(connection, variable_attribute).simulator
+                ].append(item)
+                self.function_connections[
+                    getattr(connection, signal_attribute).function
+                ].append(item)
+
+    @staticmethod
+    def get_key(system: OspSystemStructure) -> tuple:
+        """Returns the modification count of the system and the identity and the length of its lists
+
+        The lists are compared as well for the elements added or deleted without the methods of
+        the system, e.g. by OspConnections.add_connection.
+        """
+        lists = [system.Simulators]
+        lists.extend(
+            getattr(system.Functions, function_type.name, None) for function_type in FunctionType
+        )
+        lists.extend(
+            getattr(system.Connections, interface_type.value, None)
+            for interface_type in INTERFACE_TYPES
+        )
+        return (system._modification_count,) + tuple(
+            None if value is None else (id(value), len(value)) for value in lists
+        )
+
+    def is_current(self, system: OspSystemStructure) -> bool:
+        """Returns True if the index is still for the system"""
+        return self.key == self.get_key(system)
+
+    def get_neighbors(self, name: str) -> List[str]:
+        """Returns the simulators connected to the simulator directly or through a function"""
+        neighbors = []
+        for interface_type, _, connection in self.simulator_connections.get(name, []):
+            if interface_type in (InterfaceType.Variable, InterfaceType.VariableGroup):
+                attribute = 'Variable' if interface_type == InterfaceType.Variable \
+                    else 'VariableGroup'
+                neighbors.extend(endpoint.simulator for endpoint in getattr(connection, attribute))
+                continue
+            function = connection.Signal.function if interface_type == InterfaceType.Signal \
+                else connection.SignalGroup.function
+            for function_interface_type, _, function_connection in \
+                    self.function_connections[function]:
+                neighbors.append(
+                    function_connection.Variable.simulator
+                    if function_interface_type == InterfaceType.Signal
+                    else function_connection.VariableGroup.simulator
+                )
+        return [neighbor for neighbor in neighbors if neighbor != name]
+
+
+def _create_subsystem(
+        system: OspSystemStructure,
+        simulators: List[Any],
+        functions: Dict[FunctionType, List[Any]],
+        connections: Dict[InterfaceType, List[Any]]
+) -> OspSystemStructure:
+    """Returns a system with copies of the simulators, the functions and the connections given"""
+    subsystem = OspSystemStructure(
+        StartTime=system.StartTime,
+        BaseStepSize=system.BaseStepSize,
+        version=system.version
+    )
+    subsystem.Simulators = copy.deepcopy(simulators) or None
+    if any(functions.values()):
+        subsystem.Functions = OspFunctions(**{
+            function_type.name: copy.deepcopy(functions.get(function_type)) or None
+            for function_type in FunctionType
+        })
+    if any(connections.values()):
+        subsystem.Connections = OspConnections(**{
+            interface_type.value: copy.deepcopy(connections.get(interface_type)) or None
+            for interface_type in INTERFACE_TYPES
+        })
+    return subsystem
+
+
+def split_system(system: OspSystemStructure) -> List[OspSystemStructure]:
+    """Returns the independent sub-systems of a system
+
+    Each weakly connected component of the connection graph that has any simulator of the
+    system becomes a system with copies of its simulators including their initial values, its
+    functions and its connections. The start time, the base step size and the version of the
+    system are kept. The functions that are not connected to any simulator are left out. The
+    simulators, the functions and the connections keep their order in the system.
+
+    Returns:
+        List[OspSystemStructure]: Sub-systems in the order of their first simulator in the
+            system
+    """
+    graph = system.get_connection_graph()
+    components = graph.get_weakly_connected_components()
+    number_components = len(components) and int(components.max()) + 1
+    simulators = {simulator.name: simulator for simulator in system.Simulators or []}
+    functions = {}
+    for function_type in FunctionType:
+        for function in getattr(system.Functions, function_type.name, None) or []:
+            functions[function.name] = (function_type, function)
+
+    # The node ids of the simulators and the functions follow their order in the system
+    component_simulators = [[] for _ in range(number_components)]
+    component_functions = [defaultdict(list) for _ in range(number_components)]
+    for name, kind, component in zip(
+            graph.node_names.tolist(), graph.node_kinds.tolist(), components.tolist()
+    ):
+        if kind == NodeKind.simulator.value:
+            if name in simulators:
+                component_simulators[component].append(simulators[name])
+        elif name in functions:
+            function_type, function = functions[name]
+            component_functions[component][function_type].append(function)
+
+    # The edges are sorted back to the order of the connections in the system
+    component_connections = [defaultdict(list) for _ in range(number_components)]
+    if system.Connections is not None:
+        for kind, index, component in sorted(zip(
+                graph.edge_kinds.tolist(),
+                graph.connection_indices.tolist(),
+                components[graph.get_sources()].tolist()
+        )):
+            interface_type = INTERFACE_TYPES[kind]
+            component_connections[component][interface_type].append(
+                getattr(system.Connections, interface_type.value)[index]
+            )
+
+    return [
+        _create_subsystem(
+            system,
+            component_simulators[component],
+            component_functions[component],
+            component_connections[component]
+        )
+        for component in range(number_components) if len(component_simulators[component]) > 0
+    ]
+
+
+def get_subsystem(
+        system: OspSystemStructure,
+        names: Iterable[str],
+        include_neighbors: int = 0,
+        index: OspSystemIndex = None
+) -> OspSystemStructure:
+    """Returns a system with the simulators given and their neighbors
+
+    The simulators connected to the simulators selected, directly or through a function, are
+    added for the number of hops given. The connections between the simulators selected, the
+    functions connected to them and the connections between these functions and the simulators
+    are taken as copies. Only the simulators selected and their connections are visited in the
+    index so that the cost depends on the size of the selection rather than the system.
+
+    Args:
+        system(OspSystemStructure): System to take the simulators from
+        names(Iterable[str]): Names of the simulators to select
+        include_neighbors(int, optional): Number of hops to the neighbors to add. Default is 0.
+        index(OspSystemIndex, optional): Index of the system. It is created if not given.
+
+    Returns:
+        OspSystemStructure: System with the simulators selected in the order of the system
+
+    Exceptions:
+        TypeError if a simulator is not found with a name given
+    """
+    if index is None:
+        index = OspSystemIndex(system)
+    selected = dict.fromkeys(names)
+    for name in selected:
+        if name not in index.simulators:
+            raise TypeError(f'No component is found with the name, {name}')
+    frontier = list(selected)
+    for _ in range(include_neighbors):
+        next_frontier = []
+        for name in frontier:
+            for neighbor in index.get_neighbors(name):
+                if neighbor not in selected and neighbor in index.simulators:
+                    selected[neighbor] = None
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    connections = {}
+    function_names = set()
+    for name in selected:
+        for interface_type, position, connection in index.simulator_connections.get(name, []):
+            if interface_type == InterfaceType.Variable:
+                simulator_names = [endpoint.simulator for endpoint in connection.Variable]
+            elif interface_type == InterfaceType.VariableGroup:
+                simulator_names = [endpoint.simulator for endpoint in connection.VariableGroup]
+            else:
+                simulator_names = []
+                function_names.add(
+                    connection.Signal.function if interface_type == InterfaceType.Signal
+                    else connection.SignalGroup.function
+                )
+            if all(simulator_name in selected for simulator_name in simulator_names):
+                connections[(interface_type, position)] = connection
+
+    functions = defaultdict(list)
+    for _, function_type, function in sorted(
+            (index.functions[name] for name in function_names if name in index.functions),
+            key=lambda item: item[0]
+    ):
+        functions[function_type].append(function)
+    connections_by_type = defaultdict(list)
+    for interface_type, position in sorted(
+            connections, key=lambda key: (INTERFACE_TYPES.index(key[0]), key[1])
+    ):
+        connections_by_type[interface_type].append(connections[(interface_type, position)])
+    return _create_subsystem(
+        system,
+        [simulator for _, simulator in sorted(index.simulators[name] for name in selected)],
+        functions,
+        connections_by_type
+    )
+
+
+def _write_system(system: OspSystemStructure, path: str):
+    with open(path, 'wt') as file:
+        file.write(system.to_xml_str())
+
+
+def write_systems(
+        systems: List[OspSystemStructure],
+        paths: List[str],
+        max_workers: int = None
+) -> List[str]:
+    """Writes the XML documents of systems concurrently using a pool of processes
+
+    The encoding of the XML is bound by the CPU, so the systems are written in separate
+    processes rather than threads.
+
+    Args:
+        systems(List[OspSystemStructure]): Systems to write
+        paths(List[str]): Paths of the files for the systems
+        max_workers(int, optional): Maximum number of processes. The number of CPUs is used if
+            not given. The systems are written in the current process if it is 1.
+
+    Returns:
+        List[str]: Absolute paths of the files written
+
+    Exceptions:
+        TypeError if the number of the paths is not the same as that of the systems
+    """
+    if len(systems) != len(paths):
+        raise TypeError('The number of the paths should be the same as that of the systems.')
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(systems) <= 1:
+        for system, path in zip(systems, paths):
+            _write_system(system, path)
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(systems))) as executor:
+            # Raises the exception of a system that fails to be written
+            list(executor.map(_write_system, systems, paths))
+    return [os.path.abspath(path) for path in paths]
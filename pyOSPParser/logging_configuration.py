@@ -23,6 +23,8 @@ from typing import List, Union, Dict
 
 import xmlschema
 
+from .utils import intern_names
+
 PATH_TO_XML_SCHEMA_FOR_LOGGING = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     'xmlschema',
@@ -31,6 +33,10 @@ PATH_TO_XML_SCHEMA_FOR_LOGGING = os.path.join(
 
 
 class OspLoggingConfigurationAbstract(ABC):
+    __slots__ = ()
+    #: Attributes for the names to intern. See intern_names.
+    _name_keys = []
+
     @property
     @abstractmethod
     def _required_keys(self):
@@ -49,6 +55,7 @@ class OspLoggingConfigurationAbstract(ABC):
             for key, value in kwargs.items():
                 if key not in self._required_keys:
                     self.__setattr__(key, value)
+        intern_names(self, self._name_keys)
 
     @abstractmethod
     def to_dict_xml(self):
@@ -61,8 +68,10 @@ class OspLoggingConfigurationAbstract(ABC):
 
 
 class OspVariableForLogging(OspLoggingConfigurationAbstract):
+    __slots__ = ('name',)
     name: str
     _required_keys = ['name']
+    _name_keys = ['name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """Constructor for OspVariableForLogging class
@@ -88,6 +97,7 @@ class OspSimulatorForLogging(OspLoggingConfigurationAbstract):
     decimation_factor: int = None
     variables: List[OspVariableForLogging]
     _required_keys = ['name']
+    _name_keys = ['name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """Constructor for OspSimulatorForLogging class
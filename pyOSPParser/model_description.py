@@ -2,7 +2,8 @@ import json
 import os
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import NamedTuple, Union, List, Dict
+from functools import lru_cache
+from typing import NamedTuple, Union, List, Dict, Set, Any
 
 import xmlschema
 
@@ -13,6 +14,12 @@ PATH_TO_XML_SCHEMA = os.path.join(
 )
 
 
+@lru_cache(maxsize=None)
+def _get_shared_xml_schema() -> xmlschema.XMLSchema:
+    """Returns the XML schema for the model description used by the unpickled instances"""
+    return xmlschema.XMLSchema(PATH_TO_XML_SCHEMA)
+
+
 class InterfaceError(Exception):
     pass
 
@@ -29,6 +36,10 @@ class InterfaceIndex(NamedTuple):
 
 
 class OspModelDescriptionAbstract(ABC):
+    __slots__ = ()
+    #: A frozen instance cannot be modified. See freeze.
+    _frozen: bool = False
+
     @property
     @abstractmethod
     def _required_keys(self):
@@ -61,6 +72,48 @@ class OspModelDescriptionAbstract(ABC):
         This method should be defined for the inherited class
         """
 
+    def __setattr__(self, key, value):
+        self._check_not_frozen()
+        super().__setattr__(key, value)
+
+    def __setstate__(self, state):
+        # The state is restored without the check so that a frozen instance can be copied.
+        # It is (instance dictionary, slots) for the classes with slots.
+        dict_state, slot_state = state if isinstance(state, tuple) else (state, None)
+        if dict_state:
+            vars(self).update(dict_state)
+        for key, value in (slot_state or {}).items():
+            object.__setattr__(self, key, value)
+
+    def _get_attributes(self) -> Dict[str, Any]:
+        attributes = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(self, slot):
+                    attributes[slot] = getattr(self, slot)
+        return attributes
+
+    def _check_not_frozen(self):
+        if self._frozen:
+            raise TypeError(f'The {type(self).__name__} instance is frozen and cannot be modified.')
+
+    def freeze(self):
+        """Makes the instance and the instances it contains read-only
+
+        The lists are converted to tuples and setting an attribute raises a TypeError afterward,
+        so that a frozen instance can be shared safely by many users.
+        """
+        if self._frozen:
+            return
+        for key, value in self._get_attributes().items():
+            if isinstance(value, list):
+                value = tuple(value)
+                object.__setattr__(self, key, value)
+            for item in value if isinstance(value, tuple) else [value]:
+                if isinstance(item, OspModelDescriptionAbstract):
+                    item.freeze()
+        object.__setattr__(self, '_frozen', True)
+
 
 class OspBaseUnit(OspModelDescriptionAbstract):
     kg: int = 0
@@ -207,15 +260,22 @@ class OspUnitDefinitionsType(OspModelDescriptionAbstract):
             self.Unit = None
 
     def add_unit_type(self, unit_type: OspUnitType):
+        self._check_not_frozen()
         self.Unit.append(unit_type)
 
 
 class OspVariableType(OspModelDescriptionAbstract):
-    ref: str = None
-    unit: str = None
+    __slots__ = ('ref', 'unit', '_frozen')
+    ref: str
+    unit: str
     _required_keys = ['ref']
+    #: Defaults of the attributes. A slot cannot have a class default, so they are set in
+    #: the slots by the constructor.
+    _defaults = {'ref': None, 'unit': None, '_frozen': False}
 
     def __init__(self, dict_xml: Dict = None, **kwargs):
+        for key, value in self._defaults.items():
+            object.__setattr__(self, key, value)
         super().__init__(dict_xml=dict_xml, **kwargs)
 
     def to_dict_xml(self):
@@ -774,6 +834,19 @@ class OspModelDescription(OspModelDescriptionAbstract):
         else:
             super().__init__(dict_xml=dict_xml, **kwargs)
 
+    def __getstate__(self):
+        # The XML schema is not pickled. The shared one is set when it is used after unpickled.
+        state = self.__dict__.copy()
+        state.pop('xs', None)
+        return state
+
+    def __getattr__(self, name):
+        if name == 'xs':
+            # Set directly as the instance may be frozen
+            object.__setattr__(self, 'xs', _get_shared_xml_schema())
+            return self.xs
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     def from_dict_xml(self, dict_xml):
         self.VariableGroups = OspVariableGroupsType(dict_xml=dict_xml['VariableGroups'])
         if 'UnitDefinitions' in dict_xml:
@@ -849,6 +922,7 @@ class OspModelDescription(OspModelDescriptionAbstract):
                 OspHydraulicPowerPortType
             ]
     ):
+        self._check_not_frozen()
         type_name_new = find_type_of_variable_groups(new_interface)
 
         self.check_duplicate_name(new_interface.name)
@@ -882,6 +956,7 @@ class OspModelDescription(OspModelDescriptionAbstract):
             self,
             interface_name: str,
     ):
+        self._check_not_frozen()
         interface_index = self.find_interface_by_name(interface_name)
         var_groups = self.VariableGroups.__getattribute__(interface_index.type_name)
         deleted_var_group = var_groups.pop(interface_index.index)
@@ -889,6 +964,14 @@ class OspModelDescription(OspModelDescriptionAbstract):
         self.VariableGroups.__setattr__(interface_index.type_name, var_groups)
         return deleted_var_group
 
+    def get_variable_names(self) -> Set[str]:
+        """Returns the names(ref) of all the variables in the variable groups and their sub groups"""
+        return {variable.ref for variable in get_variables_in_group(self.VariableGroups)}
+
+    def get_variable_group_names(self) -> Set[str]:
+        """Returns the names of all the variable groups and their sub groups"""
+        return {var_group.name for var_group in get_variable_groups_in_group(self.VariableGroups)}
+
     def get_variables(self):
         osp_variables = []
         for var_group in self.get_variable_group_with_variables():
@@ -914,6 +997,75 @@ def get_osp_model_description_type_from_json(json_text: str) -> OspModelDescript
     return OspModelDescription(dict_xml=dict_xml)
 
 
+def get_variables_in_group(var_group: Union[
+    OspGenericType, OspForceType, OspTorqueType, OspVoltageType, OspPressureType,
+    OspLinearVelocityType, OspAngularVelocityType, OspCurrentType, OspVolumeFlowRateType,
+    OspLinearDisplacementType, OspAngularDisplacementType, OspChargeType, OspVolumeType,
+    OspLinearMechanicalPortType, OspAngularMechanicalPortType, OspElectromagneticPortType,
+    OspHydraulicPortType, OspLinearMechanicalQuasiPortType, OspAngularMechanicalQuasiPortType,
+    OspElectromagneticQuasiPortType, OspHydraulicQuasiPortType, OspLinearMechanicalPowerPortType,
+    OspAngularMechanicalPowerPortType, OspElectromagneticPowerPortType, OspHydraulicPowerPortType,
+    OspVariableGroupsType
+]) -> List[OspVariableType]:
+    """Returns all the variables in a variable group including those in its sub groups"""
+    if isinstance(var_group, OspPhysicalTypeBase):
+        return list(var_group.Variable or [])
+    variables = []
+    if isinstance(var_group, OspGenericType):
+        variables.extend(var_group.Variable or [])
+        for type_name in variable_group_types:
+            for sub_group in getattr(var_group, type_name, None) or []:
+                variables.extend(get_variables_in_group(sub_group))
+    else:
+        type_name = find_type_of_variable_groups(var_group)
+        for field in variable_group_types[type_name]['field']:
+            variables.extend(get_variables_in_group(getattr(var_group, field)))
+    return variables
+
+
+def get_sub_groups(var_group: Union[
+    OspGenericType, OspForceType, OspTorqueType, OspVoltageType, OspPressureType,
+    OspLinearVelocityType, OspAngularVelocityType, OspCurrentType, OspVolumeFlowRateType,
+    OspLinearDisplacementType, OspAngularDisplacementType, OspChargeType, OspVolumeType,
+    OspLinearMechanicalPortType, OspAngularMechanicalPortType, OspElectromagneticPortType,
+    OspHydraulicPortType, OspLinearMechanicalQuasiPortType, OspAngularMechanicalQuasiPortType,
+    OspElectromagneticQuasiPortType, OspHydraulicQuasiPortType, OspLinearMechanicalPowerPortType,
+    OspAngularMechanicalPowerPortType, OspElectromagneticPowerPortType, OspHydraulicPowerPortType,
+    OspVariableGroupsType
+]) -> List[OspModelDescriptionAbstract]:
+    """Returns the sub groups directly in a variable group"""
+    if isinstance(var_group, OspPhysicalTypeBase):
+        return []
+    if isinstance(var_group, OspGenericType):
+        return [
+            sub_group for type_name in variable_group_types
+            for sub_group in getattr(var_group, type_name, None) or []
+        ]
+    type_name = find_type_of_variable_groups(var_group)
+    return [
+        getattr(var_group, field) for field in variable_group_types[type_name]['field']
+        if getattr(var_group, field, None) is not None
+    ]
+
+
+def get_variable_groups_in_group(var_group: Union[
+    OspGenericType, OspForceType, OspTorqueType, OspVoltageType, OspPressureType,
+    OspLinearVelocityType, OspAngularVelocityType, OspCurrentType, OspVolumeFlowRateType,
+    OspLinearDisplacementType, OspAngularDisplacementType, OspChargeType, OspVolumeType,
+    OspLinearMechanicalPortType, OspAngularMechanicalPortType, OspElectromagneticPortType,
+    OspHydraulicPortType, OspLinearMechanicalQuasiPortType, OspAngularMechanicalQuasiPortType,
+    OspElectromagneticQuasiPortType, OspHydraulicQuasiPortType, OspLinearMechanicalPowerPortType,
+    OspAngularMechanicalPowerPortType, OspElectromagneticPowerPortType, OspHydraulicPowerPortType,
+    OspVariableGroupsType
+]) -> List[OspModelDescriptionAbstract]:
+    """Returns all the sub groups of a variable group including those in their sub groups"""
+    var_groups = []
+    for sub_group in get_sub_groups(var_group):
+        var_groups.append(sub_group)
+        var_groups.extend(get_variable_groups_in_group(sub_group))
+    return var_groups
+
+
 def find_type_of_variable_groups(interface: Union[
     OspVariableType, OspGenericType, OspForceType, OspTorqueType, OspVoltageType, OspPressureType,
     OspLinearVelocityType, OspAngularVelocityType, OspCurrentType, OspVolumeFlowRateType,
@@ -6,16 +6,31 @@ Classes:
     OSPScenario: Class for scenario in OSP scenario that contains
     collection of OSPEvent instances
     EventAction: Enumerator for type of actions used in OSPEvent
+    DuplicateEventPolicy: Enumerator for how to resolve events with the same
+    time, model and variable when scenarios are merged
+    OSPEventTrack: Sorted arrays of time, action and value of the events
+    for a variable
+    OSPScenarioTimeline: Compiled scenario that contains OSPEventTrack
+    instances for each variable for a fast lookup of the active event
+
+    JSONStreamReader: Reads JSON values one by one from a file object
 
 Functions:
     format_filename(str): Converts any string to a valid file name
 
 """
 
+import bisect
+import heapq
 import json
+import re
 import string
+import sys
 from enum import Enum
-from typing import List, Union
+from operator import attrgetter
+from typing import List, Union, Dict, Tuple, NamedTuple, TextIO, Any, Iterator
+
+import numpy as np
 
 
 def format_filename(name: str) -> str:
@@ -34,12 +49,124 @@ an invalid filename.
     return filename
 
 
+class JSONStreamReader:
+    """Reads JSON values one by one from a text file object
+
+    Only a chunk of the file is kept in memory at a time. It is used to iterate the elements of
+    an array or the members of an object without loading the whole document.
+    """
+    _whitespace = re.compile(r'[ \t\n\r]*')
+    _number_chars = frozenset('0123456789.eE+-')
+
+    def __init__(self, fileobj: TextIO, chunk_size: int = 2 ** 16):
+        """Constructor for JSONStreamReader
+
+        Args:
+            fileobj(TextIO): File object to read from
+            chunk_size(int): Number of characters to read from the file at a time
+        """
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read_chunk(self) -> bool:
+        """Reads the next chunk into the buffer. Returns False at the end of the file"""
+        chunk = self.fileobj.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next character that is not a whitespace or '' at the end of the file"""
+        while True:
+            self.pos = self._whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_chunk():
+                return ''
+
+    def expect(self, char: str):
+        """Consumes the next character. Raises ValueError if it is not the one expected"""
+        if self.peek() != char:
+            raise ValueError(f'Expecting "{char}" in the JSON document.')
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Reads the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number that ends with the buffer or before a character of a number, e.g. '12'
+                # of '12.5' split at the '.', may continue in the next chunk.
+                if self.eof or (
+                        end < len(self.buffer) and self.buffer[end] not in self._number_chars
+                ):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_chunk()
+
+    def iter_array(self) -> Iterator[Any]:
+        """Iterates the elements of the array that comes next"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect(']')
+                return
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Iterates the keys of the object that comes next
+
+        The value for each key should be read, e.g. by read_value or iter_array, before
+        getting the next key.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+            else:
+                self.expect('}')
+                return
+
+
 class EventAction(Enum):
     override = 1
     bias = 2
     reset = 3
 
 
+#: Action code used in a compiled timeline when no override or bias is active
+NO_ACTION = 0
+
+
+class DuplicateEventPolicy(Enum):
+    """Policy for events that have the same time, model and variable"""
+    error = 1
+    keep_first = 2
+    keep_last = 3
+
+
 class OSPEvent:
     """Class for event in OSP scenario
 
@@ -48,11 +175,17 @@ class OSPEvent:
         OVERRIDE(int): value for override action
         BIAS(int): value for bias action
         RESET(int): value for reset action
+
+    The attributes of an instance are stored in slots instead of a dictionary
+    to keep the memory use low for scenarios with a large number of events.
     """
 
+    __slots__ = ('time', 'model', 'variable', '_action', 'value')
+
     OVERRIDE = 1
     BIAS = 2
     RESET = 3
+    _ACTIONS = (OVERRIDE, BIAS, RESET)
 
     def __init__(
             self,
@@ -84,12 +217,22 @@ class OSPEvent:
 
     @action.setter
     def action(self, value):
-        if value in [self.OVERRIDE, self.BIAS, self.RESET]:
+        if value in self._ACTIONS:
             self._action = value
         else:
             raise TypeError('The action should be either "OSPEvent.OVERRIDE", '
                             '"OSPEvent.BIAS" or "OSPEvent.RESET"')
 
+    def copy(self, time: float = None) -> 'OSPEvent':
+        """Returns a copy of the event, optionally at another time"""
+        return OSPEvent(
+            time=self.time if time is None else time,
+            model=self.model,
+            variable=self.variable,
+            action=self.action,
+            value=self.value
+        )
+
     def to_dict(self):
         if isinstance(self.value, bool) or isinstance(self.value, str):
             value = self.value
@@ -203,15 +346,369 @@ class OSPScenario:
         self.end = scenario_dict['end']
         self.events = []
         for event in scenario_dict['events']:
-            model = event['model']
-            variable = event['variable']
             self.events.append(OSPEvent(
                 time=event['time'],
-                model=model,
-                variable=variable,
+                model=sys.intern(event['model']),
+                variable=sys.intern(event['variable']),
                 action=EventAction.__getitem__(event['action']).value,
                 value=event['value']
             ))
 
+    def dump(self, fileobj: TextIO, compact: bool = False):
+        """Writes the scenario as JSON to a file object event by event
+
+        The output is the same as to_json unless compact is True, in which case no indentation
+        or whitespace is used.
+
+        Args:
+            fileobj(TextIO): File object to write to
+            compact(bool): Writes without indentation and whitespace if True. Default is False.
+        """
+        if compact:
+            encode = json.JSONEncoder(separators=(',', ':')).encode
+            fileobj.write('{"description":%s,"events":[' % json.dumps(self.description))
+            fileobj.writelines(
+                '%s%s' % (',' if i > 0 else '', encode(event.to_dict()))
+                for i, event in enumerate(self.events)
+            )
+            fileobj.write('],"end":%s}' % json.dumps(self.end))
+        else:
+            encode = json.JSONEncoder(indent=2).encode
+            fileobj.write('{\n  "description": %s,\n  "events": [' % json.dumps(self.description))
+            fileobj.writelines(
+                '%s\n    %s' % (',' if i > 0 else '', encode(event.to_dict()).replace('\n', '\n    '))
+                for i, event in enumerate(self.events)
+            )
+            fileobj.write('%s],\n  "end": %s\n}' % (
+                '\n  ' if len(self.events) > 0 else '', json.dumps(self.end)
+            ))
+
+    def load(self, fileobj: TextIO):
+        """Reads the scenario from a JSON file object event by event
+
+        The document is read in chunks and the events are created as they are read instead of
+        loading the whole document first. The model and variable names are interned so that
+        the events share a single string for each name.
+
+        Args:
+            fileobj(TextIO): File object to read from
+
+        Exceptions:
+            KeyError if 'description' or 'end' is missing in the document
+            ValueError if the document is not a valid JSON
+        """
+        reader = JSONStreamReader(fileobj)
+        scenario_dict = {}
+        events = []
+        for key in reader.iter_object_keys():
+            if key == 'events':
+                events.extend(
+                    OSPEvent(
+                        time=event['time'],
+                        model=sys.intern(event['model']),
+                        variable=sys.intern(event['variable']),
+                        action=EventAction.__getitem__(event['action']).value,
+                        value=event['value']
+                    ) for event in reader.iter_array()
+                )
+            else:
+                scenario_dict[key] = reader.read_value()
+        self.description = scenario_dict['description']
+        self.end = scenario_dict['end']
+        self.events = events
+
     def get_file_name(self):
         return '%s.json' % format_filename(self.name)
+
+    def get_sorted_events(self) -> List[OSPEvent]:
+        """Returns the events sorted by time keeping the order of those at the same time"""
+        return sorted(self.events, key=attrgetter('time'))
+
+    @staticmethod
+    def merge(
+            *scenarios: 'OSPScenario',
+            name: str = None,
+            description: str = None,
+            duplicate_policy: DuplicateEventPolicy = DuplicateEventPolicy.error
+    ) -> 'OSPScenario':
+        """Merges scenarios into a new scenario
+
+        The events of each scenario are sorted once and merged in the order of time. The end time
+        of the new scenario is the latest among the scenarios.
+
+        Args:
+            scenarios(OSPScenario): Scenarios to merge
+            name(str, optional): Name of the new scenario. The name of the first scenario is used
+                if not given.
+            description(str, optional): Description of the new scenario. The descriptions of the
+                scenarios are joined if not given.
+            duplicate_policy(DuplicateEventPolicy): How to resolve events with the same time,
+                model and variable. 'keep_first' or 'keep_last' keeps the event of the scenario
+                given first or last. Default is 'error'.
+
+        Returns:
+            OSPScenario: A new scenario with copies of the events
+
+        Exceptions:
+            TypeError if no scenario is given or there are duplicate events with the 'error'
+                policy.
+        """
+        if len(scenarios) == 0:
+            raise TypeError('At least one scenario should be given to merge.')
+        merged = OSPScenario(
+            name=scenarios[0].name if name is None else name,
+            end=max(scenario.end for scenario in scenarios),
+            description='\n'.join(scenario.description for scenario in scenarios
+                                  if scenario.description)
+            if description is None else description
+        )
+        events_sorted = heapq.merge(
+            *[scenario.get_sorted_events() for scenario in scenarios], key=attrgetter('time')
+        )
+        #: Index of the events at the current time in the merged events for each (model, variable)
+        index_at_time: Dict[Tuple[str, str], int] = {}
+        time = None
+        for event in events_sorted:
+            if event.time != time:
+                time = event.time
+                index_at_time = {}
+            key = (event.model, event.variable)
+            if key in index_at_time:
+                if duplicate_policy == DuplicateEventPolicy.error:
+                    raise TypeError(f'There are multiple events for {event.model}.'
+                                    f'{event.variable} at {event.time}')
+                if duplicate_policy == DuplicateEventPolicy.keep_last:
+                    merged.events[index_at_time[key]] = event.copy()
+            else:
+                index_at_time[key] = len(merged.events)
+                merged.events.append(event.copy())
+        return merged
+
+    def shift(self, dt: float) -> 'OSPScenario':
+        """Returns a new scenario with the events and the end time shifted by dt
+
+        The events that would be before 0 after the shift are discarded.
+        """
+        end = self.end + dt
+        if end < 0:
+            raise TypeError('The end time should not be negative after the shift.')
+        shifted = OSPScenario(name=self.name, end=end, description=self.description)
+        shifted.events = [
+            event.copy(time=event.time + dt) for event in self.get_sorted_events()
+            if event.time + dt >= 0
+        ]
+        return shifted
+
+    def slice(self, t0: float, t1: float, keep_active: bool = True) -> 'OSPScenario':
+        """Returns a new scenario for the time window [t0, t1] starting at 0
+
+        The events in the window are copied with their time subtracted by t0 and the end time of
+        the new scenario is t1 - t0.
+
+        Args:
+            t0(float): Start of the window
+            t1(float): End of the window
+            keep_active(bool): If True, an override or bias that is active at t0 is kept by an
+                event at the start of the new scenario. Default is True.
+        """
+        if t1 < t0:
+            raise TypeError('The end of the window should not be earlier than the start.')
+        events = self.get_sorted_events()
+        times = [event.time for event in events]
+        start = bisect.bisect_left(times, t0)
+        stop = bisect.bisect_right(times, t1)
+        sliced = OSPScenario(name=self.name, end=t1 - t0, description=self.description)
+        if keep_active:
+            last_events: Dict[Tuple[str, str], OSPEvent] = {}
+            for event in events[:start]:
+                last_events[(event.model, event.variable)] = event
+            keys_at_start = {
+                (event.model, event.variable) for event in events[start:stop]
+                if event.time == t0
+            }
+            sliced.events = [
+                event.copy(time=0) for key, event in last_events.items()
+                if event.action != EventAction.reset.value and key not in keys_at_start
+            ]
+        sliced.events.extend(event.copy(time=event.time - t0) for event in events[start:stop])
+        return sliced
+
+    def compile(self) -> 'OSPScenarioTimeline':
+        """Compiles the events into a timeline for a fast lookup of the active events"""
+        return OSPScenarioTimeline(self)
+
+    def apply_to_signal(
+            self, model: str, variable: str, times: np.ndarray, signal: np.ndarray
+    ) -> np.ndarray:
+        """Applies the events for a variable to a recorded signal
+
+        See OSPScenarioTimeline.apply_to_signal. Compile the scenario once and use the timeline
+        instead when applying the events for many variables.
+        """
+        return self.compile().apply_to_signal(model, variable, times, signal)
+
+
+class OSPEventTrack(NamedTuple):
+    """Events for a variable as arrays sorted by time"""
+    times: np.ndarray
+    actions: np.ndarray
+    values: np.ndarray
+
+
+class OSPScenarioTimeline:
+    """Compiled timeline of a scenario
+
+    The events are grouped by (model, variable) and stored as arrays sorted by time. An override
+    or bias stays active from the time of the event until the next event for the same variable.
+    The active event at a time is therefore found by a binary search instead of scanning all the
+    events of the scenario. The timeline is not updated when the scenario changes. Compile the
+    scenario again after the changes.
+
+    Attributes:
+        tracks(Dict[Tuple[str, str], OSPEventTrack]): Event tracks for (model, variable)
+    """
+    tracks: Dict[Tuple[str, str], OSPEventTrack]
+
+    def __init__(self, scenario: OSPScenario):
+        """Constructor for OSPScenarioTimeline
+
+        Args:
+            scenario(OSPScenario): Scenario to compile
+        """
+        events_by_variable: Dict[Tuple[str, str], List[OSPEvent]] = {}
+        for event in scenario.events:
+            events_by_variable.setdefault((event.model, event.variable), []).append(event)
+        self.tracks = {}
+        for key, events in events_by_variable.items():
+            times = np.array([event.time for event in events], dtype=float)
+            actions = np.array([event.action for event in events], dtype=np.int8)
+            values = [event.value for event in events]
+            if any(isinstance(value, (bool, str)) for value in values):
+                values = np.array(values, dtype=object)
+            else:
+                values = np.array(values, dtype=float)
+            # A stable sort keeps the order of the events given at the same time.
+            order = np.argsort(times, kind='stable')
+            self.tracks[key] = OSPEventTrack(
+                times=times[order], actions=actions[order], values=values[order]
+            )
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """Returns (model, variable) pairs that have events"""
+        return list(self.tracks.keys())
+
+    def get_track(self, model: str, variable: str) -> Union[OSPEventTrack, None]:
+        """Returns the event track for the variable or None if there is no event for it"""
+        return self.tracks.get((model, variable), None)
+
+    def find_event_index(
+            self, model: str, variable: str, time: Union[float, np.ndarray]
+    ) -> Union[int, np.ndarray]:
+        """Returns the index of the last event at or before the time in the track
+
+        Args:
+            model(str): model name
+            variable(str): variable name
+            time(float, np.ndarray): A time or an array of time
+
+        Returns:
+            int, np.ndarray: Index of the event in the track. -1 if there is no event before the
+            time or there is no track for the variable.
+        """
+        track = self.get_track(model, variable)
+        if track is None:
+            return np.full(np.shape(time), -1, dtype=np.intp) if np.ndim(time) > 0 else -1
+        return np.searchsorted(track.times, time, side='right') - 1
+
+    def get_active_actions(
+            self, model: str, variable: str, time: Union[float, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the action and value active at the time for a variable
+
+        Args:
+            model(str): model name
+            variable(str): variable name
+            time(float, np.ndarray): A time or an array of time
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Action codes and values of the events active at the
+            time given as arrays of the same length as the time (1 for a single time). The action
+            code is NO_ACTION if neither override nor bias is active, i.e. there is no event
+            before the time or the last one is reset. The value is then nan for a numeric track
+            and None otherwise.
+        """
+        index = np.atleast_1d(self.find_event_index(model, variable, time))
+        track = self.get_track(model, variable)
+        actions = np.full(index.shape, NO_ACTION, dtype=np.int8)
+        if track is None:
+            return actions, np.full(index.shape, np.nan)
+        no_value = np.nan if track.values.dtype.kind == 'f' else None
+        values = np.full(index.shape, no_value, dtype=track.values.dtype)
+        found = index >= 0
+        actions[found] = track.actions[index[found]]
+        values[found] = track.values[index[found]]
+        reset = actions == EventAction.reset.value
+        actions[reset] = NO_ACTION
+        values[reset] = no_value
+        return actions, values
+
+    def apply_to_signal(
+            self, model: str, variable: str, times: np.ndarray, signal: np.ndarray
+    ) -> np.ndarray:
+        """Applies the events for a variable to a recorded signal
+
+        The signal is replaced by the value of an override and added the value of a bias from the
+        time of the event until the next event for the variable. A reset restores the signal.
+
+        Args:
+            model(str): model name
+            variable(str): variable name
+            times(np.ndarray): Time of the samples
+            signal(np.ndarray): Baseline signal of the same length as the times
+
+        Returns:
+            np.ndarray: A new array of the modified signal
+
+        Exceptions:
+            ValueError if the lengths of the times and the signal do not match
+            TypeError if the values of the events for the variable are not numeric
+        """
+        times = np.asarray(times)
+        result = np.array(signal, dtype=float)
+        if times.shape != result.shape:
+            raise ValueError('The times and the signal should have the same shape.')
+        track = self.get_track(model, variable)
+        if track is None:
+            return result
+        if track.values.dtype.kind != 'f':
+            raise TypeError('Only numeric values of events can be applied to a signal.')
+        index = np.searchsorted(track.times, times, side='right') - 1
+        found = index >= 0
+        index_found = index[found]
+        actions = track.actions[index_found]
+        values = track.values[index_found]
+        result_found = result[found]
+        override = actions == EventAction.override.value
+        result_found[override] = values[override]
+        bias = actions == EventAction.bias.value
+        result_found[bias] += values[bias]
+        result[found] = result_found
+        return result
+
+    def get_active_event(self, model: str, variable: str, time: float) -> Union[OSPEvent, None]:
+        """Returns the override or bias event active at the time or None if not any"""
+        index = self.find_event_index(model, variable, time)
+        if index < 0:
+            return None
+        track = self.tracks[(model, variable)]
+        action = int(track.actions[index])
+        if action == EventAction.reset.value:
+            return None
+        value = track.values[index]
+        return OSPEvent(
+            time=float(track.times[index]),
+            model=model,
+            variable=variable,
+            action=action,
+            value=value.item() if isinstance(value, np.generic) else value
+        )
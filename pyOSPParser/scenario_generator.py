@@ -0,0 +1,243 @@
+""" Contains classes for generating randomized variants of a scenario
+for Monte Carlo campaigns of co-simulation from Open Simulation Platform
+
+Classes:
+    Jitter: Distribution of a random perturbation for the time or value of events
+    OSPScenarioVariantGenerator: Generates variants of a template scenario
+    and writes them to files in parallel
+
+Example:
+    The variants are reproducible for the same seed regardless of the number of processes
+    used to write them.
+
+        generator = OSPScenarioVariantGenerator(
+            template=scenario,
+            time_jitter=Jitter('normal', {'scale': 0.5}),
+            value_jitter=Jitter('uniform', {'low': 0.9, 'high': 1.1}, relative=True),
+            seed=42
+        )
+        file_paths = generator.write(directory='campaign', number_variants=1000)
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Dict, Union, Tuple, List
+
+import numpy as np
+
+from .scenario import OSPScenario, OSPEvent
+
+
+class Jitter(NamedTuple):
+    """Distribution of a random perturbation
+
+    Attributes:
+        distribution(str): Name of a method of numpy.random.Generator, e.g. 'normal', 'uniform'
+        parameters(Dict[str, float], optional): Arguments for the method except 'size'
+        relative(bool): The original is multiplied by the sample if True. Otherwise the sample
+            is added. Default is False.
+    """
+    distribution: str
+    parameters: Union[Dict[str, float], None] = None
+    relative: bool = False
+
+    def apply(self, rng: np.random.Generator, original: np.ndarray) -> np.ndarray:
+        """Returns the original values perturbed by samples from the distribution"""
+        samples = getattr(rng, self.distribution)(size=original.shape, **(self.parameters or {}))
+        return original * samples if self.relative else original + samples
+
+
+class OSPScenarioVariantGenerator:
+    """Generates randomized variants of a template scenario
+
+    The time and value of the events of the template are perturbed by the jitters given. Each
+    variant has its own random generator seeded by the seed of the generator and the index of
+    the variant so that the variants are the same regardless of in which order or process they
+    are generated. Values that are not numeric, i.e. boolean or string, are not perturbed and the
+    time of the events are kept within [0, end] of the template.
+
+    The events of a variable keep their order in the template, e.g. a reset stays after its
+    override: the jittered times of the events of each (model, variable) are sorted and given to
+    the events in their original order. Events of the same variable that would end up at the
+    same time, e.g. both clipped to 0 or to the end, are moved apart by the smallest step
+    representable so that every event has its own time.
+    """
+    template: OSPScenario
+    time_jitter: Union[Jitter, None]
+    value_jitter: Union[Jitter, Dict[Tuple[str, str], Jitter], None]
+    seed: int
+
+    def __init__(
+            self,
+            template: OSPScenario,
+            time_jitter: Jitter = None,
+            value_jitter: Union[Jitter, Dict[Tuple[str, str], Jitter]] = None,
+            seed: int = None
+    ):
+        """Constructor for OSPScenarioVariantGenerator
+
+        Args:
+            template(OSPScenario): Scenario to generate the variants from
+            time_jitter(Jitter, optional): Perturbation of the time of the events
+            value_jitter(Jitter, Dict[Tuple[str, str], Jitter], optional): Perturbation of the
+                value of the events for all variables or for each (model, variable)
+            seed(int, optional): Seed for the random generators. A random seed is drawn if not
+                given. It can be retrieved from the 'seed' attribute to reproduce the variants.
+        """
+        self.template = template
+        self.time_jitter = time_jitter
+        self.value_jitter = value_jitter
+        self.seed = int(np.random.SeedSequence().entropy) if seed is None else seed
+        self._events = template.get_sorted_events()
+        self._times = np.array([event.time for event in self._events], dtype=float)
+        self._is_numeric = np.array([
+            not isinstance(event.value, (bool, str)) for event in self._events
+        ], dtype=bool)
+        self._values = np.array([
+            event.value if is_numeric else np.nan
+            for event, is_numeric in zip(self._events, self._is_numeric)
+        ], dtype=float)
+        keys = {}
+        self._variable_ids = np.array([
+            keys.setdefault((event.model, event.variable), len(keys)) for event in self._events
+        ], dtype=np.int64)
+        # The events of each variable in their order in the template
+        self._variable_order = np.lexsort((np.arange(len(self._events)), self._variable_ids))
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        if isinstance(value_jitter, dict):
+            keys = [(event.model, event.variable) for event in self._events]
+            self._masks = {
+                key: np.array([key_event == key for key_event in keys], dtype=bool)
+                for key in value_jitter
+            }
+
+    def get_variant_name(self, index: int, number_variants: int = None) -> str:
+        """Returns the name of the variant for the index padded for the number of variants"""
+        width = len(str(max(number_variants - 1, 0))) if number_variants else 0
+        return '%s_%0*d' % (self.template.name, width, index)
+
+    def generate(self, index: int, number_variants: int = None) -> OSPScenario:
+        """Generates the variant for the index
+
+        Args:
+            index(int): Index of the variant
+            number_variants(int, optional): Number of variants in the campaign, used only to pad
+                the index in the name of the variant
+
+        Returns:
+            OSPScenario: The variant
+        """
+        rng = np.random.default_rng([self.seed, index])
+        times = self._times
+        if self.time_jitter is not None:
+            times = self._order_times(
+                np.clip(self.time_jitter.apply(rng, times), 0, self.template.end)
+            )
+        values = self._values
+        if isinstance(self.value_jitter, Jitter):
+            values = self.value_jitter.apply(rng, values)
+        elif self.value_jitter is not None:
+            values = values.copy()
+            for key, jitter in self.value_jitter.items():
+                mask = self._masks[key]
+                values[mask] = jitter.apply(rng, values[mask])
+        variant = OSPScenario(
+            name=self.get_variant_name(index, number_variants),
+            end=self.template.end,
+            description=self.template.description
+        )
+        variant.events = [
+            OSPEvent(
+                time=float(time),
+                model=event.model,
+                variable=event.variable,
+                action=event.action,
+                value=float(value) if is_numeric else event.value
+            ) for event, time, value, is_numeric in zip(
+                self._events, times, values, self._is_numeric
+            )
+        ]
+        return variant
+
+    def _order_times(self, times: np.ndarray) -> np.ndarray:
+        """Returns the times sorted for each variable with no two events at the same time"""
+        order = self._variable_order
+        ordered_times = np.empty_like(times)
+        ordered_times[order] = times[np.lexsort((times, self._variable_ids))]
+        variable_ids = self._variable_ids[order].tolist()
+        sorted_times = ordered_times[order].tolist()
+        for i in range(1, len(sorted_times)):
+            if variable_ids[i] == variable_ids[i - 1] and sorted_times[i] <= sorted_times[i - 1]:
+                sorted_times[i] = float(np.nextafter(sorted_times[i - 1], math.inf))
+        # The events moved past the end are moved back before the next one
+        end = float(self.template.end)
+        for i in reversed(range(len(sorted_times))):
+            upper = end
+            if i + 1 < len(sorted_times) and variable_ids[i + 1] == variable_ids[i]:
+                upper = float(np.nextafter(sorted_times[i + 1], -math.inf))
+            if sorted_times[i] > upper:
+                sorted_times[i] = upper
+        ordered_times[order] = sorted_times
+        return ordered_times
+
+    def write_variants(
+            self, directory: str, indices: List[int], number_variants: int, compact: bool = True
+    ) -> List[str]:
+        """Generates the variants for the indices and writes them in the directory
+
+        Returns:
+            List[str]: Paths to the files written
+        """
+        file_paths = []
+        for index in indices:
+            variant = self.generate(index, number_variants)
+            file_path = os.path.join(directory, variant.get_file_name())
+            with open(file_path, 'wt') as file:
+                variant.dump(file, compact=compact)
+            file_paths.append(file_path)
+        return file_paths
+
+    def write(
+            self,
+            directory: str,
+            number_variants: int,
+            processes: int = None,
+            compact: bool = True
+    ) -> List[str]:
+        """Generates the variants and writes them in the directory using a pool of processes
+
+        The file names are made from the name of the template and the index of the variant, so
+        they do not collide with each other.
+
+        Args:
+            directory(str): Directory to write the files. It is created if it does not exist.
+            number_variants(int): Number of variants to generate
+            processes(int, optional): Number of processes. The number of CPUs is used if not
+                given. The variants are written in the current process if it is 1.
+            compact(bool): Writes the JSON files without indentation if True. Default is True.
+
+        Returns:
+            List[str]: Paths to the files written in the order of the index of the variants
+        """
+        os.makedirs(directory, exist_ok=True)
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if processes <= 1 or number_variants <= 1:
+            return self.write_variants(directory, list(range(number_variants)), number_variants,
+                                       compact)
+        # Several chunks per process to balance the load
+        chunk_size = max(1, math.ceil(number_variants / (processes * 4)))
+        chunks = [
+            list(range(start, min(start + chunk_size, number_variants)))
+            for start in range(0, number_variants, chunk_size)
+        ]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(
+                self.write_variants,
+                [directory] * len(chunks),
+                chunks,
+                [number_variants] * len(chunks),
+                [compact] * len(chunks)
+            )
+            return [file_path for file_paths in results for file_path in file_paths]
@@ -25,19 +25,40 @@ Example:
 
         xml_str = system.to_xml_str()
 
+    Many edits can be made in a single transaction. The validation is then done once when the
+    batch is committed and all the edits are rolled back if any of them fails.
+
+        with system.batch():
+            system.add_simulator(OspSimulator(name='ground', source='ground.fmu'))
+            system.add_connection(
+                source=OspVariableEndpoint(simulator='wheel', name='contact'),
+                target=OspVariableEndpoint(simulator='ground', name='contact'),
+                group=True
+            )
+
     If xml file is already available, you can create the system from the file.
 
         system = OspSystemStructure(xml_source=PATH_TO_XML_FILE)
 """
 
+import copy
 import json
 import os
 from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
 from enum import Enum
-from typing import List, Union, Dict
+from functools import lru_cache
+from typing import List, Union, Dict, Any, NamedTuple, Tuple, Iterable, TYPE_CHECKING
 
 import xmlschema
 
+from .utils import intern_names
+
+if TYPE_CHECKING:
+    from .graph import OspConnectionGraph, OspSystemIndex
+    from .model_description import OspModelDescription, Causality
+
 PATH_TO_XML_SCHEMA = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
     'xmlschema',
@@ -45,6 +66,12 @@ PATH_TO_XML_SCHEMA = os.path.join(
 )
 
 
+@lru_cache(maxsize=None)
+def _get_shared_xml_schema() -> xmlschema.XMLSchema:
+    """Returns the XML schema for the system structure shared by the instances"""
+    return xmlschema.XMLSchema(PATH_TO_XML_SCHEMA)
+
+
 class VariableType(Enum):
     """Enum used for variable type for initial values"""
     Real = 'Real'
@@ -69,7 +96,16 @@ class FunctionType(Enum):
 
 
 class OspSystemStructureAbstract(ABC):
-    """Abstract class for most of classes in this module"""
+    """Abstract class for most of classes in this module
+
+    The base classes declare empty slots so that the leaf classes that declare their own, e.g.
+    the endpoints and the initial values, have no instance dictionary. Large systems have many
+    of them. The other classes do not declare slots and have an instance dictionary as usual.
+    """
+    __slots__ = ()
+    #: Attributes for the names to intern. See intern_names.
+    _name_keys = []
+
     @property
     @abstractmethod
     def _required_keys(self):
@@ -95,6 +131,7 @@ class OspSystemStructureAbstract(ABC):
             for key, value in kwargs.items():
                 if key not in self._required_keys:
                     self.__setattr__(key, value)
+        intern_names(self, self._name_keys)
 
     @abstractmethod
     def to_dict_xml(self):
@@ -107,6 +144,7 @@ class OspSystemStructureAbstract(ABC):
 
 class Value(OspSystemStructureAbstract):
     """Base class for value classes for initial values"""
+    __slots__ = ('value',)
     value: Union[None, int, str, bool, float]
     _required_keys = ['value']
 
@@ -125,6 +163,7 @@ class OspInteger(Value):
     The "name" member is used in other application. Please make sure that
     the value is not changed without cross-checking
     """
+    __slots__ = ()
     value: int
     name = 'Integer'
     _required_keys = ['value']
@@ -154,6 +193,7 @@ class OspBoolean(Value):
     The "name" member is used in other application. Please make sure that
     the value is not changed without cross-checking
     """
+    __slots__ = ()
     value: bool
     name = 'Boolean'
     _required_keys = ['value']
@@ -180,6 +220,7 @@ class OspString(Value):
     The "name" member is used in other application. Please make sure that
     the value is not changed without cross-checking
     """
+    __slots__ = ()
     value: str
     name = 'String'
     _required_keys = ['value']
@@ -206,6 +247,7 @@ class OspReal(Value):
     the value is not changed without cross-checking. One should provide 'value' argument
     with initilaization.
     """
+    __slots__ = ()
     value: float
     name = 'Real'
     _required_keys = ['value']
@@ -232,9 +274,11 @@ class OspReal(Value):
 
 
 class OspInitialValue(OspSystemStructureAbstract):
+    __slots__ = ('variable', 'value')
     variable: str
     value: Union[OspReal, OspInteger, OspBoolean, OspString]
     _required_keys = ['variable', 'value']
+    _name_keys = ['variable']
 
     def __init__(self, dict_xml=None, **kwargs):
         """
@@ -298,6 +342,7 @@ class OspSimulator(OspSystemStructureAbstract):
     InitialValues: Union[List[OspInitialValue], None] = None
     fmu_rel_path: str = ''
     _required_keys = ['name', 'source']
+    _name_keys = ['name', 'source']
 
     def __init__(self, dict_xml: Dict = None, **kwargs):
         """Construction method for OspSimulator. 'name' and 'source' are required arguments.
@@ -338,9 +383,11 @@ class OspSimulator(OspSystemStructureAbstract):
 
 
 class OspVariableEndpoint(OspSystemStructureAbstract):
+    __slots__ = ('simulator', 'name')
     simulator: str
     name: str
     _required_keys = ['simulator', 'name']
+    _name_keys = ['simulator', 'name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """
@@ -361,9 +408,11 @@ class OspVariableEndpoint(OspSystemStructureAbstract):
 
 
 class OspSignalEndpoint(OspSystemStructureAbstract):
+    __slots__ = ('function', 'name')
     function: str
     name: str
     _required_keys = ['function', 'name']
+    _name_keys = ['function', 'name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """
@@ -823,12 +872,41 @@ class OspConnections(OspSystemStructureAbstract):
                 return connection
         return False
 
+    def get_connection_graph(
+            self,
+            simulator_names: Iterable[str] = (),
+            function_names: Iterable[str] = (),
+            causalities: Dict[str, Dict[str, 'Causality']] = None,
+            model_descriptions: Dict[str, 'OspModelDescription'] = None
+    ) -> 'OspConnectionGraph':
+        """Returns the graph of the connections between the simulators and the functions
+
+        Args:
+            simulator_names(Iterable[str], optional): Names of the simulators to have the first
+                node ids in the order given, including those without any connection.
+            function_names(Iterable[str], optional): Names of the functions to have the next node
+                ids in the order given.
+            causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables
+                to direct the variable connections. See OspConnectionGraph.
+            model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions to
+                direct the variable group connections. See OspConnectionGraph.
+
+        Returns:
+            OspConnectionGraph: Graph in the compressed sparse row format
+        """
+        from .graph import OspConnectionGraph
+        return OspConnectionGraph(
+            self, simulator_names=simulator_names, function_names=function_names,
+            causalities=causalities, model_descriptions=model_descriptions
+        )
+
 
 class OspLinearTransformationFunction(OspSystemStructureAbstract):
     name: str
     factor: float
     offset: float
     _required_keys = ['name', 'factor', 'offset']
+    _name_keys = ['name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """
@@ -853,6 +931,7 @@ class OspSumFunction(OspSystemStructureAbstract):
     name: str
     inputCount: int
     _required_keys = ['name', 'inputCount']
+    _name_keys = ['name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """
@@ -877,6 +956,7 @@ class OspVectorSumFunction(OspSystemStructureAbstract):
     inputCount: int
     dimension: int
     _required_keys = ['name', 'inputCount', 'dimension']
+    _name_keys = ['name']
 
     def __init__(self, dict_xml: Union[Dict, None] = None, **kwargs):
         """
@@ -962,7 +1042,7 @@ class OspFunctions(OspSystemStructureAbstract):
             return names
 
     # noinspection PyIncorrectDocstring
-    def add_function(self, name: str, function_type: FunctionType, **kwargs):
+    def add_function(self, name: str, function_type: FunctionType, validate: bool = True, **kwargs):
         """Add a function
 
         'factor', 'offset' arguments are required for FunctionType.LinearTransformation
@@ -973,6 +1053,7 @@ class OspFunctions(OspSystemStructureAbstract):
             name: Name of the function
             function_type: Either of FunctionType.LinearTransformation, FunctionType.Sum or
                 FunctionType.VectorSum
+            validate: Checks if the function name is duplicate if True. Default is True.
             factor (float): factor for linear transformation f(x) = factor * x + offset
             offset (float): offset for linear transformation f(x) = factor * x + offset
             inputCount (int): number of inputs for sum or vector sum
@@ -986,10 +1067,11 @@ class OspFunctions(OspSystemStructureAbstract):
             duplicate
         """
         # Check if the function name is not duplicate
-        function_names = self.get_function_names()
-        if function_names is not None:
-            if name in function_names:
-                raise TypeError('The function name already exists.')
+        if validate:
+            function_names = self.get_function_names()
+            if function_names is not None:
+                if name in function_names:
+                    raise TypeError('The function name already exists.')
 
         if function_type == FunctionType.LinearTransformation:
             factor = kwargs.get('factor', None)
@@ -1113,6 +1195,190 @@ class OspFunctions(OspSystemStructureAbstract):
         return False
 
 
+class AttributeSnapshot(NamedTuple):
+    """Value of an attribute before a batch of edits. 'items' is a copy of the content for list"""
+    owner: Any
+    attribute: str
+    value: Any
+    items: Union[List, None]
+
+
+class OspSystemStructureBatch:
+    """Keeps track of a batch of edits on an OspSystemStructure instance
+
+    An attribute is copied once when it is first touched by an edit so that the batch can be
+    rolled back. The simulators, functions and connections added are collected to be validated
+    at once when the batch is committed.
+    """
+
+    def __init__(self, system: 'OspSystemStructure'):
+        self.system = system
+        self.snapshots: Dict[tuple, AttributeSnapshot] = {}
+        self.simulators_added: List[OspSimulator] = []
+        self.functions_added: List[Union[
+            OspLinearTransformationFunction, OspSumFunction, OspVectorSumFunction
+        ]] = []
+        self.connections_added: List[Union[
+            OspVariableConnection,
+            OspSignalConnection,
+            OspVariableGroupConnection,
+            OspSignalGroupConnection
+        ]] = []
+        self.simulator_index: Dict[str, OspSimulator] = {}
+        for simulator in system.Simulators or []:
+            self.simulator_index.setdefault(simulator.name, simulator)
+
+    def snapshot(self, owner: Any, *attributes: str):
+        """Store the values of the attributes if they have not been stored yet"""
+        for attribute in attributes:
+            key = (id(owner), attribute)
+            if key not in self.snapshots:
+                value = getattr(owner, attribute)
+                self.snapshots[key] = AttributeSnapshot(
+                    owner=owner,
+                    attribute=attribute,
+                    value=value,
+                    items=list(value) if isinstance(value, list) else None
+                )
+
+    def rollback(self):
+        """Restore all the attributes touched by the batch"""
+        for snapshot in reversed(list(self.snapshots.values())):
+            if snapshot.items is not None:
+                snapshot.value[:] = snapshot.items
+            setattr(snapshot.owner, snapshot.attribute, snapshot.value)
+        self.snapshots = {}
+
+    def validate(self):
+        """Validates the edits of the batch
+
+        The names of the simulators and functions are counted once for the whole batch.
+
+        Exceptions:
+            TypeError if a simulator or a function added has a duplicate name
+            AssertionError if a connection added refers to a component or a function that is not
+                found in the system
+        """
+        system = self.system
+        simulator_names = Counter(simulator.name for simulator in system.Simulators or [])
+        for simulator in self.simulators_added:
+            if simulator_names[simulator.name] > 1:
+                raise TypeError('The name of the simulator already exists.')
+        function_names = Counter(
+            system.Functions.get_function_names() or [] if system.Functions else []
+        )
+        for function in self.functions_added:
+            if function_names[function.name] > 1:
+                raise TypeError('The function name already exists.')
+        if len(self.connections_added) > 0:
+            assert len(simulator_names) > 0, 'There is no component to connect in the system'
+            for connection in self.connections_added:
+                system.validate_connection_by_names(
+                    connection=connection,
+                    component_names=simulator_names,
+                    function_names=function_names
+                )
+
+
+class OspSystemStructureXmlCache:
+    """Keeps the XML elements encoded for the fragments of a system structure
+
+    Each simulator, function and connection is encoded separately against the XML schema and the
+    element is kept with the JSON of its dictionary as a key. When the system is exported again,
+    only the fragments whose content has changed are encoded and the others are reused. The
+    whole document is reused if nothing has changed.
+    """
+    #: Level of the fragments in the document, e.g. OspSystemStructure/Simulators/Simulator
+    FRAGMENT_LEVEL = 2
+    INDENT = 4
+
+    def __init__(self, xs: xmlschema.XMLSchema):
+        self.namespace = xs.namespaces['osp']
+        self.namespaces = {'': self.namespace}
+        namespaces = {'osp': self.namespace}
+        self.xsd_elements = {
+            container: {
+                element.local_name: element for element in xs.find(
+                    'osp:OspSystemStructure/osp:%s' % container, namespaces
+                ).iterchildren()
+            } for container in ['Simulators', 'Functions', 'Connections']
+        }
+        self.elements: Dict[Tuple[str, str], Any] = {}
+        self.document_key = None
+        self.document = None
+
+    def get_elements(
+            self, container: str, dict_xml: Union[Dict[str, List[Dict]], None], used: Dict
+    ) -> Tuple[List, List]:
+        """Returns the elements and the keys of the fragments in a container
+
+        The elements are taken from the cache or encoded and added to 'used'.
+        """
+        elements = []
+        keys = []
+        for tag, fragments in (dict_xml or {}).items():
+            for fragment in fragments:
+                key = (tag, json.dumps(fragment))
+                element = used.get(key)
+                if element is None:
+                    element = self.elements.get(key)
+                if element is None:
+                    element = self.xsd_elements[container][tag].encode(
+                        fragment, namespaces=self.namespaces, level=self.FRAGMENT_LEVEL
+                    )
+                used[key] = element
+                elements.append(element)
+                keys.append(key)
+        return elements, keys
+
+    def to_xml_str(self, system: 'OspSystemStructure') -> str:
+        """Returns the XML document of the system reusing the elements of unchanged fragments"""
+        used = {}
+        containers = {
+            'Simulators': {'Simulator': [
+                simulator.to_dict_xml() for simulator in system.Simulators or []
+            ]},
+            'Functions': system.Functions.to_dict_xml() if system.Functions else None,
+            'Connections': system.Connections.to_dict_xml() if system.Connections else None,
+        }
+        dict_xml = system.to_dict_xml(include_fragments=False)
+        document_key = [json.dumps(dict_xml)]
+        children = {}
+        for container, container_dict_xml in containers.items():
+            children[container], keys = self.get_elements(container, container_dict_xml, used)
+            document_key.append((container, keys))
+        self.elements = used
+        if document_key == self.document_key:
+            return self.document
+
+        root = xmlschema.from_json(json.dumps(dict_xml), system.xs)
+        for container in ['Functions', 'Connections']:
+            if getattr(system, container):
+                root.append(root.makeelement('{%s}%s' % (self.namespace, container), {}))
+        for container_element in root:
+            container = container_element.tag.split('}')[-1]
+            if container in children:
+                self._set_children(container_element, children[container])
+            container_element.tail = '\n' + ' ' * self.INDENT
+        container_element.tail = '\n'
+        self.document_key = document_key
+        self.document = xmlschema.etree_tostring(root)
+        return self.document
+
+    def _set_children(self, parent, children: List):
+        """Sets the children of a container element indented for the level of the fragments"""
+        del parent[:]
+        if len(children) == 0:
+            parent.text = None
+            return
+        parent.text = '\n' + ' ' * self.INDENT * self.FRAGMENT_LEVEL
+        parent.extend(children[:-1])
+        # The cached element is not modified as it may be used in the middle next time.
+        last_child = copy.copy(children[-1])
+        last_child.tail = '\n' + ' ' * self.INDENT * (self.FRAGMENT_LEVEL - 1)
+        parent.append(last_child)
+
+
 class OspSystemStructure(OspSystemStructureAbstract):
     ALLOWED_ALGORITHM = ['fixedStep']
     StartTime: float = 0.0
@@ -1122,6 +1388,11 @@ class OspSystemStructure(OspSystemStructureAbstract):
     Functions: Union[OspFunctions, None] = None
     Connections: Union[OspConnections, None] = None
     version: str = "0.1"
+    _batch: Union[OspSystemStructureBatch, None] = None
+    _xml_cache: Union[OspSystemStructureXmlCache, None] = None
+    _system_index: Any = None
+    #: Number of the modifications of the system. See mark_modified.
+    _modification_count: int = 0
     _required_keys = []
 
     def __init__(self, dict_xml: Dict = None, xml_source: str = None, **kwargs):
@@ -1144,11 +1415,26 @@ class OspSystemStructure(OspSystemStructureAbstract):
             Functions(List[OspFunctions], optional): Functions for the system given
                 as a list of OspFunction instances
         """
-        self.xs = xmlschema.XMLSchema(PATH_TO_XML_SCHEMA)
+        self.xs = _get_shared_xml_schema()
         if xml_source is not None:
             dict_xml = self.xs.to_dict(xml_source)
         super().__init__(dict_xml=dict_xml, **kwargs)
 
+    def __getstate__(self):
+        # The XML schema is not pickled. The shared one is set when it is used after unpickled.
+        # The cache of the XML elements and the index are not pickled either.
+        state = self.__dict__.copy()
+        state.pop('xs', None)
+        state.pop('_xml_cache', None)
+        state.pop('_system_index', None)
+        return state
+
+    def __getattr__(self, name):
+        if name == 'xs':
+            self.xs = _get_shared_xml_schema()
+            return self.xs
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     # noinspection PyPep8Naming
     @property
     def Algorithm(self):
@@ -1163,24 +1449,29 @@ class OspSystemStructure(OspSystemStructureAbstract):
             raise ValueError(
                 'The algorithm for integration should be either of %s' % self.ALLOWED_ALGORITHM)
 
-    def to_dict_xml(self):
-        xs = xmlschema.XMLSchema(PATH_TO_XML_SCHEMA)
-        dict_xml = {'@xmlns': xs.namespaces['osp']}
+    def to_dict_xml(self, include_fragments: bool = True):
+        """Returns a dictionary of the system for the XML document
+
+        Args:
+            include_fragments(bool): Includes the simulators, functions and connections if True.
+                Otherwise, the value of 'Simulators' is None, as for a system without
+                simulators, and 'Functions' and 'Connections' are omitted. Default is True.
+        """
+        dict_xml = {'@xmlns': self.xs.namespaces['osp']}
         if self.StartTime is not None:
             dict_xml['StartTime'] = self.StartTime
         if self.BaseStepSize is not None:
             dict_xml['BaseStepSize'] = self.BaseStepSize
         dict_xml['Algorithm'] = self._algorithm
-        dict_xml['Simulators'] = {}
-        if self.Simulators:
-            dict_xml['Simulators']['Simulator'] = [
+        if self.Simulators and include_fragments:
+            dict_xml['Simulators'] = {'Simulator': [
                 simulator.to_dict_xml() for simulator in self.Simulators
-            ]
+            ]}
         else:
             dict_xml['Simulators'] = None
-        if self.Functions:
+        if self.Functions and include_fragments:
             dict_xml['Functions'] = self.Functions.to_dict_xml()
-        if self.Connections:
+        if self.Connections and include_fragments:
             dict_xml['Connections'] = self.Connections.to_dict_xml()
         dict_xml['@version'] = self.version
         return dict_xml
@@ -1202,7 +1493,63 @@ class OspSystemStructure(OspSystemStructureAbstract):
             if dict_xml['Connections']:
                 self.Connections = OspConnections(dict_xml=dict_xml['Connections'])
 
+    @contextmanager
+    def batch(self):
+        """Context to edit the system in a single transaction
+
+        The edits made in the context are applied directly, but the validation of the simulators,
+        functions and connections added is deferred until the context exits. It is then done once
+        for all the edits. If an exception is raised in the context or the validation fails, all
+        the edits are rolled back. A batch opened within a batch becomes a part of the outer one.
+
+        Example:
+            with system.batch():
+                system.add_simulator(OspSimulator(name='wheel', source='wheel.fmu'))
+                system.add_connection(source=endpoint1, target=endpoint2, group=False)
+
+        Exceptions:
+            TypeError or AssertionError if the validation fails at the commit. See
+            OspSystemStructureBatch.validate.
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+        self._batch = OspSystemStructureBatch(self)
+        try:
+            yield self._batch
+            self._batch.validate()
+        except BaseException:
+            self._batch.rollback()
+            raise
+        finally:
+            self._batch = None
+            self.mark_modified()
+
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+        if key in ('Simulators', 'Functions', 'Connections'):
+            self.mark_modified()
+
+    def mark_modified(self):
+        """Marks the system as modified so that the index by the names is created again
+
+        The methods of the system that add or delete the elements call it. Call it after
+        editing the elements in place, e.g. renaming a simulator or changing the endpoints
+        of a connection.
+        """
+        self._modification_count += 1
+
     def add_simulator(self, simulator: OspSimulator):
+        self.mark_modified()
+        if self._batch is not None:
+            self._batch.snapshot(self, 'Simulators')
+            self._batch.simulators_added.append(simulator)
+            self._batch.simulator_index.setdefault(simulator.name, simulator)
+            if self.Simulators:
+                self.Simulators.append(simulator)
+            else:
+                self.Simulators = [simulator]
+            return
         if self.Simulators:
             if simulator.name in [Simulator.name for Simulator in self.Simulators]:
                 raise TypeError('The name of the simulator already exists.')
@@ -1219,6 +1566,7 @@ class OspSystemStructure(OspSystemStructureAbstract):
         Returns:
             a simulator(component) deleted.
         """
+        self.mark_modified()
         if self.Simulators:
             try:
                 component = next(
@@ -1226,6 +1574,10 @@ class OspSystemStructure(OspSystemStructureAbstract):
                 )
             except StopIteration:
                 raise TypeError(f'No component if found with the name, {name}')
+            if self._batch is not None:
+                self._batch.snapshot(self, 'Simulators')
+                if self._batch.simulator_index.get(name) is component:
+                    del self._batch.simulator_index[name]
             return self.Simulators.pop(self.Simulators.index(component))
         else:
             raise TypeError('There is no component to delete')
@@ -1261,30 +1613,15 @@ class OspSystemStructure(OspSystemStructureAbstract):
         comp_not_found_err_msg = 'No component is found with the name: '
         func_not_found_err_msg = 'No function is found with the name: '
         assert self.Simulators, no_comp_err_msg
-        component_names = [Simulator.name for Simulator in self.Simulators]
-        function_names = [Function for Function in self.Functions.get_function_names()] \
-            if self.Functions else []
+        component_names = {Simulator.name for Simulator in self.Simulators}
+        function_names = set(self.Functions.get_function_names() or []) \
+            if self.Functions else set()
         if connection:
-            if type(connection) is OspVariableConnection:
-                for endpoint in connection.Variable:
-                    assert endpoint.simulator in component_names, \
-                        f'{comp_not_found_err_msg} {endpoint.simulator}'
-            elif type(connection) is OspVariableGroupConnection:
-                for endpoint in connection.VariableGroup:
-                    assert endpoint.simulator in component_names, \
-                        f'{comp_not_found_err_msg} {endpoint.simulator}'
-            elif type(connection) is OspSignalConnection:
-                assert self.Functions, no_func_err_msg
-                assert connection.Signal.function in function_names, \
-                    f'{func_not_found_err_msg} {connection.Signal.function}'
-                assert connection.Variable.simulator in component_names, \
-                    f'{comp_not_found_err_msg} {connection.Variable.simulator}'
-            elif type(connection) is OspSignalGroupConnection:
-                assert self.Functions, no_func_err_msg
-                assert connection.SignalGroup.function in function_names, \
-                    f'{func_not_found_err_msg} {connection.SignalGroup.function}'
-                assert connection.VariableGroup.simulator in component_names, \
-                    f'{comp_not_found_err_msg} {connection.VariableGroup.simulator}'
+            self.validate_connection_by_names(
+                connection=connection,
+                component_names=component_names,
+                function_names=function_names
+            )
         else:
             if source is None or target is None:
                 raise TypeError('Both source and target should be provided.')
@@ -1303,6 +1640,46 @@ class OspSystemStructure(OspSystemStructureAbstract):
                 assert target.simulator in component_names, \
                     f'{comp_not_found_err_msg} {target.simulator}'
 
+    @staticmethod
+    def validate_connection_by_names(
+            connection: Union[
+                OspVariableConnection,
+                OspSignalConnection,
+                OspVariableGroupConnection,
+                OspSignalGroupConnection
+            ],
+            component_names: Union[set, Dict, Counter],
+            function_names: Union[set, Dict, Counter]
+    ):
+        """Validates connection against the names of the components and the functions given
+
+        Exceptions:
+            AssertionError if a component or function is not found in the names
+        """
+        no_func_err_msg = 'There is no function to connect in the system'
+        comp_not_found_err_msg = 'No component is found with the name: '
+        func_not_found_err_msg = 'No function is found with the name: '
+        if type(connection) is OspVariableConnection:
+            for endpoint in connection.Variable:
+                assert endpoint.simulator in component_names, \
+                    f'{comp_not_found_err_msg} {endpoint.simulator}'
+        elif type(connection) is OspVariableGroupConnection:
+            for endpoint in connection.VariableGroup:
+                assert endpoint.simulator in component_names, \
+                    f'{comp_not_found_err_msg} {endpoint.simulator}'
+        elif type(connection) is OspSignalConnection:
+            assert function_names, no_func_err_msg
+            assert connection.Signal.function in function_names, \
+                f'{func_not_found_err_msg} {connection.Signal.function}'
+            assert connection.Variable.simulator in component_names, \
+                f'{comp_not_found_err_msg} {connection.Variable.simulator}'
+        elif type(connection) is OspSignalGroupConnection:
+            assert function_names, no_func_err_msg
+            assert connection.SignalGroup.function in function_names, \
+                f'{func_not_found_err_msg} {connection.SignalGroup.function}'
+            assert connection.VariableGroup.simulator in component_names, \
+                f'{comp_not_found_err_msg} {connection.VariableGroup.simulator}'
+
     def add_connection(
             self,
             connection: Union[
@@ -1328,6 +1705,19 @@ class OspSystemStructure(OspSystemStructureAbstract):
         Returns:
              connections added
         """
+        self.mark_modified()
+        if self._batch is not None:
+            self._snapshot_connections()
+            if self.Connections is None:
+                self.Connections = OspConnections()
+            if connection:
+                connection = self.Connections.add_connection(connection=connection)
+            else:
+                connection = self.Connections.add_connection(
+                    source=source, target=target, group=group
+                )
+            self._batch.connections_added.append(connection)
+            return connection
         connection_was_none = self.Connections is None
         if self.Connections is None:
             self.Connections = OspConnections()
@@ -1363,7 +1753,10 @@ class OspSystemStructure(OspSystemStructureAbstract):
         Exceptions:
             TypeError: No connection to delete
         """
+        self.mark_modified()
         if self.Connections:
+            if self._batch is not None:
+                self._snapshot_connections()
             connection_deleted = self.Connections.delete_connection(endpoint1, endpoint2)
             if self.Connections.VariableConnection is None and \
                     self.Connections.VariableGroupConnection is None and \
@@ -1380,8 +1773,11 @@ class OspSystemStructure(OspSystemStructureAbstract):
             init_value: OspInitialValue
     ) -> bool:
         """Add or update an initial value to a component"""
+        self.mark_modified()
 
         component = self.get_component_by_name(component_name)
+        if self._batch is not None:
+            self._batch.snapshot(component, 'InitialValues')
         # Search for an initial value among those already exist and update it
         if component.InitialValues:
             try:
@@ -1389,6 +1785,8 @@ class OspSystemStructure(OspSystemStructureAbstract):
                     value for value in component.InitialValues
                     if value.variable == init_value.variable
                 )
+                if self._batch is not None:
+                    self._batch.snapshot(init_value_to_update, 'value')
                 init_value_to_update.value = init_value.value
             except StopIteration:
                 # Create a new initial value otherwise.
@@ -1400,7 +1798,10 @@ class OspSystemStructure(OspSystemStructureAbstract):
 
     def delete_initial_value(self, component_name: str, variable: str) -> bool:
         """Delete an initial value"""
+        self.mark_modified()
         component = self.get_component_by_name(component_name)
+        if self._batch is not None:
+            self._batch.snapshot(component, 'InitialValues')
         try:
             index = next(
                 i for i, value in enumerate(component.InitialValues) if value.variable == variable
@@ -1414,6 +1815,10 @@ class OspSystemStructure(OspSystemStructureAbstract):
 
     def get_component_by_name(self, name: str) -> OspSimulator:
         """Returns a component if it is found with the name given. Unless, a TypeError is raised."""
+        if self._batch is not None:
+            if name in self._batch.simulator_index:
+                return self._batch.simulator_index[name]
+            raise TypeError('The component is not found with the given name.')
         try:
             return next(
                 component for component in self.Simulators if component.name == name
@@ -1445,6 +1850,16 @@ class OspSystemStructure(OspSystemStructureAbstract):
         Exceptions:
             TypeError if correct arguments are not given for a function type
         """
+        self.mark_modified()
+        if self._batch is not None:
+            self._snapshot_functions()
+            if self.Functions is None:
+                self.Functions = OspFunctions()
+            function = self.Functions.add_function(
+                name=function_name, function_type=function_type, validate=False, **kwargs
+            )
+            self._batch.functions_added.append(function)
+            return function
         function_was_none = self.Functions is None
         if function_was_none:
             self.Functions = OspFunctions()
@@ -1472,8 +1887,11 @@ class OspSystemStructure(OspSystemStructureAbstract):
             OspLinearTransformationFunction, OspSumFunction, OspVectorSumFunction, bool:
             deleted function. False if the function is not found.
         """
+        self.mark_modified()
         if self.Functions is None:
             raise TypeError('There is no function.')
+        if self._batch is not None:
+            self._snapshot_functions()
         deleted_function = self.Functions.delete_function(
             name=function_name
         )
@@ -1483,12 +1901,93 @@ class OspSystemStructure(OspSystemStructureAbstract):
             self.Functions = None
         return deleted_function
 
+    def _snapshot_connections(self):
+        """Store the connections in the batch before they are changed"""
+        self._batch.snapshot(self, 'Connections')
+        if self.Connections is not None:
+            self._batch.snapshot(
+                self.Connections, *[interface_type.value for interface_type in InterfaceType]
+            )
+
+    def _snapshot_functions(self):
+        """Store the functions in the batch before they are changed"""
+        self._batch.snapshot(self, 'Functions')
+        if self.Functions is not None:
+            self._batch.snapshot(
+                self.Functions, *[function_type.name for function_type in FunctionType]
+            )
+
     def to_xml_str(self):
-        dict_xml = self.to_dict_xml()
-        return xmlschema.etree_tostring(
-            xmlschema.from_json(json.dumps(dict_xml), self.xs)
+        """Returns the XML document of the system
+
+        The simulators, functions and connections are encoded one by one and the elements are
+        kept in a cache. Exporting again encodes only those that have been added or changed since
+        the last export, whether by the methods of the class or by setting the attributes.
+        """
+        if self._xml_cache is None:
+            self._xml_cache = OspSystemStructureXmlCache(self.xs)
+        return self._xml_cache.to_xml_str(self)
+
+    def get_connection_graph(
+            self,
+            causalities: Dict[str, Dict[str, 'Causality']] = None,
+            model_descriptions: Dict[str, 'OspModelDescription'] = None
+    ) -> 'OspConnectionGraph':
+        """Returns the graph of the connections between the simulators and the functions
+
+        The simulators have the first node ids in the order of 'Simulators' and the functions
+        the next ones in the order of OspFunctions.get_function_names.
+
+        Args:
+            causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables
+                for the simulators given by the simulator names and the variable names to direct
+                the variable connections. See OspConnectionGraph.
+            model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for
+                the simulators given by the simulator names to direct the variable group
+                connections. See OspConnectionGraph.
+
+        Returns:
+            OspConnectionGraph: Graph in the compressed sparse row format
+        """
+        from .graph import OspConnectionGraph
+        return OspConnectionGraph(
+            self.Connections,
+            simulator_names=[simulator.name for simulator in self.Simulators or []],
+            function_names=(self.Functions and self.Functions.get_function_names()) or [],
+            causalities=causalities,
+            model_descriptions=model_descriptions
         )
 
+    def get_system_index(self) -> 'OspSystemIndex':
+        """Returns the adjacency index of the system by the names
+
+        The index is kept until the system is modified. See mark_modified.
+        """
+        from .graph import OspSystemIndex
+        if self._system_index is None or not self._system_index.is_current(self):
+            self._system_index = OspSystemIndex(self)
+        return self._system_index
+
+    def subsystem(self, names: List[str], include_neighbors: int = 0) -> 'OspSystemStructure':
+        """Returns a system with the simulators given and their neighbors
+
+        The simulators connected to the ones given, directly or through a function, are added
+        for 'include_neighbors' hops. The system has copies of the simulators, the connections
+        among them, the functions connected to them and their connections to the simulators.
+
+        Args:
+            names: Names of the simulators to select
+            include_neighbors(optional): Number of hops to the neighbors to add. Default is 0.
+
+        Returns:
+            A new OspSystemStructure
+
+        Exceptions:
+            TypeError if a simulator is not found with a name given
+        """
+        from .graph import get_subsystem
+        return get_subsystem(self, names, include_neighbors, index=self.get_system_index())
+
     def from_xml(self, xml_source: str):
         self.from_dict_xml(self.xs.to_dict(xml_source))
 
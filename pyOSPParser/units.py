@@ -0,0 +1,303 @@
+""" Contains classes for the units of the variables for co-simulation
+from Open Simulation Platform
+
+The units in the unit definitions of the model descriptions are collected into a
+table of NumPy arrays. Each unit is given by the exponents of the SI base units
+and the factor and the offset to convert a value in the unit to the base units:
+
+    value_in_base_units = factor * value + offset
+
+The exponents of a unit are packed into a single integer, the dimension signature,
+so that the units of the same dimension are found by comparing the signatures for
+many pairs of units at once.
+
+Classes:
+    UnitError: Exception raised for the units that cannot be converted
+    UnitTable: Table of the units with their dimensions and conversions to the base units
+    UnitConverter: Converts arrays of values between the units
+
+Functions:
+    get_dimension_signatures: Returns the dimension signatures of the exponents
+
+Attributes:
+    BASE_UNITS(Tuple[str]): Names of the SI base units in the order of the exponents
+
+Example:
+    The units of the model descriptions are collected and looked up by the names.
+
+        table = UnitTable()
+        rows = table.add_units(model_description.UnitDefinition.Unit)
+        is_compatible, factors, offsets = table.get_conversions([rows['km/h']], [rows['m/s']])
+
+    Arrays of values, e.g. the samples logged in a simulation, are converted at once.
+
+        converter = UnitConverter(model_description.UnitDefinition.Unit)
+        speeds_in_km_per_hour = converter.convert(speeds, 'm/s', 'km/h')
+"""
+
+from typing import List, Dict, Tuple, Iterable, Union
+
+import numpy as np
+
+from .model_description import Ospfmi2Unit, OspModelDescription
+
+BASE_UNITS = ('kg', 'm', 's', 'A', 'K', 'mol', 'cd', 'rad')
+_SIGNATURE_OFFSET = 32
+_SIGNATURE_WEIGHTS = (2 * _SIGNATURE_OFFSET) ** np.arange(len(BASE_UNITS), dtype=np.int64)
+
+
+class UnitError(Exception):
+    pass
+
+
+def get_dimension_signatures(exponents: np.ndarray) -> np.ndarray:
+    """Returns the dimension signatures of the exponents of the base units
+
+    The signature packs the exponents as digits of base 64, so two units have the same signature
+    if and only if they have the same dimension.
+
+    Args:
+        exponents(np.ndarray): Exponents of BASE_UNITS in the last axis
+
+    Returns:
+        np.ndarray: Signatures as int64
+
+    Exceptions:
+        UnitError if an exponent is not in [-32, 31]
+    """
+    exponents = np.asarray(exponents, dtype=np.int64)
+    if np.any(exponents < -_SIGNATURE_OFFSET) or np.any(exponents >= _SIGNATURE_OFFSET):
+        raise UnitError(f'The exponents of the base units should be in '
+                        f'[{-_SIGNATURE_OFFSET}, {_SIGNATURE_OFFSET - 1}].')
+    return (exponents + _SIGNATURE_OFFSET) @ _SIGNATURE_WEIGHTS
+
+
+class UnitTable:
+    """Table of the units with their dimensions and conversions to the base units
+
+    The units of the same definition share a row, e.g. 'N' defined in many model descriptions.
+    A display unit has a row of its own with the dimension of its unit and the conversion composed
+    of those of the display unit and the unit.
+
+    Attributes:
+        index(Dict[str, int]): Row of the units by the names. The first definition is kept for a
+            name defined more than once.
+    """
+    index: Dict[str, int]
+
+    def __init__(self, units: Iterable[Ospfmi2Unit] = ()):
+        """Constructor for UnitTable
+
+        Args:
+            units(Iterable[Ospfmi2Unit], optional): Units to add
+        """
+        self.index = {}
+        self._rows: Dict[Tuple, int] = {}
+        self._exponents: List[Tuple[int, ...]] = []
+        self._factors: List[float] = []
+        self._offsets: List[float] = []
+        self._arrays = None
+        self.add_units(units)
+
+    def __len__(self):
+        return len(self._factors)
+
+    def _add_row(self, exponents: Tuple[int, ...], factor: float, offset: float) -> int:
+        key = (exponents, factor, offset)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._factors)
+            self._exponents.append(exponents)
+            self._factors.append(factor)
+            self._offsets.append(offset)
+            self._arrays = None
+        return row
+
+    def add_units(self, units: Union[Iterable[Ospfmi2Unit], None]) -> Dict[str, int]:
+        """Adds the units and their display units to the table
+
+        Args:
+            units(Iterable[Ospfmi2Unit]): Units, e.g. OspUnitDefinitionsType.Unit
+
+        Returns:
+            Dict[str, int]: Row of the units and the display units given by the names
+        """
+        rows = {}
+        for unit in units or []:
+            base_unit = unit.BaseUnit
+            exponents = tuple(int(getattr(base_unit, name)) for name in BASE_UNITS)
+            factor = float(base_unit.factor)
+            offset = float(base_unit.offset)
+            rows[unit.name] = self._add_row(exponents, factor, offset)
+            for display_unit in unit.DisplayUnit or []:
+                # display = factor_d * value + offset_d
+                display_factor = float(display_unit.factor)
+                display_offset = float(display_unit.offset)
+                rows.setdefault(display_unit.name, self._add_row(
+                    exponents,
+                    factor / display_factor,
+                    offset - factor * display_offset / display_factor
+                ))
+        for name, row in rows.items():
+            self.index.setdefault(name, row)
+        return rows
+
+    def add_model_description(self, model_description: OspModelDescription) -> Dict[str, int]:
+        """Adds the units defined in a model description. See add_units"""
+        if model_description.UnitDefinition is None:
+            return {}
+        return self.add_units(model_description.UnitDefinition.Unit)
+
+    def _get_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            exponents = np.array(self._exponents, dtype=np.int64).reshape(-1, len(BASE_UNITS))
+            self._arrays = (
+                exponents,
+                get_dimension_signatures(exponents),
+                np.array(self._factors, dtype=np.float64),
+                np.array(self._offsets, dtype=np.float64)
+            )
+        return self._arrays
+
+    @property
+    def exponents(self) -> np.ndarray:
+        """Exponents of BASE_UNITS for the rows"""
+        return self._get_arrays()[0]
+
+    @property
+    def signatures(self) -> np.ndarray:
+        """Dimension signatures of the rows"""
+        return self._get_arrays()[1]
+
+    @property
+    def factors(self) -> np.ndarray:
+        """Factors to convert the values to the base units for the rows"""
+        return self._get_arrays()[2]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Offsets to convert the values to the base units for the rows"""
+        return self._get_arrays()[3]
+
+    def get_conversions(
+            self, sources: np.ndarray, targets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the conversions from the source units to the target units
+
+        A value is converted as target_value = factor * source_value + offset.
+
+        Args:
+            sources(np.ndarray): Rows of the source units
+            targets(np.ndarray): Rows of the target units
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Whether the units have the same dimension,
+                the factors and the offsets. The factors and the offsets are NaN for the units
+                of different dimensions.
+        """
+        _, signatures, factors, offsets = self._get_arrays()
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        is_compatible = signatures[sources] == signatures[targets]
+        conversion_factors = np.where(
+            is_compatible, factors[sources] / factors[targets], np.nan
+        )
+        conversion_offsets = np.where(
+            is_compatible, (offsets[sources] - offsets[targets]) / factors[targets], np.nan
+        )
+        return is_compatible, conversion_factors, conversion_offsets
+
+
+class UnitConverter:
+    """Converts arrays of values between the units of a UnitTable
+
+    The factor and the offset for a pair of units are computed once and cached, and the values
+    are converted by NumPy as target_value = factor * source_value + offset.
+
+    Attributes:
+        table(UnitTable): Table of the units
+    """
+    table: UnitTable
+
+    def __init__(self, units: Union[Iterable[Ospfmi2Unit], UnitTable] = ()):
+        """Constructor for UnitConverter
+
+        Args:
+            units(Iterable[Ospfmi2Unit] or UnitTable, optional): Units to convert between. The
+                display units of the units can be used as well.
+        """
+        self.table = units if isinstance(units, UnitTable) else UnitTable(units)
+        self._conversions: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+    def _get_row(self, unit: Union[str, Ospfmi2Unit]) -> int:
+        if isinstance(unit, Ospfmi2Unit):
+            return self.table.add_units([unit])[unit.name]
+        row = self.table.index.get(unit)
+        if row is None:
+            raise UnitError(f'The unit, {unit}, is not found.')
+        return row
+
+    def get_conversion(
+            self, source: Union[str, Ospfmi2Unit], target: Union[str, Ospfmi2Unit]
+    ) -> Tuple[float, float]:
+        """Returns the factor and the offset to convert the values from the source unit
+
+        Args:
+            source(str or Ospfmi2Unit): Name of a unit or a display unit, or a unit
+            target(str or Ospfmi2Unit): Name of a unit or a display unit, or a unit
+
+        Returns:
+            Tuple[float, float]: Factor and offset
+
+        Exceptions:
+            UnitError if a unit is not found or the units have different dimensions
+        """
+        key = (self._get_row(source), self._get_row(target))
+        conversion = self._conversions.get(key)
+        if conversion is None:
+            is_compatible, factors, offsets = self.table.get_conversions([key[0]], [key[1]])
+            if not is_compatible[0]:
+                raise UnitError(f'The units, {getattr(source, "name", source)} and '
+                                f'{getattr(target, "name", target)}, have different dimensions.')
+            conversion = self._conversions[key] = (float(factors[0]), float(offsets[0]))
+        return conversion
+
+    def convert(
+            self,
+            values: np.ndarray,
+            source: Union[str, Ospfmi2Unit],
+            target: Union[str, Ospfmi2Unit],
+            out: np.ndarray = None
+    ) -> np.ndarray:
+        """Converts the values from the source unit to the target unit
+
+        Args:
+            values(np.ndarray): Values in the source unit. Any array-like is accepted.
+            source(str or Ospfmi2Unit): Name of a unit or a display unit, or a unit
+            target(str or Ospfmi2Unit): Name of a unit or a display unit, or a unit
+            out(np.ndarray, optional): Float array to store the values converted in. It may be
+                the values themselves to convert in place, which therefore should be a float
+                array. A new float array is created if not given.
+
+        Returns:
+            np.ndarray: Values in the target unit
+
+        Exceptions:
+            UnitError if a unit is not found or the units have different dimensions
+            TypeError if out is not a float array
+        """
+        factor, offset = self.get_conversion(source, target)
+        values = np.asarray(values)
+        if out is None:
+            out = np.empty(values.shape, dtype=np.result_type(values.dtype, np.float64))
+        elif not np.issubdtype(out.dtype, np.floating):
+            raise TypeError(f'The array to store the values converted in should be a float '
+                            f'array, not {out.dtype}')
+        if factor == 1:
+            if out is not values:
+                np.copyto(out, values)
+        else:
+            np.multiply(values, factor, out=out)
+        if offset != 0:
+            np.add(out, offset, out=out)
+        return out
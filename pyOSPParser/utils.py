@@ -0,0 +1,19 @@
+"""Utilities shared by the modules of the documents
+
+Functions:
+    intern_names: Interns the string attributes of an instance
+"""
+import sys
+from typing import Any, Iterable
+
+
+def intern_names(instance: Any, keys: Iterable[str]):
+    """Interns the string attributes of the instance given by the keys
+
+    The names, e.g. of the simulators and the variables, are repeated across the instances of a
+    document and across the documents. Interning them lets the instances share the strings.
+    """
+    for key in keys:
+        value = getattr(instance, key, None)
+        if type(value) is str:
+            setattr(instance, key, sys.intern(value))
@@ -0,0 +1,697 @@
+""" Contains functions for validating the documents for co-simulation
+from Open Simulation Platform against each other
+
+The names used in one document, e.g. the model and variable of events in a
+scenario, are checked against the names defined in the others, e.g. the
+simulators in the system structure and the variables in their model
+descriptions. The names are collected into hash sets once and all the
+problems found are reported together instead of stopping at the first one.
+
+Classes:
+    ValidationIssue: A problem found by a validation
+    ValidationError: Exception that contains the problems found
+    ConnectionCounts: Number of connections to and from the endpoints of a system
+
+Functions:
+    validate_scenario: Validates the events of a scenario against a system
+    structure and the model descriptions of its simulators
+    count_connections: Counts the connections to and from the endpoints of a
+    system
+    validate_connections: Validates that the inputs of a system are driven once
+    validate_system: Validates the endpoints and the initial values of a system
+    against the model descriptions of its simulators
+    validate_causalities: Validates that the variable (group) connections of a
+    system connect inputs to outputs
+    validate_units: Validates that the variable (group) connections of a system
+    connect variables of the same units
+    validate_group_types: Validates that the variable group connections of a
+    system connect groups of the same type and structure
+"""
+
+from collections import Counter
+from typing import NamedTuple, Any, List, Dict, Tuple
+
+import numpy as np
+
+from .cache import ModelDescriptionStore
+from .graph import is_function_output, get_member_causalities, get_connection_directions
+from .model_description import OspModelDescription, Causality, get_variables_in_group, \
+    get_variable_groups_in_group, get_sub_groups, variable_group_types
+from .scenario import OSPScenario, EventAction
+from .system_configuration import OspSystemStructure, FunctionType, InterfaceType
+from .units import UnitTable
+
+
+class ValidationIssue(NamedTuple):
+    """A problem found by a validation
+
+    Attributes:
+        subject: What has the problem, e.g. (model, variable) of events
+        message(str): Description of the problem
+    """
+    subject: Any
+    message: str
+
+
+class ValidationError(Exception):
+    """Exception raised with all the problems found by a validation"""
+
+    def __init__(self, issues: List[ValidationIssue]):
+        self.issues = issues
+        super().__init__('\n'.join(issue.message for issue in issues))
+
+
+def _report(issues: List[ValidationIssue], raise_error: bool) -> List[ValidationIssue]:
+    if raise_error and len(issues) > 0:
+        raise ValidationError(issues)
+    return issues
+
+
+def validate_scenario(
+        scenario: OSPScenario,
+        system: OspSystemStructure,
+        model_descriptions: Dict[str, OspModelDescription] = None,
+        causalities: Dict[str, Dict[str, Causality]] = None,
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates the events of a scenario against a system and the model descriptions
+
+    The events are grouped by (model, variable) in a single pass and each group is checked once:
+        - The model should be a simulator in the system.
+        - The variable should be found in the model description of the simulator if it is given.
+        - The variable should be either an input or an output for override or bias if its
+          causality is given.
+
+    Args:
+        scenario(OSPScenario): Scenario to validate
+        system(OspSystemStructure): System that the scenario is run for
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names. The variables are not checked for the
+            simulators that are not found in it.
+        causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables for
+            the simulators given by the simulator names and the variable names.
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is (model, variable).
+    """
+    simulator_names = {simulator.name for simulator in system.Simulators or []}
+    simulator_variables = {
+        (simulator_name, variable_name)
+        for simulator_name, model_description in (model_descriptions or {}).items()
+        for variable_name in model_description.get_variable_names()
+    }
+    causalities = causalities or {}
+    number_events_by_action = Counter(
+        (event.model, event.variable, event.action) for event in scenario.events
+    )
+    number_events = Counter()
+    modifying_events = Counter()
+    for (model, variable, action), count in number_events_by_action.items():
+        number_events[(model, variable)] += count
+        if action != EventAction.reset.value:
+            modifying_events[(model, variable)] += count
+
+    issues = []
+    for (model, variable), count in number_events.items():
+        key = (model, variable)
+        if model not in simulator_names:
+            issues.append(ValidationIssue(
+                subject=key,
+                message=f'No simulator is found for the model "{model}" ({count} events).'
+            ))
+            continue
+        if model_descriptions and model in model_descriptions and key not in simulator_variables:
+            issues.append(ValidationIssue(
+                subject=key,
+                message=f'No variable "{variable}" is found in the model description of '
+                        f'"{model}" ({count} events).'
+            ))
+            continue
+        if modifying_events[key] > 0 and \
+                causalities.get(model, {}).get(variable, None) == Causality.no_variable:
+            issues.append(ValidationIssue(
+                subject=key,
+                message=f'The variable "{variable}" of "{model}" is neither an input nor an '
+                        f'output and cannot be overridden or biased '
+                        f'({modifying_events[key]} events).'
+            ))
+    return _report(issues, raise_error)
+
+
+class ConnectionCounts(NamedTuple):
+    """Number of connections to and from the endpoints of a system
+
+    The variables and the variable groups are counted by (simulator, name, is_group) and the
+    signals and the signal groups by (function, name, is_group), so that a group and a variable
+    or a signal of the same name are counted separately.
+
+    Attributes:
+        variable_fan_in(Counter): Number of connections into the variables
+        variable_fan_out(Counter): Number of connections from the variables
+        signal_fan_in(Counter): Number of connections into the signals of the functions
+        signal_fan_out(Counter): Number of connections from the signals of the functions
+        unknown_direction(List[Tuple[Tuple[str, str], Tuple[str, str]]]): Endpoints of the
+            variable (group) connections whose direction is not known. They are not counted.
+    """
+    variable_fan_in: Counter
+    variable_fan_out: Counter
+    signal_fan_in: Counter
+    signal_fan_out: Counter
+    unknown_direction: List[Tuple[Tuple[str, str], Tuple[str, str]]]
+
+
+def count_connections(
+        system: OspSystemStructure,
+        causalities: Dict[str, Dict[str, Causality]] = None,
+        model_descriptions: Dict[str, OspModelDescription] = None
+) -> ConnectionCounts:
+    """Counts the connections to and from the endpoints of a system in a single pass
+
+    The direction of the connections is the same as for the connection graph: from the output
+    to the input for the variable (group) connections, whatever the order of the endpoints, and
+    from the function only for the signals whose names start with 'out' for the signal (group)
+    connections. A variable group connection in both directions is counted as a connection into
+    and from both groups. The variable (group) connections whose direction is not known are not
+    counted but listed in 'unknown_direction'.
+
+    Args:
+        system(OspSystemStructure): System to count the connections of
+        causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables for
+            the simulators given by the simulator names and the variable names
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names to direct the variable group connections
+    """
+    counts = ConnectionCounts(Counter(), Counter(), Counter(), Counter(), [])
+    connections = system.Connections
+    if connections is None:
+        return counts
+    directions = get_connection_directions(connections, causalities, model_descriptions)
+    for interface_type, attribute, is_group in [
+        (InterfaceType.Variable, 'Variable', False),
+        (InterfaceType.VariableGroup, 'VariableGroup', True)
+    ]:
+        for connection, (forward, backward) in zip(
+                getattr(connections, interface_type.value) or [], directions[interface_type]
+        ):
+            endpoint1, endpoint2 = getattr(connection, attribute)
+            key1 = (endpoint1.simulator, endpoint1.name, is_group)
+            key2 = (endpoint2.simulator, endpoint2.name, is_group)
+            if forward:
+                counts.variable_fan_out[key1] += 1
+                counts.variable_fan_in[key2] += 1
+            if backward:
+                counts.variable_fan_out[key2] += 1
+                counts.variable_fan_in[key1] += 1
+            if not forward and not backward:
+                counts.unknown_direction.append((key1[:2], key2[:2]))
+    for signal_connections, signal_attribute, variable_attribute, is_group in [
+        (connections.SignalConnection, 'Signal', 'Variable', False),
+        (connections.SignalGroupConnection, 'SignalGroup', 'VariableGroup', True)
+    ]:
+        for connection in signal_connections or []:
+            signal = getattr(connection, signal_attribute)
+            variable = getattr(connection, variable_attribute)
+            signal_key = (signal.function, signal.name, is_group)
+            variable_key = (variable.simulator, variable.name, is_group)
+            if is_function_output(signal.name):
+                counts.signal_fan_out[signal_key] += 1
+                counts.variable_fan_in[variable_key] += 1
+            else:
+                counts.variable_fan_out[variable_key] += 1
+                counts.signal_fan_in[signal_key] += 1
+    return counts
+
+
+def get_function_inputs(system: OspSystemStructure) -> List[Tuple[str, str]]:
+    """Returns the inputs of the functions of a system as (function, signal)
+
+    A linear transformation has an input 'in' and a sum or a vector sum has 'in[0]' to
+    'in[inputCount - 1]'.
+    """
+    if system.Functions is None:
+        return []
+    inputs = []
+    for function in system.Functions.LinearTransformation or []:
+        inputs.append((function.name, 'in'))
+    for function_type in [FunctionType.Sum, FunctionType.VectorSum]:
+        for function in getattr(system.Functions, function_type.name) or []:
+            inputs.extend(
+                (function.name, f'in[{index}]') for index in range(int(function.inputCount))
+            )
+    return inputs
+
+
+def validate_connections(
+        system: OspSystemStructure,
+        counts: ConnectionCounts = None,
+        causalities: Dict[str, Dict[str, Causality]] = None,
+        model_descriptions: Dict[str, OspModelDescription] = None,
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates that every input of a system is driven by exactly one connection
+
+    The problems reported are:
+        - A variable, a variable group or an input of a function driven by more than one
+          connection of any kind, e.g. two variable connections or a signal connection and a
+          variable connection.
+        - An input of a function that is not connected.
+
+    The variable (group) connections are directed by the causalities. Those whose direction is
+    not known are skipped. See count_connections.
+
+    Args:
+        system(OspSystemStructure): System to validate
+        counts(ConnectionCounts, optional): Counts of the connections of the system if they are
+            already given by count_connections
+        causalities(Dict[str, Dict[str, Causality]], optional): Causality of the variables for
+            the simulators given by the simulator names and the variable names. Used only if
+            the counts are not given.
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names. Used only if the counts are not given.
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is (simulator, variable)
+            or (function, signal).
+    """
+    if counts is None:
+        counts = count_connections(system, causalities, model_descriptions)
+    issues = []
+    for (simulator, name, is_group), count in counts.variable_fan_in.items():
+        if count > 1:
+            issues.append(ValidationIssue(
+                subject=(simulator, name),
+                message=f'The variable {"group " if is_group else ""}"{name}" of "{simulator}" '
+                        f'is driven by {count} connections.'
+            ))
+    for (function, name, is_group), count in counts.signal_fan_in.items():
+        if count > 1:
+            issues.append(ValidationIssue(
+                subject=(function, name),
+                message=f'The input {"group " if is_group else ""}"{name}" of the function '
+                        f'"{function}" is driven by {count} connections.'
+            ))
+    for key in get_function_inputs(system):
+        if key + (False,) not in counts.signal_fan_in:
+            issues.append(ValidationIssue(
+                subject=key,
+                message=f'The input "{key[1]}" of the function "{key[0]}" is not connected.'
+            ))
+    return _report(issues, raise_error)
+
+
+def validate_system(
+        system: OspSystemStructure,
+        model_descriptions: Dict[str, OspModelDescription] = None,
+        directory: str = None,
+        store: ModelDescriptionStore = None,
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates the endpoints and the initial values of a system against the model descriptions
+
+    The names of the variables and the variable groups are collected into sets once for each
+    distinct model description and every reference of the system is checked in a single pass:
+        - The simulator of an endpoint should be in the system.
+        - The name of an endpoint of a variable or a signal connection should be a variable in
+          the model description of the simulator.
+        - The name of an endpoint of a variable group or a signal group connection should be a
+          variable group in the model description of the simulator.
+        - The variable of an initial value should be a variable in the model description of the
+          simulator.
+
+    The model descriptions are either given or loaded from the directory of the
+    system. The references are not checked for the simulators without a model description.
+
+    Args:
+        system(OspSystemStructure): System to validate
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names
+        directory(str, optional): Directory of the system structure file to load the model
+            descriptions from if they are not given. See ModelDescriptionStore.load_for_system.
+        store(ModelDescriptionStore, optional): Store to load the model descriptions with. A new
+            store is used if not given.
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is (simulator, name).
+    """
+    if model_descriptions is None:
+        model_descriptions = {}
+        if directory is not None:
+            model_descriptions = (store or ModelDescriptionStore()).load_for_system(
+                system, directory
+            )
+    simulator_names = {simulator.name for simulator in system.Simulators or []}
+
+    # The instances are shared by the simulators of the same FMU in a store
+    names_by_model_description = {}
+    variable_names = {}
+    variable_group_names = {}
+    for simulator_name, model_description in model_descriptions.items():
+        key = id(model_description)
+        if key not in names_by_model_description:
+            names_by_model_description[key] = (
+                model_description.get_variable_names(),
+                model_description.get_variable_group_names()
+            )
+        variable_names[simulator_name], variable_group_names[simulator_name] = \
+            names_by_model_description[key]
+
+    # Number of references by (simulator, name, is_group, is_initial_value)
+    references = Counter()
+    connections = system.Connections
+    if connections is not None:
+        for connection in connections.VariableConnection or []:
+            for endpoint in connection.Variable:
+                references[(endpoint.simulator, endpoint.name, False, False)] += 1
+        for connection in connections.SignalConnection or []:
+            references[(connection.Variable.simulator, connection.Variable.name, False, False)] += 1
+        for connection in connections.VariableGroupConnection or []:
+            for endpoint in connection.VariableGroup:
+                references[(endpoint.simulator, endpoint.name, True, False)] += 1
+        for connection in connections.SignalGroupConnection or []:
+            endpoint = connection.VariableGroup
+            references[(endpoint.simulator, endpoint.name, True, False)] += 1
+    for simulator in system.Simulators or []:
+        for initial_value in simulator.InitialValues or []:
+            references[(simulator.name, initial_value.variable, False, True)] += 1
+
+    issues = []
+    for (simulator, name, is_group, is_initial_value), count in references.items():
+        if simulator not in simulator_names:
+            issues.append(ValidationIssue(
+                subject=(simulator, name),
+                message=f'No simulator is found for "{simulator}" referred to by '
+                        f'{count} endpoints.'
+            ))
+        elif simulator not in model_descriptions:
+            continue
+        elif is_group and name not in variable_group_names[simulator]:
+            issues.append(ValidationIssue(
+                subject=(simulator, name),
+                message=f'No variable group "{name}" is found in the model description of '
+                        f'"{simulator}" ({count} endpoints).'
+            ))
+        elif not is_group and name not in variable_names[simulator]:
+            referred_by = 'the initial value' if is_initial_value else f'{count} endpoints'
+            issues.append(ValidationIssue(
+                subject=(simulator, name),
+                message=f'No variable "{name}" is found in the model description of '
+                        f'"{simulator}" ({referred_by}).'
+            ))
+    return _report(issues, raise_error)
+
+
+def _is_same_direction(causality1: Causality, causality2: Causality) -> bool:
+    return causality1 == causality2 and causality1 in (Causality.input, Causality.output)
+
+
+def validate_causalities(
+        system: OspSystemStructure,
+        causalities: Dict[str, Dict[str, Causality]],
+        model_descriptions: Dict[str, OspModelDescription] = None,
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates that the variable and variable group connections connect inputs to outputs
+
+    Both ends of every variable connection are looked up in the causality maps of the simulators
+    and the connection is reported if they are both inputs or both outputs. For a variable group
+    connection, the variables of the groups are paired in order and every pair is checked in the
+    same way. The variables of a group are found once for each distinct model description so
+    that the system is validated in a time linear in the number of the connections. The
+    connections whose causality is not known are skipped, as are the group connections whose
+    groups have different numbers of variables.
+
+    Args:
+        system(OspSystemStructure): System to validate
+        causalities(Dict[str, Dict[str, Causality]]): Causality of the variables for the
+            simulators given by the simulator names and the variable names
+        model_descriptions(Dict[str, OspModelDescription], optional): Model descriptions for the
+            simulators given by the simulator names. The variable group connections are checked
+            only for the simulators found in it.
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is
+            ((simulator1, name1), (simulator2, name2)) of the endpoints of the connection.
+    """
+    member_causalities_by_model_description = {}
+    member_causalities = {}
+    for simulator_name, model_description in (model_descriptions or {}).items():
+        key = (id(model_description), id(causalities.get(simulator_name)))
+        if key not in member_causalities_by_model_description:
+            member_causalities_by_model_description[key] = get_member_causalities(
+                model_description, causalities.get(simulator_name, {})
+            )
+        member_causalities[simulator_name] = member_causalities_by_model_description[key]
+
+    issues = []
+    connections = system.Connections
+    if connections is None:
+        return issues
+    for connection in connections.VariableConnection or []:
+        endpoint1, endpoint2 = connection.Variable
+        causality = causalities.get(endpoint1.simulator, {}).get(endpoint1.name)
+        if _is_same_direction(
+                causality, causalities.get(endpoint2.simulator, {}).get(endpoint2.name)
+        ):
+            issues.append(ValidationIssue(
+                subject=((endpoint1.simulator, endpoint1.name),
+                         (endpoint2.simulator, endpoint2.name)),
+                message=f'The variables "{endpoint1.name}" of "{endpoint1.simulator}" and '
+                        f'"{endpoint2.name}" of "{endpoint2.simulator}" are both '
+                        f'{causality.name}s.'
+            ))
+    for connection in connections.VariableGroupConnection or []:
+        endpoint1, endpoint2 = connection.VariableGroup
+        group_causalities1 = member_causalities.get(endpoint1.simulator, {}).get(endpoint1.name)
+        group_causalities2 = member_causalities.get(endpoint2.simulator, {}).get(endpoint2.name)
+        if group_causalities1 is None or group_causalities2 is None or \
+                len(group_causalities1) != len(group_causalities2):
+            continue
+        same_directions = [
+            (index, causality1)
+            for index, (causality1, causality2) in enumerate(
+                zip(group_causalities1, group_causalities2)
+            ) if _is_same_direction(causality1, causality2)
+        ]
+        if len(same_directions) > 0:
+            pairs = ', '.join(
+                f'#{index} ({causality.name}s)' for index, causality in same_directions
+            )
+            issues.append(ValidationIssue(
+                subject=((endpoint1.simulator, endpoint1.name),
+                         (endpoint2.simulator, endpoint2.name)),
+                message=f'The variable groups "{endpoint1.name}" of "{endpoint1.simulator}" and '
+                        f'"{endpoint2.name}" of "{endpoint2.simulator}" connect variables of '
+                        f'the same causality: {pairs}.'
+            ))
+    return _report(issues, raise_error)
+
+
+def validate_units(
+        system: OspSystemStructure,
+        model_descriptions: Dict[str, OspModelDescription],
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates that the variable and variable group connections connect the same units
+
+    The units of the model descriptions are collected into a UnitTable and the variables of both
+    ends of the connections are resolved to the rows of their units, pairing the variables of
+    the groups in order. All the pairs are then checked at once by their dimension signatures.
+    The problems reported are:
+        - The units of the variables connected have different dimensions.
+        - The units have the same dimension but differ in the scale or the offset, e.g. km/h and
+          m/s. The conversion needed is given in the message.
+
+    The variables without a unit and the groups of different numbers of variables are skipped.
+
+    Args:
+        system(OspSystemStructure): System to validate
+        model_descriptions(Dict[str, OspModelDescription]): Model descriptions for the
+            simulators given by the simulator names
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is
+            ((simulator1, variable1), (simulator2, variable2)) of the variables connected.
+    """
+    table = UnitTable()
+    tables_by_model_description = {}
+    unit_rows = {}
+    group_members = {}
+    for simulator_name, model_description in model_descriptions.items():
+        key = id(model_description)
+        if key not in tables_by_model_description:
+            rows = table.add_model_description(model_description)
+            tables_by_model_description[key] = (
+                {
+                    variable.ref: (rows[variable.unit], variable.unit)
+                    for variable in get_variables_in_group(model_description.VariableGroups)
+                    if variable.unit in rows
+                },
+                {
+                    var_group.name: [
+                        variable.ref for variable in get_variables_in_group(var_group)
+                    ] for var_group in get_variable_groups_in_group(
+                        model_description.VariableGroups
+                    )
+                }
+            )
+        unit_rows[simulator_name], group_members[simulator_name] = \
+            tables_by_model_description[key]
+
+    pairs = []
+    connections = system.Connections
+    if connections is not None:
+        for connection in connections.VariableConnection or []:
+            endpoint1, endpoint2 = connection.Variable
+            pairs.append(((endpoint1.simulator, endpoint1.name),
+                          (endpoint2.simulator, endpoint2.name)))
+        for connection in connections.VariableGroupConnection or []:
+            endpoint1, endpoint2 = connection.VariableGroup
+            members1 = group_members.get(endpoint1.simulator, {}).get(endpoint1.name)
+            members2 = group_members.get(endpoint2.simulator, {}).get(endpoint2.name)
+            if members1 is None or members2 is None or len(members1) != len(members2):
+                continue
+            pairs.extend(
+                ((endpoint1.simulator, variable1), (endpoint2.simulator, variable2))
+                for variable1, variable2 in zip(members1, members2)
+            )
+    pairs = [
+        pair for pair in pairs
+        if pair[0][1] in unit_rows.get(pair[0][0], {}) and
+        pair[1][1] in unit_rows.get(pair[1][0], {})
+    ]
+    if len(pairs) == 0:
+        return _report([], raise_error)
+
+    units = [
+        (unit_rows[simulator1][variable1], unit_rows[simulator2][variable2])
+        for (simulator1, variable1), (simulator2, variable2) in pairs
+    ]
+    is_compatible, factors, offsets = table.get_conversions(
+        np.array([unit1[0] for unit1, _ in units]), np.array([unit2[0] for _, unit2 in units])
+    )
+    needs_conversion = is_compatible & ~(np.isclose(factors, 1) & np.isclose(offsets, 0))
+
+    issues = []
+    for i in np.flatnonzero(~is_compatible | needs_conversion).tolist():
+        (simulator1, variable1), (simulator2, variable2) = pairs[i]
+        (_, unit1), (_, unit2) = units[i]
+        variables = f'"{variable1}" of "{simulator1}" in {unit1} and ' \
+                    f'"{variable2}" of "{simulator2}" in {unit2}'
+        if is_compatible[i]:
+            message = f'The variables {variables} need a conversion: ' \
+                      f'{variable2} = {factors[i]:g} * {variable1} + {offsets[i]:g}.'
+        else:
+            message = f'The variables {variables} have units of different dimensions.'
+        issues.append(ValidationIssue(subject=pairs[i], message=message))
+    return _report(issues, raise_error)
+
+
+class _GroupTypeInfo(NamedTuple):
+    type_name: str
+    number_variables: int
+    structure: Tuple
+
+
+def _get_group_type_infos(
+        model_description: OspModelDescription, type_names: Dict[type, str]
+) -> Dict[str, _GroupTypeInfo]:
+    """Returns the type, the number of variables and the structure of the groups by the names
+
+    The structure of a group is (type name, number of variables directly in the group,
+    structures of the sub groups) and is computed once for each group from the bottom up.
+    """
+    infos = {}
+
+    def get_info(var_group) -> _GroupTypeInfo:
+        sub_infos = [get_info(sub_group) for sub_group in get_sub_groups(var_group)]
+        number_variables = len(getattr(var_group, 'Variable', None) or [])
+        info = _GroupTypeInfo(
+            type_name=type_names[type(var_group)],
+            number_variables=number_variables + sum(
+                sub_info.number_variables for sub_info in sub_infos
+            ),
+            structure=(
+                type_names[type(var_group)],
+                number_variables,
+                tuple(sub_info.structure for sub_info in sub_infos)
+            )
+        )
+        infos.setdefault(var_group.name, info)
+        return info
+
+    if model_description.VariableGroups is not None:
+        for var_group in get_sub_groups(model_description.VariableGroups):
+            get_info(var_group)
+    return infos
+
+
+def validate_group_types(
+        system: OspSystemStructure,
+        model_descriptions: Dict[str, OspModelDescription],
+        raise_error: bool = False
+) -> List[ValidationIssue]:
+    """Validates that the variable group connections connect groups of the same type
+
+    The groups of the model descriptions are indexed once by the names with their types from
+    variable_group_types, and all the variable group connections are checked in a single pass.
+    The problems reported are, in the order checked:
+        - The groups are of different types, e.g. LinearMechanicalPort and Force.
+        - The groups have different numbers of variables.
+        - The sub groups of the groups differ in the types or the numbers of variables.
+
+    The groups not found in the model descriptions are skipped. See validate_system for them.
+
+    Args:
+        system(OspSystemStructure): System to validate
+        model_descriptions(Dict[str, OspModelDescription]): Model descriptions for the
+            simulators given by the simulator names
+        raise_error(bool): Raises ValidationError if any problem is found. Default is False.
+
+    Returns:
+        List[ValidationIssue]: Problems found. The subject of an issue is
+            ((simulator1, group1), (simulator2, group2)) of the groups connected.
+    """
+    type_names = {value['class']: name for name, value in variable_group_types.items()}
+    infos_by_model_description = {}
+    group_infos = {}
+    for simulator_name, model_description in model_descriptions.items():
+        key = id(model_description)
+        if key not in infos_by_model_description:
+            infos_by_model_description[key] = _get_group_type_infos(
+                model_description, type_names
+            )
+        group_infos[simulator_name] = infos_by_model_description[key]
+
+    issues = []
+    connections = system.Connections
+    if connections is None:
+        return _report(issues, raise_error)
+    for connection in connections.VariableGroupConnection or []:
+        endpoint1, endpoint2 = connection.VariableGroup
+        info1 = group_infos.get(endpoint1.simulator, {}).get(endpoint1.name)
+        info2 = group_infos.get(endpoint2.simulator, {}).get(endpoint2.name)
+        if info1 is None or info2 is None:
+            continue
+        groups = f'"{endpoint1.name}" of "{endpoint1.simulator}" and ' \
+                 f'"{endpoint2.name}" of "{endpoint2.simulator}"'
+        if info1.type_name != info2.type_name:
+            message = f'The variable groups {groups} are of different types: ' \
+                      f'{info1.type_name} and {info2.type_name}.'
+        elif info1.number_variables != info2.number_variables:
+            message = f'The variable groups {groups} have different numbers of variables: ' \
+                      f'{info1.number_variables} and {info2.number_variables}.'
+        elif info1.structure != info2.structure:
+            message = f'The variable groups {groups} have sub groups of different types ' \
+                      f'or sizes.'
+        else:
+            continue
+        issues.append(ValidationIssue(
+            subject=((endpoint1.simulator, endpoint1.name), (endpoint2.simulator, endpoint2.name)),
+            message=message
+        ))
+    return _report(issues, raise_error)
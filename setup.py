@@ -1,12 +1,18 @@
+import re
+
 from setuptools import find_packages, setup
 
 # Use README.md as the long_description for the package
 with open("README.md", "r") as readme_file:
     long_description = readme_file.read()
 
+# Use the version defined in the package
+with open("pyOSPParser/__init__.py", "r") as init_file:
+    version = re.search(r"__version__ = '(.+)'", init_file.read()).group(1)
+
 setup(
     name="pyOSPParser",
-    version="0.5.0",
+    version=version,
     url="https://github.com/kevinksyTRD/pyOSPParser",
     description="A module to parse or deploy XML/JSON files for Open Simulation Platform.",
     long_description_content_type="text/markdown",
@@ -28,7 +34,8 @@ setup(
         'xmlschema~=1.2.2'
     ],
     install_requires=[
-        'xmlschema~=1.2.2'
+        'xmlschema~=1.2.2',
+        'numpy>=1.19'
     ],
     python_requires=">=3.8",
     keywords="Open-Simulation-Platform Parser XML JSON",
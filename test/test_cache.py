@@ -0,0 +1,252 @@
+import os
+import shutil
+
+import pytest
+
+from pyOSPParser import __version__
+from pyOSPParser.cache import ParseCache, DiskCache, ModelDescriptionStore, \
+    get_file_signature, main
+from pyOSPParser.logging_configuration import OspLoggingConfiguration, OspSimulatorForLogging, \
+    OspVariableForLogging
+from pyOSPParser.model_description import OspModelDescription
+from pyOSPParser.system_configuration import OspSystemStructure, OspSimulator
+
+path_to_test_file_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+PATH_TO_TEST_SYSTEM_STRUCTURE = os.path.join(
+    path_to_test_file_dir, 'OspSystemStructure_QT_for_parsing_testing.xml'
+)
+PATH_TO_TEST_MODEL_DESCRIPTION = os.path.join(
+    path_to_test_file_dir, 'chassis_OspModelDescription.xml'
+)
+
+
+def test_parse_cache(tmp_path):
+    path = str(tmp_path / 'OspSystemStructure.xml')
+    shutil.copy(PATH_TO_TEST_SYSTEM_STRUCTURE, path)
+    cache = ParseCache()
+
+    # Test if the file is parsed only once
+    system = cache.load(OspSystemStructure, path)
+    system_copy = cache.load(OspSystemStructure, path)
+    info = cache.info()
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    assert info.size > 0
+    assert system is not system_copy
+    assert system_copy.to_dict_xml() == OspSystemStructure(xml_source=path).to_dict_xml()
+
+    # Test if the copies are independent of the cache
+    system_copy.delete_simulator('chassis')
+    assert 'chassis' in [simulator.name for simulator in cache.load(
+        OspSystemStructure, path
+    ).Simulators]
+
+    # Test if the shared instance is returned without copy
+    assert cache.load(OspSystemStructure, path, copy=False) is \
+        cache.load(OspSystemStructure, path, copy=False)
+
+    # Test if an edit of the file is detected
+    system.delete_simulator('ground')
+    with open(path, 'wt') as file:
+        file.write(system.to_xml_str())
+    system_edited = cache.load(OspSystemStructure, path)
+    assert 'ground' not in [simulator.name for simulator in system_edited.Simulators]
+    assert cache.info().misses == 2
+
+    # Test if the documents of different types are cached separately
+    log_path = str(tmp_path / 'LogConfig.xml')
+    logging_config = OspLoggingConfiguration(simulators=[
+        OspSimulatorForLogging(
+            name='chassis',
+            decimation_factor=10,
+            variables=[OspVariableForLogging(name='velocity')]
+        )
+    ])
+    with open(log_path, 'wt') as file:
+        file.write(logging_config.to_xml_str())
+    assert cache.load(OspLoggingConfiguration, log_path).to_dict_xml() == \
+        logging_config.to_dict_xml()
+    assert cache.info().entries == 2
+
+    cache.invalidate(path)
+    assert cache.info().entries == 1
+    cache.clear()
+    assert cache.info().entries == 0
+
+
+def test_parse_cache_with_content_hash(tmp_path):
+    path = str(tmp_path / 'chassis_OspModelDescription.xml')
+    shutil.copy(PATH_TO_TEST_MODEL_DESCRIPTION, path)
+    cache = ParseCache(hash_content=True)
+    model_description = cache.load(OspModelDescription, path)
+
+    # Change the content keeping the size and the modification time
+    signature = get_file_signature(path)
+    with open(path, 'rt') as file:
+        content = file.read()
+    with open(path, 'wt') as file:
+        file.write(content.replace('name="linear mechanical port"', 'name="linear_mechanical_port"'))
+    os.utime(path, ns=(signature.mtime_ns, signature.mtime_ns))
+    assert get_file_signature(path)[:2] == signature[:2]
+
+    model_description_edited = cache.load(OspModelDescription, path)
+    assert cache.info().misses == 2
+    assert model_description_edited.to_dict() != model_description.to_dict()
+
+
+def test_parse_cache_eviction(tmp_path):
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f'OspSystemStructure{i}.xml')
+        shutil.copy(PATH_TO_TEST_SYSTEM_STRUCTURE, path)
+        paths.append(path)
+    cache = ParseCache()
+    cache.load(OspSystemStructure, paths[0])
+    size = cache.info().size
+
+    # Only two documents fit in the budget and the least recently used one is evicted
+    cache = ParseCache(max_size=2 * size)
+    cache.load(OspSystemStructure, paths[0])
+    cache.load(OspSystemStructure, paths[1])
+    cache.load(OspSystemStructure, paths[0])
+    cache.load(OspSystemStructure, paths[2])
+    info = cache.info()
+    assert (info.entries, info.evictions) == (2, 1)
+    assert info.size <= info.max_size
+    cache.load(OspSystemStructure, paths[0])
+    assert cache.info().hits == 2
+
+    # A document larger than the budget is not cached
+    cache = ParseCache(max_size=1)
+    cache.load(OspSystemStructure, paths[0])
+    assert cache.info().entries == 0
+
+
+def test_disk_cache(tmp_path):
+    path = str(tmp_path / 'chassis_OspModelDescription.xml')
+    shutil.copy(PATH_TO_TEST_MODEL_DESCRIPTION, path)
+    disk_cache = DiskCache(directory=str(tmp_path / 'cache'))
+
+    # Test if the document is parsed once and loaded from the directory by other caches
+    model_description = disk_cache.load(OspModelDescription, path)
+    disk_cache = DiskCache(directory=disk_cache.directory)
+    model_description_loaded = disk_cache.load(OspModelDescription, path)
+    info = disk_cache.info()
+    assert (info.hits, info.misses, info.entries) == (1, 0, 1)
+    assert model_description_loaded.to_dict() == model_description.to_dict()
+    assert model_description_loaded.to_xml_str() == model_description.to_xml_str()
+
+    # Test if the entry is shared by the files with the same content
+    path_copy = str(tmp_path / 'chassis_copy_OspModelDescription.xml')
+    shutil.copy(path, path_copy)
+    disk_cache.load(OspModelDescription, path_copy)
+    assert disk_cache.info().hits == 2
+
+    # Test if the memory cache loads from the directory
+    cache = ParseCache(disk_cache=disk_cache)
+    system_path = str(tmp_path / 'OspSystemStructure.xml')
+    shutil.copy(PATH_TO_TEST_SYSTEM_STRUCTURE, system_path)
+    system = cache.load(OspSystemStructure, system_path)
+    cache.clear()
+    assert cache.load(OspSystemStructure, system_path).to_dict_xml() == system.to_dict_xml()
+    assert disk_cache.info().hits == 3
+    entries = disk_cache.entries()
+    assert [entry.document_type for entry in entries] == \
+        ['OspModelDescription', 'OspSystemStructure']
+    assert all(entry.version == __version__ for entry in entries)
+    # Other pickle files in the directory are not entries
+    with open(os.path.join(disk_cache.directory, 'notes.pickle'), 'wb') as file:
+        file.write(b'')
+    assert len(disk_cache.entries()) == 2
+
+    # Test if a corrupted entry is parsed again
+    with open(entries[0].path, 'wb') as file:
+        file.write(b'corrupted')
+    assert disk_cache.load(OspModelDescription, path).to_dict() == model_description.to_dict()
+    assert disk_cache.info().misses == 2
+
+    # Test if the least recently used entry is removed above the size cap
+    os.utime(entries[1].path, (0, 0))
+    assert disk_cache.prune(max_size=disk_cache.info().size - 1) == 1
+    assert [entry.document_type for entry in disk_cache.entries()] == ['OspModelDescription']
+    assert disk_cache.clear() == 1
+    assert disk_cache.info().entries == 0
+
+
+def test_disk_cache_cli(tmp_path, capsys):
+    directory = str(tmp_path / 'cache')
+    disk_cache = DiskCache(directory=directory)
+    disk_cache.load(OspModelDescription, PATH_TO_TEST_MODEL_DESCRIPTION)
+    disk_cache.load(OspSystemStructure, PATH_TO_TEST_SYSTEM_STRUCTURE)
+
+    main(['--directory', directory, 'info'])
+    assert 'Entries:   2' in capsys.readouterr().out
+    main(['--directory', directory, 'list'])
+    output = capsys.readouterr().out
+    assert 'OspModelDescription' in output and 'OspSystemStructure' in output
+    main(['--directory', directory, 'prune', '--max-size', '1000'])
+    assert 'Removed 0 entries' in capsys.readouterr().out
+    main(['--directory', directory, 'clear'])
+    assert 'Removed 2 entries' in capsys.readouterr().out
+
+
+def test_model_description_store(tmp_path):
+    for name in ['chassis', 'wheel']:
+        shutil.copy(
+            os.path.join(path_to_test_file_dir, f'{name}_OspModelDescription.xml'),
+            str(tmp_path / f'{name}_OspModelDescription.xml')
+        )
+    os.makedirs(str(tmp_path / 'fmus'))
+    shutil.copy(
+        os.path.join(path_to_test_file_dir, 'wheel_OspModelDescription.xml'),
+        str(tmp_path / 'fmus' / 'wheel_OspModelDescription.xml')
+    )
+    system = OspSystemStructure()
+    for name, source in [
+        ('chassis', 'chassis.fmu'),
+        ('wheel_front', 'wheel.fmu'),
+        ('wheel_rear', 'wheel.fmu'),
+        ('wheel_spare', 'fmus/wheel.fmu'),
+        ('ground', 'ground.fmu'),
+    ]:
+        system.add_simulator(OspSimulator(dict_xml={'@name': name, '@source': source}))
+
+    store = ModelDescriptionStore()
+    model_descriptions = store.load_for_system(system, str(tmp_path), max_workers=2)
+
+    # The simulators without a model description file are omitted
+    assert set(model_descriptions) == {'chassis', 'wheel_front', 'wheel_rear', 'wheel_spare'}
+
+    # The same instance is shared for the same content even from another path
+    assert len(store) == 2
+    assert model_descriptions['wheel_front'] is model_descriptions['wheel_rear']
+    assert model_descriptions['wheel_front'] is model_descriptions['wheel_spare']
+    assert model_descriptions['chassis'] is store.load(str(tmp_path / 'chassis_OspModelDescription.xml'))
+    assert model_descriptions['chassis'].to_dict() == \
+        OspModelDescription(xml_source=PATH_TO_TEST_MODEL_DESCRIPTION).to_dict()
+    with pytest.raises(TypeError):
+        model_descriptions['chassis'].version = '2.0'
+    # The same model descriptions are decoded in the current process
+    model_descriptions_serial = ModelDescriptionStore().load_for_system(
+        system, str(tmp_path), max_workers=1
+    )
+    assert {name: model_description.to_dict()
+            for name, model_description in model_descriptions_serial.items()} == \
+        {name: model_description.to_dict()
+         for name, model_description in model_descriptions.items()}
+
+    # A file changed on disk is loaded again
+    path = str(tmp_path / 'fmus' / 'wheel_OspModelDescription.xml')
+    with open(path, 'at') as file:
+        file.write('\n')
+    assert store.load_for_system(system, str(tmp_path))['wheel_spare'] is not \
+        model_descriptions['wheel_spare']
+    assert len(store) == 3
+
+    # The store loads the model descriptions from a cache directory
+    disk_cache = DiskCache(directory=str(tmp_path / 'cache'))
+    ModelDescriptionStore(disk_cache=disk_cache).load_for_system(system, str(tmp_path))
+    model_descriptions = ModelDescriptionStore(disk_cache=disk_cache).load_for_system(
+        system, str(tmp_path)
+    )
+    assert disk_cache.info().hits == 3
+    assert model_descriptions['wheel_front'] is model_descriptions['wheel_rear']
@@ -0,0 +1,506 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from pyOSPParser.graph import OspConnectionGraph, NodeKind, INTERFACE_TYPES, OspGraphEdge, \
+    get_stepping_plan, split_system, write_systems, get_connection_directions, UNKNOWN_DIRECTION
+from pyOSPParser.model_description import OspModelDescription, Causality
+from pyOSPParser.system_configuration import OspSystemStructure, OspConnections, \
+    OspVariableEndpoint, OspSignalEndpoint, InterfaceType, OspSimulator, FunctionType, \
+    OspVariableConnection, OspInitialValue, OspReal, OspVariableGroupConnection
+
+path_to_test_file_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+PATH_TO_TEST_SYSTEM_STRUCTURE = os.path.join(
+    path_to_test_file_dir, 'OspSystemStructure_QT_for_parsing_testing.xml'
+)
+
+
+def get_causalities(names, outputs=('y',), inputs=('u',)):
+    causality = {name: Causality.output for name in outputs}
+    causality.update({name: Causality.input for name in inputs})
+    return {name: causality for name in names}
+
+
+def get_test_system_causalities():
+    with open(os.path.join(path_to_test_file_dir, 'fmu.json'), 'rt') as file:
+        fmus = json.load(file)
+    return {
+        fmu['name']: {
+            **{name: Causality.input for name in fmu['inputs']},
+            **{name: Causality.output for name in fmu['outputs']}
+        } for fmu in fmus
+    }
+
+
+def get_edges(graph: OspConnectionGraph):
+    return sorted(
+        (
+            graph.node_names[source], graph.source_endpoints[edge],
+            graph.node_names[target], graph.target_endpoints[edge],
+            INTERFACE_TYPES[graph.edge_kinds[edge]]
+        )
+        for source, target, edge in zip(
+            graph.get_sources(), graph.indices, range(graph.number_edges)
+        )
+    )
+
+
+def test_connection_graph_of_system():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    graph = system.get_connection_graph()
+
+    # Simulators, functions and then the undefined functions referred to by the connections
+    assert graph.node_names.tolist() == [
+        'chassis', 'wheel', 'ground', 'LTF', 'sumSpeed1', 'sumSpeed2', 'Sum',
+        'LinearTransformation'
+    ]
+    assert graph.node_kinds.tolist() == [0] * 3 + [1] * 5
+    assert graph.get_node_id('LTF', NodeKind.function) == 3
+    with pytest.raises(KeyError):
+        graph.get_node_id('LTF')
+
+    assert graph.number_edges == 5
+    assert graph.indptr.tolist() == [0, 1, 4, 5, 5, 5, 5, 5, 5]
+    assert get_edges(graph) == [
+        ('chassis', 'p.e', 'wheel', 'p1.e', InterfaceType.Variable),
+        ('ground', 'contact', 'LinearTransformation', 'LTF', InterfaceType.SignalGroup),
+        ('wheel', 'p.f', 'Sum', 'sumSpeed', InterfaceType.Signal),
+        ('wheel', 'p1.f', 'chassis', 'p.f', InterfaceType.Variable),
+        ('wheel', 'shaft', 'chassis', 'shaft', InterfaceType.VariableGroup),
+    ]
+    chassis = graph.get_node_id('chassis')
+    assert graph.node_names[graph.get_successors(chassis)].tolist() == ['wheel']
+    # The direction of the variable (group) connections is not known without the causalities
+    assert {
+        INTERFACE_TYPES[kind]: directed
+        for kind, directed in zip(graph.edge_kinds, graph.is_directed.tolist())
+    } == {
+        InterfaceType.Variable: False, InterfaceType.VariableGroup: False,
+        InterfaceType.Signal: True, InterfaceType.SignalGroup: True
+    }
+
+    # The graph can be serialized
+    dict_graph = json.loads(json.dumps(graph.to_dict()))
+    assert dict_graph['indptr'] == graph.indptr.tolist()
+    assert set(dict_graph['edge_kinds']) == {
+        'VariableConnection', 'SignalConnection', 'VariableGroupConnection',
+        'SignalGroupConnection'
+    }
+    assert dict_graph['is_directed'] == graph.is_directed.tolist()
+
+
+def test_connection_directions():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    system.Connections.VariableGroupConnection[0] = OspVariableGroupConnection(VariableGroup=[
+        OspVariableEndpoint(simulator='wheel', name='chassis port'),
+        OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+    ])
+    causalities = get_test_system_causalities()
+    model_descriptions = {
+        name: OspModelDescription(xml_source=os.path.join(
+            path_to_test_file_dir, f'{name}_OspModelDescription.xml'
+        )) for name in ['chassis', 'wheel']
+    }
+    directions = get_connection_directions(system.Connections, causalities, model_descriptions)
+    # The ports carry the force one way and the velocity the other way
+    assert directions == {
+        InterfaceType.Variable: [(True, False), (True, False)],
+        InterfaceType.VariableGroup: [(True, True)]
+    }
+    graph = system.get_connection_graph(causalities, model_descriptions)
+    assert ('chassis', 'linear mechanical port', 'wheel', 'chassis port',
+            InterfaceType.VariableGroup) in get_edges(graph)
+    assert ('wheel', 'chassis port', 'chassis', 'linear mechanical port',
+            InterfaceType.VariableGroup) in get_edges(graph)
+    assert graph.is_directed.all()
+
+    # One causality is enough unless they contradict each other
+    connections = OspConnections(VariableConnection=[
+        OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator='a', name=name1),
+            OspVariableEndpoint(simulator='b', name=name2)
+        ]) for name1, name2 in [('y', 'x'), ('x', 'u'), ('u', 'x'), ('y', 'y'), ('x', 'x')]
+    ])
+    assert get_connection_directions(connections, get_causalities('ab'))[
+        InterfaceType.Variable
+    ] == [(True, False), (True, False), (False, True), UNKNOWN_DIRECTION, UNKNOWN_DIRECTION]
+    # The group connections are not directed without the model descriptions
+    assert get_connection_directions(system.Connections, causalities)[
+        InterfaceType.VariableGroup
+    ] == [UNKNOWN_DIRECTION]
+
+
+def test_connection_graph_direction():
+    connections = OspConnections()
+    connections.add_connection(
+        source=OspVariableEndpoint(simulator='a', name='y'),
+        target=OspSignalEndpoint(function='sum', name='in[0]'),
+        group=False
+    )
+    connections.add_connection(
+        source=OspSignalEndpoint(function='sum', name='out'),
+        target=OspVariableEndpoint(simulator='b', name='u'),
+        group=False
+    )
+    # The input is given first
+    connections.add_connection(
+        source=OspVariableEndpoint(simulator='a', name='u'),
+        target=OspVariableEndpoint(simulator='b', name='y'),
+        group=False
+    )
+    graph = connections.get_connection_graph(
+        simulator_names=['a', 'b', 'c'], causalities=get_causalities('abc')
+    )
+    assert graph.node_names.tolist() == ['a', 'b', 'c', 'sum']
+    assert get_edges(graph) == [
+        ('a', 'y', 'sum', 'in[0]', InterfaceType.Signal),
+        ('b', 'y', 'a', 'u', InterfaceType.Variable),
+        ('sum', 'out', 'b', 'u', InterfaceType.Signal),
+    ]
+    # Edge attributes follow the CSR order and refer back to the connections
+    assert graph.indptr.tolist() == [0, 1, 2, 2, 3]
+    assert graph.connection_indices.tolist() == [0, 0, 1]
+    assert graph.is_directed.all()
+
+    # The connection is kept in the order given if its direction is not known
+    graph = connections.get_connection_graph(simulator_names=['a', 'b', 'c'])
+    assert ('a', 'u', 'b', 'y', InterfaceType.Variable) in get_edges(graph)
+    assert graph.is_directed.tolist() == [False, True, True]
+
+    empty = OspConnectionGraph(None, simulator_names=['a'])
+    assert (empty.number_nodes, empty.number_edges) == (1, 0)
+    assert empty.indptr.tolist() == [0, 0]
+
+
+def test_find_algebraic_loops():
+    connections = OspConnections()
+    for source, target in [('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd'), ('e', 'e')]:
+        connections.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspVariableEndpoint(simulator=target, name='u'),
+            group=False
+        )
+    # The output is given second
+    connections.VariableConnection[1].Variable.reverse()
+    # A loop through a function
+    connections.add_connection(
+        source=OspVariableEndpoint(simulator='d', name='y'),
+        target=OspSignalEndpoint(function='gain', name='in'),
+        group=False
+    )
+    connections.add_connection(
+        source=OspSignalEndpoint(function='gain', name='out'),
+        target=OspVariableEndpoint(simulator='f', name='u'),
+        group=False
+    )
+    connections.add_connection(
+        source=OspVariableEndpoint(simulator='f', name='y'),
+        target=OspVariableEndpoint(simulator='d', name='u'),
+        group=False
+    )
+    causalities = get_causalities('abcdefg')
+    graph = connections.get_connection_graph(
+        simulator_names=list('abcdefg'), causalities=causalities
+    )
+    components = graph.get_strongly_connected_components()
+    assert len(set(components[:3])) == 1
+    assert len(set(components.tolist())) == 4
+    # No edge goes to a component with a larger number
+    assert np.all(components[graph.get_sources()] >= components[graph.indices])
+
+    loops = graph.find_algebraic_loops()
+    assert [(loop.simulators, loop.functions) for loop in loops] == [
+        (['a', 'b', 'c'], []), (['d', 'f'], ['gain']), (['e'], [])
+    ]
+    # The loops are potential without the feedthrough of the simulators
+    assert all(loop.potential for loop in loops)
+    assert sorted(edge.source for edge in loops[0].edges) == ['a', 'b', 'c']
+    assert OspGraphEdge('gain', 'out', 'f', 'u', InterfaceType.Signal) in loops[1].edges
+    assert loops[2].edges == [OspGraphEdge('e', 'y', 'e', 'u', InterfaceType.Variable)]
+    assert graph.get_edge(graph.get_edge_ids(graph.get_node_id('e'))[0]) == loops[2].edges[0]
+
+    # A simulator without feedthrough breaks the loops through it
+    loops = graph.find_algebraic_loops(
+        feedthrough={'a': True, 'b': True, 'c': True, 'e': False, 'f': False}
+    )
+    assert [(loop.simulators, loop.potential) for loop in loops] == [(['a', 'b', 'c'], False)]
+
+    # The loops are not found without the causalities
+    graph = connections.get_connection_graph(simulator_names=list('abcdefg'))
+    assert graph.find_algebraic_loops() == []
+
+    # The chassis and the wheel are coupled in both directions
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    assert system.get_connection_graph().find_algebraic_loops() == []
+    graph = system.get_connection_graph(get_test_system_causalities())
+    loops = graph.find_algebraic_loops()
+    assert [(loop.simulators, loop.potential) for loop in loops] == [(['chassis', 'wheel'], True)]
+    assert graph.find_algebraic_loops(feedthrough={'chassis': False}) == []
+    assert OspConnectionGraph(None).find_algebraic_loops() == []
+
+
+def test_get_stepping_plan():
+    system = OspSystemStructure(BaseStepSize=0.01)
+    for name, step_size in [
+        ('a', None), ('b', 0.02), ('c', None), ('d', 0.04), ('e', None), ('f', None)
+    ]:
+        simulator = OspSimulator(name=name, source=f'{name}.fmu')
+        simulator.stepSize = step_size
+        system.add_simulator(simulator)
+    # a -> b -> (c <-> d) and a -> gain -> e, f is not connected
+    for source, target in [('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'c')]:
+        system.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspVariableEndpoint(simulator=target, name='u'),
+            group=False
+        )
+    system.add_function(
+        function_name='gain', function_type=FunctionType.LinearTransformation, factor=2.0, offset=0.0
+    )
+    system.add_connection(
+        source=OspVariableEndpoint(simulator='a', name='y'),
+        target=OspSignalEndpoint(function='gain', name='in'),
+        group=False
+    )
+    system.add_connection(
+        source=OspSignalEndpoint(function='gain', name='out'),
+        target=OspVariableEndpoint(simulator='e', name='u'),
+        group=False
+    )
+
+    causalities = get_causalities('abcdef')
+    plan = get_stepping_plan(system, causalities)
+    assert plan.stages == [[['a'], ['f']], [['b'], ['e']], [['c', 'd']]]
+    position = {name: i for i, name in enumerate(plan.order)}
+    assert set(position) == set('abcdef')
+    assert position['a'] < position['b'] < min(position['c'], position['d'])
+    assert position['a'] < position['e']
+    assert plan.decimation_factors == {'a': 1, 'b': 2, 'c': 1, 'd': 4, 'e': 1, 'f': 1}
+    assert plan.hyperperiod == 4
+    assert plan.get_stages(1) == [[['a'], ['f']], [['e']], [['c']]]
+    assert plan.get_stages(4) == plan.stages
+    assert json.loads(json.dumps(plan.to_dict()))['stages'] == plan.stages
+
+    # The smallest step size is the base step size if not given
+    system.BaseStepSize = None
+    assert get_stepping_plan(system, causalities).decimation_factors['d'] == 2
+    system.Simulators[0].stepSize = 0.015
+    with pytest.raises(ValueError):
+        get_stepping_plan(system, causalities)
+
+    assert get_stepping_plan(OspSystemStructure()).stages == []
+
+
+def test_get_stepping_plan_with_endpoints_reversed():
+    system = OspSystemStructure()
+    for name in 'abcd':
+        system.add_simulator(OspSimulator(name=name, source=f'{name}.fmu'))
+    # a -> b -> (c <-> d)
+    for source, target in [('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'c')]:
+        system.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspVariableEndpoint(simulator=target, name='u'),
+            group=False
+        )
+    causalities = get_causalities('abcd')
+    plan = get_stepping_plan(system, causalities)
+    assert plan.stages == [[['a']], [['b']], [['c', 'd']]]
+
+    # The inputs are listed first in every connection
+    for connection in system.Connections.VariableConnection:
+        connection.Variable.reverse()
+    plan_reversed = get_stepping_plan(system, causalities)
+    assert plan_reversed.stages == plan.stages
+    assert plan_reversed.order == plan.order
+
+    # The connections of unknown direction are not dependencies
+    assert get_stepping_plan(system).stages == [[['a'], ['b'], ['c'], ['d']]]
+
+
+def test_split_system(tmp_path):
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    system.add_simulator(OspSimulator(name='boat', source='boat.fmu'))
+    system.add_simulator(OspSimulator(name='propeller', source='propeller.fmu'))
+    system.add_simulator(OspSimulator(name='sensor', source='sensor.fmu'))
+    system.add_update_initial_value(
+        'propeller', OspInitialValue(variable='n', value=OspReal(value=10.0))
+    )
+    system.add_function(
+        function_name='gain', function_type=FunctionType.LinearTransformation, factor=2.0, offset=0.0
+    )
+    system.add_connection(
+        source=OspVariableEndpoint(simulator='propeller', name='thrust'),
+        target=OspSignalEndpoint(function='gain', name='in'),
+        group=False
+    )
+    system.add_connection(
+        source=OspSignalEndpoint(function='gain', name='out'),
+        target=OspVariableEndpoint(simulator='boat', name='force'),
+        group=False
+    )
+    # The connections are not in the order of the node ids of their sources
+    for source, target in [('propeller', 'boat'), ('boat', 'propeller')]:
+        system.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspVariableEndpoint(simulator=target, name='u'),
+            group=False
+        )
+    components = system.get_connection_graph().get_weakly_connected_components()
+    # The ground is connected only to a function that is not defined
+    assert components.tolist()[:6] == [0, 0, 1, 2, 2, 3]
+
+    subsystems = split_system(system)
+    assert [[simulator.name for simulator in subsystem.Simulators]
+            for subsystem in subsystems] == [
+        ['chassis', 'wheel'], ['ground'], ['boat', 'propeller'], ['sensor']
+    ]
+    vehicle, ground, boat, sensor = subsystems
+    assert len(vehicle.Connections.VariableConnection) == 2
+    assert len(vehicle.Connections.SignalConnection) == 1
+    assert len(vehicle.Connections.VariableGroupConnection) == 1
+    assert len(ground.Connections.SignalGroupConnection) == 1
+    # The functions that are not connected are left out
+    assert vehicle.Functions is None
+    assert boat.Functions.get_function_names() == ['gain']
+    assert len(boat.Connections.SignalConnection) == 2
+    assert [connection.Variable[0].simulator
+            for connection in boat.Connections.VariableConnection] == ['propeller', 'boat']
+    assert boat.Simulators[1].InitialValues[0].variable == 'n'
+    assert boat.BaseStepSize == system.BaseStepSize
+    assert sensor.Functions is None and sensor.Connections is None
+
+    # The sub-systems are copies
+    boat.Simulators[1].InitialValues[0].variable = 'rpm'
+    assert system.Simulators[4].InitialValues[0].variable == 'n'
+
+    paths = write_systems(subsystems, [
+        str(tmp_path / f'OspSystemStructure_{i}.xml') for i in range(len(subsystems))
+    ], max_workers=2)
+    assert all(os.path.isfile(path) for path in paths)
+    assert OspSystemStructure(xml_source=paths[2]).to_dict_xml() == boat.to_dict_xml()
+    # The same documents are written in the current process
+    paths_serial = write_systems(subsystems, [
+        str(tmp_path / f'OspSystemStructure_serial_{i}.xml') for i in range(len(subsystems))
+    ], max_workers=1)
+    for path, path_serial in zip(paths, paths_serial):
+        with open(path, 'rt') as file, open(path_serial, 'rt') as file_serial:
+            assert file.read() == file_serial.read()
+    with pytest.raises(TypeError):
+        write_systems(subsystems, paths[:1])
+
+
+def test_subsystem():
+    # A chain of simulators sim0 -> sim1 -> ... with a sum of sim0 and sim2 into sim3
+    system = OspSystemStructure()
+    for i in range(500):
+        system.add_simulator(OspSimulator(name=f'sim{i}', source='model.fmu'))
+    system.add_update_initial_value(
+        'sim1', OspInitialValue(variable='x0', value=OspReal(value=1.0))
+    )
+    system.Connections = OspConnections(VariableConnection=[
+        OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator=f'sim{i}', name='y'),
+            OspVariableEndpoint(simulator=f'sim{i + 1}', name='u')
+        ]) for i in range(499)
+    ])
+    system.add_function(function_name='sum', function_type=FunctionType.Sum, inputCount=2)
+    system.add_function(function_name='unused', function_type=FunctionType.Sum, inputCount=2)
+    for source, target in [('sim0', 'in[0]'), ('sim2', 'in[1]')]:
+        system.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspSignalEndpoint(function='sum', name=target),
+            group=False
+        )
+    system.add_connection(
+        source=OspSignalEndpoint(function='sum', name='out'),
+        target=OspVariableEndpoint(simulator='sim3', name='u2'),
+        group=False
+    )
+
+    subsystem = system.subsystem(['sim2', 'sim1'])
+    assert [simulator.name for simulator in subsystem.Simulators] == ['sim1', 'sim2']
+    assert subsystem.Simulators[0].InitialValues[0].variable == 'x0'
+    assert [connection.Variable[0].simulator
+            for connection in subsystem.Connections.VariableConnection] == ['sim1']
+    # The function connected to the selection is taken with its connections to the selection
+    assert subsystem.Functions.get_function_names() == ['sum']
+    assert len(subsystem.Connections.SignalConnection) == 1
+
+    # The neighbors through the function are one hop away
+    subsystem = system.subsystem(['sim0'], include_neighbors=1)
+    assert [simulator.name for simulator in subsystem.Simulators] == \
+        ['sim0', 'sim1', 'sim2', 'sim3']
+    assert len(subsystem.Connections.VariableConnection) == 3
+    assert len(subsystem.Connections.SignalConnection) == 3
+    assert [simulator.name for simulator in system.subsystem(
+        ['sim250'], include_neighbors=2
+    ).Simulators] == ['sim248', 'sim249', 'sim250', 'sim251', 'sim252']
+
+    # The index is kept until the system is changed
+    index = system.get_system_index()
+    assert system.get_system_index() is index
+    system.add_connection(
+        source=OspVariableEndpoint(simulator='sim499', name='y'),
+        target=OspVariableEndpoint(simulator='sim0', name='u'),
+        group=False
+    )
+    assert system.get_system_index() is not index
+    assert 'sim499' in [simulator.name for simulator in system.subsystem(
+        ['sim0'], include_neighbors=1
+    ).Simulators]
+
+    # The subsystem is a copy
+    subsystem.Simulators[1].InitialValues[0].variable = 'x1'
+    assert system.Simulators[1].InitialValues[0].variable == 'x0'
+    with pytest.raises(TypeError):
+        system.subsystem(['sim500'])
+
+
+def test_subsystem_after_modification():
+    system = OspSystemStructure()
+    for name in ['engine', 'gearbox', 'ground']:
+        system.add_simulator(OspSimulator(name=name, source='model.fmu'))
+    for source, target in [('engine', 'gearbox'), ('gearbox', 'ground')]:
+        system.add_connection(
+            source=OspVariableEndpoint(simulator=source, name='y'),
+            target=OspVariableEndpoint(simulator=target, name='u'),
+            group=False
+        )
+    system.subsystem(['engine'])
+
+    # A simulator deleted and another added keeps the number of the simulators
+    system.delete_simulator('ground')
+    system.add_simulator(OspSimulator(name='road', source='model.fmu'))
+    assert [simulator.name for simulator in system.subsystem(['road']).Simulators] == ['road']
+
+    # A connection deleted and another added keeps the number of the connections
+    system.delete_connection(
+        endpoint1=OspVariableEndpoint(simulator='engine', name='y'),
+        endpoint2=OspVariableEndpoint(simulator='gearbox', name='u')
+    )
+    system.add_connection(
+        source=OspVariableEndpoint(simulator='gearbox', name='y'),
+        target=OspVariableEndpoint(simulator='road', name='u'),
+        group=False
+    )
+    assert [simulator.name for simulator in system.subsystem(
+        ['road'], include_neighbors=1
+    ).Simulators] == ['gearbox', 'road']
+
+    # The edits rolled back
+    system.get_system_index()
+    with pytest.raises(ValueError):
+        with system.batch():
+            system.delete_simulator('road')
+            raise ValueError
+    assert [simulator.name for simulator in system.subsystem(['road']).Simulators] == ['road']
+
+    # The endpoints edited in place are found after the system is marked as modified
+    system.get_system_index()
+    system.Connections.VariableConnection[-1].Variable[0].simulator = 'engine'
+    system.mark_modified()
+    assert [simulator.name for simulator in system.subsystem(
+        ['road'], include_neighbors=1
+    ).Simulators] == ['engine', 'road']
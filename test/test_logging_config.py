@@ -30,6 +30,9 @@ def test_variable_for_logging():
 
     assert variable_dict == variable_dict_copy
 
+    # Test if the attributes are stored in slots
+    assert not hasattr(variable, '__dict__')
+
 
 def test_simulation_for_logging():
     # Create a simulator for logging instance
@@ -1,5 +1,7 @@
+import copy
 import json
 import os
+import pickle
 import random
 import string
 from typing import List, Dict, Union
@@ -226,3 +228,66 @@ def test_update_delete_interface():
         for var in var_groups_updated:
             matched |= var.name == new_interface.name
         assertTrue(matched)
+
+
+def test_get_variable_names():
+    for path_osp in path_to_osp_model_description_files:
+        osp_model_description = OspModelDescription(xml_source=path_osp)
+        variable_names = osp_model_description.get_variable_names()
+        dict_xml_str = json.dumps(xml_schema.to_dict(path_osp)['VariableGroups'])
+        assert len(variable_names) > 0
+        for variable_name in variable_names:
+            assert '"@ref": "%s"' % variable_name in dict_xml_str
+        assert dict_xml_str.count('"@ref"') >= len(variable_names)
+
+
+def test_freeze():
+    for path_osp in path_to_osp_model_description_files:
+        osp_model_description = OspModelDescription(xml_source=path_osp)
+        dict_xml = osp_model_description.to_dict_xml()
+        osp_model_description.freeze()
+
+        # Test if the frozen instance is exported the same way
+        assertEqual(osp_model_description.to_dict_xml(), dict_xml)
+        assertTrue(len(osp_model_description.get_variable_names()) > 0)
+
+        # Test if the instance and those in it cannot be modified
+        with pytest.raises(TypeError):
+            osp_model_description.version = '2.0'
+        var_group_type = next(
+            type_name for type_name in variable_group_types
+            if getattr(osp_model_description.VariableGroups, type_name)
+        )
+        var_groups = getattr(osp_model_description.VariableGroups, var_group_type)
+        assertTrue(isinstance(var_groups, tuple))
+        with pytest.raises(TypeError):
+            var_groups[0].name = 'new name'
+        with pytest.raises(TypeError):
+            osp_model_description.delete_interface(var_groups[0].name)
+        with pytest.raises(TypeError):
+            osp_model_description.add_interface(OspVariableType(ref='new variable'))
+
+        # Test if the copies are frozen as well
+        for osp_model_description_copy in [
+            copy.deepcopy(osp_model_description),
+            pickle.loads(pickle.dumps(osp_model_description))
+        ]:
+            assertEqual(osp_model_description_copy.to_dict_xml(), dict_xml)
+            with pytest.raises(TypeError):
+                osp_model_description_copy.version = '2.0'
+
+
+def test_variable_type_slots():
+    # The defaults are kept in the class and set in the slots
+    assertEqual(OspVariableType._defaults['unit'], None)
+    variable = OspVariableType(ref='velocity')
+    assertEqual(variable.unit, None)
+    assertTrue(not hasattr(variable, '__dict__'))
+    variable.unit = 'm/s'
+    variable.freeze()
+    with pytest.raises(TypeError):
+        variable.unit = 'km/h'
+    variable_copy = copy.deepcopy(variable)
+    assertEqual(variable_copy.to_dict(), {'ref': 'velocity', 'unit': 'm/s'})
+    with pytest.raises(TypeError):
+        variable_copy.ref = 'speed'
@@ -1,9 +1,13 @@
+import io
+import json
 import random
 import string
 
+import numpy as np
 import pytest
 
-from pyOSPParser.scenario import OSPEvent, EventAction, OSPScenario
+from pyOSPParser.scenario import OSPEvent, EventAction, OSPScenario, NO_ACTION, \
+    DuplicateEventPolicy
 
 
 def create_random_str(length: int = 5):
@@ -58,6 +62,13 @@ def test_event():
     with pytest.raises(TypeError):
         OSPEvent(time=time, model=model, variable=variable, action=4, value=value)
 
+    # Test if the attributes are stored in slots
+    assert not hasattr(event, '__dict__')
+    with pytest.raises(AttributeError):
+        event.comment = 'not an attribute of an event'
+    event.time = 2 * time
+    assert event.copy().time == 2 * time
+
 
 @pytest.fixture
 def scenario() -> OSPScenario:
@@ -232,3 +243,222 @@ def test_update_event(scenario):
     event = scenario.find_event(time=time, component=component_name, variable=variable)[0]
     assert event.action == new_action
     assert event.value == new_value
+
+
+def find_active_event_by_scanning(scenario: OSPScenario, model: str, variable: str, time: float):
+    """Reference for the active event found by going through all the events"""
+    events = [
+        event for event in scenario.find_event(component=model, variable=variable)
+        if event.time <= time
+    ]
+    if len(events) == 0:
+        return None
+    last_event = max(events, key=lambda event: event.time)
+    return None if last_event.action == EventAction.reset.value else last_event
+
+
+def test_compile_timeline(scenario):
+    """Test the lookup of active events in a compiled timeline against scanning the events"""
+    timeline = scenario.compile()
+    assert len(timeline.keys()) == len({(event.model, event.variable) for event in scenario.events})
+    times = np.sort(np.random.random(50) * scenario.end)
+    times = np.concatenate([times, [event.time for event in scenario.events]])
+    for model, variable in timeline.keys():
+        actions, values = timeline.get_active_actions(model, variable, times)
+        assert len(actions) == len(times)
+        for time, action, value in zip(times, actions, values):
+            event_ref = find_active_event_by_scanning(scenario, model, variable, time)
+            event = timeline.get_active_event(model, variable, time)
+            if event_ref is None:
+                assert event is None
+                assert action == NO_ACTION
+                assert np.isnan(value)
+            else:
+                assert event.to_dict() == event_ref.to_dict()
+                assert action == event_ref.action
+                assert value == event_ref.value
+
+    # Variables without any event
+    actions, values = timeline.get_active_actions('no model', 'no variable', times)
+    assert np.all(actions == NO_ACTION)
+    assert np.all(np.isnan(values))
+    assert timeline.get_active_event('no model', 'no variable', scenario.end) is None
+
+
+def apply_events_by_loop(
+        scenario: OSPScenario, model: str, variable: str, times: np.ndarray, signal: np.ndarray
+) -> np.ndarray:
+    """Reference for applying events to a signal sample by sample"""
+    result = []
+    for time, value in zip(times, signal):
+        event = find_active_event_by_scanning(scenario, model, variable, time)
+        if event is None:
+            result.append(value)
+        elif event.action == EventAction.override.value:
+            result.append(event.value)
+        else:
+            result.append(value + event.value)
+    return np.array(result)
+
+
+def test_apply_to_signal(scenario):
+    """Test applying the events to a signal against applying them sample by sample"""
+    times = np.linspace(0, scenario.end, 1001)
+    signal = np.sin(times)
+    timeline = scenario.compile()
+    for model, variable in timeline.keys():
+        signal_modified = timeline.apply_to_signal(model, variable, times, signal)
+        signal_ref = apply_events_by_loop(scenario, model, variable, times, signal)
+        assert np.allclose(signal_modified, signal_ref)
+        assert np.allclose(
+            scenario.apply_to_signal(model, variable, times, signal), signal_ref
+        )
+
+    # The signal is not changed for a variable without any event
+    assert np.all(timeline.apply_to_signal('no model', 'no variable', times, signal) == signal)
+
+    # Override, bias and reset in a known sequence
+    scenario = OSPScenario(name='known', end=10)
+    scenario.add_event(OSPEvent(time=2, model='m', variable='v', action=1, value=5))
+    scenario.add_event(OSPEvent(time=4, model='m', variable='v', action=2, value=1.5))
+    scenario.add_event(OSPEvent(time=6, model='m', variable='v', action=3, value=0))
+    times = np.arange(0, 10, 1.0)
+    signal_modified = scenario.apply_to_signal('m', 'v', times, np.ones(10))
+    assert np.all(signal_modified == [1, 1, 5, 5, 2.5, 2.5, 1, 1, 1, 1])
+
+    with pytest.raises(ValueError):
+        scenario.apply_to_signal('m', 'v', times, np.ones(9))
+
+
+class StringIOInSmallChunks(io.StringIO):
+    """StringIO that reads only a few characters at a time"""
+    def read(self, size=-1):
+        return super().read(7)
+
+
+def test_dump_and_load(scenario):
+    """Test writing and reading a scenario event by event"""
+    # The output is the same as to_json unless compact
+    file = io.StringIO()
+    scenario.dump(file)
+    assert file.getvalue() == scenario.to_json()
+    file = io.StringIO()
+    OSPScenario(name='empty', end=10, description='empty').dump(file)
+    assert file.getvalue() == OSPScenario(name='empty', end=10, description='empty').to_json()
+
+    # The compact output has no whitespace but the same content
+    file_compact = io.StringIO()
+    scenario.dump(file_compact, compact=True)
+    assert json.loads(file_compact.getvalue()) == scenario.to_dict()
+    assert '\n' not in file_compact.getvalue()
+
+    # Reading the output in small chunks gives the same scenario
+    for content in [scenario.to_json(), file_compact.getvalue()]:
+        scenario_loaded = OSPScenario(name=scenario.name, end=0)
+        scenario_loaded.load(StringIOInSmallChunks(content))
+        assert scenario_loaded.to_dict() == scenario.to_dict()
+
+    with pytest.raises(ValueError):
+        scenario.load(io.StringIO(scenario.to_json()[:-10]))
+
+
+class StringIOSplit(io.StringIO):
+    """StringIO that reads up to a given position first and then the rest"""
+    def __init__(self, content: str, position: int):
+        super().__init__(content)
+        self.position = position
+
+    def read(self, size=-1):
+        if self.tell() < self.position:
+            return super().read(self.position - self.tell())
+        return super().read(size)
+
+
+def test_load_number_split_between_chunks():
+    """Test reading a number split between the chunks at a character of the number"""
+    scenario = OSPScenario(name='split', end=12.5)
+    scenario.add_event(OSPEvent(time=1.25e-30, model='m', variable='v',
+                                action=EventAction.override.value, value=-3.5))
+    content = scenario.to_json()
+    for part in ['12', '12.', '1.25', '1.25e', '1.25e-', '-3']:
+        position = content.index(part) + len(part)
+        scenario_loaded = OSPScenario(name='split', end=0)
+        scenario_loaded.load(StringIOSplit(content, position))
+        assert scenario_loaded.to_dict() == scenario.to_dict()
+
+
+def test_merge_scenarios(scenario):
+    """Test merging scenarios"""
+    other = OSPScenario(name='other', end=scenario.end * 2, description='other')
+    for _ in range(random.randint(1, 10)):
+        other.add_event(create_an_event(time=random.random() * other.end))
+    merged = OSPScenario.merge(scenario, other)
+    assert merged.name == scenario.name
+    assert merged.end == other.end
+    assert len(merged.events) == len(scenario.events) + len(other.events)
+    times = [event.time for event in merged.events]
+    assert times == sorted(times)
+    merged_dicts = [event.to_dict() for event in merged.events]
+    for event in scenario.events + other.events:
+        assert event.to_dict() in merged_dicts
+
+    # Duplicate events
+    duplicate = OSPScenario(name='duplicate', end=scenario.end)
+    event_duplicate = scenario.events[0].copy()
+    event_duplicate.value = event_duplicate.value + 1
+    duplicate.add_event(event_duplicate)
+    with pytest.raises(TypeError):
+        OSPScenario.merge(scenario, duplicate)
+    merged = OSPScenario.merge(
+        scenario, duplicate, duplicate_policy=DuplicateEventPolicy.keep_first
+    )
+    assert len(merged.events) == len(scenario.events)
+    assert scenario.events[0].to_dict() in [event.to_dict() for event in merged.events]
+    merged = OSPScenario.merge(
+        scenario, duplicate, duplicate_policy=DuplicateEventPolicy.keep_last
+    )
+    assert len(merged.events) == len(scenario.events)
+    assert event_duplicate.to_dict() in [event.to_dict() for event in merged.events]
+
+
+def test_shift_scenario(scenario):
+    """Test shifting a scenario in time"""
+    shifted = scenario.shift(10)
+    assert shifted.end == scenario.end + 10
+    assert np.allclose(
+        sorted(event.time - 10 for event in shifted.events),
+        sorted(event.time for event in scenario.events)
+    )
+    shifted = scenario.shift(-50)
+    assert shifted.end == scenario.end - 50
+    assert len(shifted.events) == len([event for event in scenario.events if event.time >= 50])
+    with pytest.raises(TypeError):
+        scenario.shift(-scenario.end * 2)
+
+
+def test_slice_scenario():
+    """Test slicing a time window of a scenario"""
+    scenario = OSPScenario(name='slice', end=100)
+    scenario.add_event(OSPEvent(time=10, model='m', variable='a', action=1, value=1))
+    scenario.add_event(OSPEvent(time=20, model='m', variable='b', action=2, value=2))
+    scenario.add_event(OSPEvent(time=25, model='m', variable='b', action=3, value=0))
+    scenario.add_event(OSPEvent(time=30, model='m', variable='c', action=1, value=3))
+    scenario.add_event(OSPEvent(time=40, model='m', variable='a', action=3, value=0))
+    scenario.add_event(OSPEvent(time=60, model='m', variable='a', action=1, value=4))
+
+    sliced = scenario.slice(30, 50, keep_active=False)
+    assert sliced.end == 20
+    assert [(event.time, event.variable) for event in sliced.events] == [(0, 'c'), (10, 'a')]
+
+    # The override of 'a' is active at the start, but not the bias of 'b' that is reset
+    sliced = scenario.slice(30, 50)
+    assert [(event.time, event.variable, event.action) for event in sliced.events] == \
+        [(0, 'a', 1), (0, 'c', 1), (10, 'a', 3)]
+
+    # The active events are consistent with the original scenario
+    timeline = scenario.compile()
+    timeline_sliced = sliced.compile()
+    for variable in ['a', 'b', 'c']:
+        for time in np.linspace(0, 20, 41):
+            assert timeline.get_active_actions('m', variable, time + 30)[0] == \
+                timeline_sliced.get_active_actions('m', variable, time)[0]
@@ -0,0 +1,111 @@
+import io
+import os
+
+import numpy as np
+
+from pyOSPParser.scenario import OSPScenario, OSPEvent
+from pyOSPParser.scenario_generator import Jitter, OSPScenarioVariantGenerator
+
+
+def create_template() -> OSPScenario:
+    template = OSPScenario(name='fault campaign', end=100, description='template')
+    template.add_event(OSPEvent(time=10, model='engine', variable='rpm', action=1, value=1000))
+    template.add_event(OSPEvent(time=20, model='engine', variable='load', action=2, value=0.5))
+    template.add_event(OSPEvent(time=30, model='engine', variable='on', action=1, value=True))
+    template.add_event(OSPEvent(time=99, model='engine', variable='rpm', action=3, value=0))
+    return template
+
+
+def test_generate_variants():
+    """Test if the variants are perturbed within the range and reproducible"""
+    template = create_template()
+    generator = OSPScenarioVariantGenerator(
+        template=template,
+        time_jitter=Jitter('normal', {'scale': 2.0}),
+        value_jitter={
+            ('engine', 'rpm'): Jitter('uniform', {'low': 0.9, 'high': 1.1}, relative=True)
+        },
+        seed=1
+    )
+    variant = generator.generate(3)
+    assert variant.end == template.end
+    assert len(variant.events) == len(template.events)
+    for event, event_template in zip(variant.events, template.get_sorted_events()):
+        assert 0 <= event.time <= template.end
+        assert event.model == event_template.model
+        assert event.variable == event_template.variable
+        assert event.action == event_template.action
+        if event.variable == 'rpm':
+            assert 0.9 * event_template.value <= event.value <= 1.1 * event_template.value
+        else:
+            assert event.value == event_template.value
+    assert variant.events[2].value is True
+
+    # The same seed and index give the same variant
+    assert generator.generate(3).to_dict() == variant.to_dict()
+    generator_same_seed = OSPScenarioVariantGenerator(
+        template=template,
+        time_jitter=Jitter('normal', {'scale': 2.0}),
+        value_jitter={
+            ('engine', 'rpm'): Jitter('uniform', {'low': 0.9, 'high': 1.1}, relative=True)
+        },
+        seed=generator.seed
+    )
+    assert generator_same_seed.generate(3).to_dict() == variant.to_dict()
+    assert generator.generate(4).to_dict() != variant.to_dict()
+
+
+def test_write_variants(tmp_path):
+    """Test writing the variants with a pool of processes"""
+    template = create_template()
+    generator = OSPScenarioVariantGenerator(
+        template=template,
+        time_jitter=Jitter('uniform', {'low': -1.0, 'high': 1.0}),
+        value_jitter=Jitter('normal', {'scale': 0.1}),
+    )
+    number_variants = 12
+    directory = os.path.join(tmp_path, 'campaign')
+    file_paths = generator.write(directory, number_variants, processes=2)
+    assert len(file_paths) == number_variants
+    assert len(set(file_paths)) == number_variants
+    assert sorted(os.listdir(directory)) == sorted(os.path.basename(path) for path in file_paths)
+    for index, file_path in enumerate(file_paths):
+        variant = OSPScenario(name='', end=0)
+        with open(file_path, 'rt') as file:
+            variant.load(file)
+        file_ref = io.StringIO()
+        generator.generate(index, number_variants).dump(file_ref, compact=True)
+        with open(file_path, 'rt') as file:
+            assert file.read() == file_ref.getvalue()
+        assert np.all([0 <= event.time <= template.end for event in variant.events])
+
+    # The files written in a single process are the same
+    file_paths_single = generator.write(os.path.join(tmp_path, 'single'), number_variants,
+                                        processes=1)
+    for file_path, file_path_single in zip(file_paths, file_paths_single):
+        assert os.path.basename(file_path) == os.path.basename(file_path_single)
+        with open(file_path, 'rt') as file, open(file_path_single, 'rt') as file_single:
+            assert file.read() == file_single.read()
+
+
+def test_generate_variants_keeps_order_of_events():
+    """Test if the events of a variable keep their order and times under a large jitter"""
+    template = OSPScenario(name='reorder', end=10)
+    for time, action in [(1, 1), (2, 3), (3, 2), (4, 3), (9, 1), (9.5, 3)]:
+        template.add_event(OSPEvent(time=time, model='engine', variable='rpm', action=action,
+                                    value=100))
+    template.add_event(OSPEvent(time=5, model='engine', variable='load', action=1, value=0.5))
+    generator = OSPScenarioVariantGenerator(
+        template=template, time_jitter=Jitter('normal', {'scale': 20.0}), seed=0
+    )
+    for index in range(20):
+        variant = generator.generate(index)
+        events = [event for event in variant.events if event.variable == 'rpm']
+        assert [event.action for event in events] == [1, 3, 2, 3, 1, 3]
+        times = [event.time for event in events]
+        # Many events are clipped to 0 or to the end but all have their own time
+        assert all(0 <= time <= template.end for time in times)
+        assert all(time1 < time2 for time1, time2 in zip(times, times[1:]))
+        scenario = OSPScenario(name='copy', end=template.end)
+        for event in variant.events:
+            scenario.add_event(event)
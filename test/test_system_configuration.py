@@ -1,5 +1,7 @@
+import copy
 import json
 import os
+import pickle
 import random
 import string
 from typing import Union, NamedTuple, List
@@ -849,3 +851,187 @@ def test_system_structure_adding_deleting_function():
     # Test deleting the linear transformation function
     obj.delete_function(function_name=linear_transform_func.name)
     assert obj.Functions is None
+
+
+def test_system_structure_batch_commit():
+    obj = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    num_simulators_before = len(obj.Simulators)
+    num_var_connections_before = len(obj.Connections.VariableConnection)
+
+    # Edits in a batch can refer to the components and functions added later in the batch
+    with obj.batch():
+        obj.add_connection(
+            source=OspVariableEndpoint(simulator='wheel', name='p.e'),
+            target=OspVariableEndpoint(simulator='tire', name='p.e'),
+            group=False
+        )
+        obj.add_connection(
+            source=OspVariableEndpoint(simulator='tire', name='u'),
+            target=OspSignalEndpoint(function='gain', name='in'),
+            group=False
+        )
+        obj.add_simulator(OspSimulator(name='tire', source='tire.fmu'))
+        obj.add_function(
+            function_name='gain',
+            function_type=FunctionType.LinearTransformation,
+            factor=2.0,
+            offset=0.0
+        )
+        obj.add_update_initial_value(
+            component_name='tire',
+            init_value=OspInitialValue(variable='r', value=OspReal(value=0.3))
+        )
+    assert len(obj.Simulators) == num_simulators_before + 1
+    assert len(obj.Connections.VariableConnection) == num_var_connections_before + 1
+    assert obj.get_function_by_name('gain').factor == 2.0
+    assert obj.get_component_by_name('tire').InitialValues[0].variable == 'r'
+
+
+def test_system_structure_batch_rollback():
+    obj = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    dict_xml_before = obj.to_dict_xml()
+    component = obj.Simulators[0]
+    init_value = component.InitialValues[0]
+
+    # A connection to a component that does not exist fails at the commit
+    with pytest.raises(AssertionError):
+        with obj.batch():
+            obj.add_simulator(OspSimulator(name='tire', source='tire.fmu'))
+            obj.add_update_initial_value(
+                component_name=component.name,
+                init_value=OspInitialValue(
+                    variable=init_value.variable, value=OspReal(value=1.0)
+                )
+            )
+            obj.delete_function('LTF')
+            obj.delete_connection(
+                endpoint1=obj.Connections.VariableConnection[0].Variable[0],
+                endpoint2=obj.Connections.VariableConnection[0].Variable[1]
+            )
+            obj.add_connection(
+                source=OspVariableEndpoint(simulator='tire', name='p.e'),
+                target=OspVariableEndpoint(simulator='road', name='p.e'),
+                group=True
+            )
+    assert obj.to_dict_xml() == dict_xml_before
+
+    # A duplicate name fails at the commit
+    with pytest.raises(TypeError):
+        with obj.batch():
+            obj.add_simulator(OspSimulator(name='tire', source='tire.fmu'))
+            obj.add_simulator(OspSimulator(name='tire', source='tire.fmu'))
+    assert obj.to_dict_xml() == dict_xml_before
+
+    # An exception raised in the context rolls back the edits
+    with pytest.raises(ValueError):
+        with obj.batch():
+            obj.delete_simulator(component.name)
+            raise ValueError
+    assert obj.to_dict_xml() == dict_xml_before
+
+    # The batch can be rolled back when the system was empty
+    obj = OspSystemStructure()
+    with pytest.raises(AssertionError):
+        with obj.batch():
+            obj.add_simulator(OspSimulator(name='tire', source='tire.fmu'))
+            obj.add_function(function_name='sum', function_type=FunctionType.Sum, inputCount=2)
+            obj.add_connection(
+                source=OspVariableEndpoint(simulator='tire', name='u'),
+                target=OspSignalEndpoint(function='gain', name='in'),
+                group=False
+            )
+    assert obj.Simulators is None
+    assert obj.Functions is None
+    assert obj.Connections is None
+
+
+def test_system_structure_to_xml_str_reuses_fragments():
+    def encode_whole_document(system: OspSystemStructure) -> str:
+        return xmlschema.etree_tostring(
+            xmlschema.from_json(json.dumps(system.to_dict_xml()), system.xs)
+        )
+
+    obj = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    # The document without the fragments
+    dict_xml = obj.to_dict_xml(include_fragments=False)
+    assert dict_xml['Simulators'] is None
+    assert 'Functions' not in dict_xml and 'Connections' not in dict_xml
+    xml_str = obj.to_xml_str()
+    assert xml_str == encode_whole_document(obj)
+    elements = dict(obj._xml_cache.elements)
+    assert obj.to_xml_str() is xml_str
+
+    # Only the simulator changed is encoded again
+    obj.add_update_initial_value(
+        component_name='wheel',
+        init_value=OspInitialValue(variable='C.kWheel', value=OspReal(value=1.0))
+    )
+    xml_str = obj.to_xml_str()
+    assert xml_str == encode_whole_document(obj)
+    elements_encoded = [
+        key for key, element in obj._xml_cache.elements.items() if elements.get(key) is not element
+    ]
+    assert len(elements_encoded) == 1
+    assert elements_encoded[0][0] == 'Simulator' and '"wheel"' in elements_encoded[0][1]
+
+    # The changes made by the methods and by setting the attributes are exported
+    obj.delete_function('LTF')
+    assert obj.to_xml_str() == encode_whole_document(obj)
+    obj.add_connection(
+        source=OspVariableEndpoint(simulator='chassis', name='p.f'),
+        target=OspVariableEndpoint(simulator='ground', name='p.f'),
+        group=False
+    )
+    assert obj.to_xml_str() == encode_whole_document(obj)
+    obj.Simulators[0].source = 'chassis_v2.fmu'
+    obj.BaseStepSize = 0.02
+    assert obj.to_xml_str() == encode_whole_document(obj)
+    obj.delete_simulator('ground')
+    obj.Connections = None
+    obj.Functions = None
+    assert obj.to_xml_str() == encode_whole_document(obj)
+    obj.Simulators = None
+    assert obj.to_xml_str() == encode_whole_document(obj)
+
+
+def test_names_are_interned():
+    obj = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    simulator_names = {simulator.name: simulator.name for simulator in obj.Simulators}
+    endpoints = [
+        endpoint for connection in obj.Connections.VariableConnection
+        for endpoint in connection.Variable
+    ]
+    assert len(endpoints) > len(simulator_names)
+    for endpoint in endpoints:
+        assert endpoint.simulator is simulator_names[endpoint.simulator]
+
+    # The names given as arguments are interned as well
+    name = ''.join(['wheel', '_', 'speed'])
+    endpoint = OspVariableEndpoint(simulator='wheel', name=name)
+    assert endpoint.name is OspSignalEndpoint(function='sum', name='wheel_speed').name
+
+
+def test_leaf_attributes_are_slots():
+    obj = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    leaves = [
+        endpoint for connection in obj.Connections.VariableConnection
+        for endpoint in connection.Variable
+    ] + [
+        endpoint for connection in obj.Connections.SignalConnection
+        for endpoint in [connection.Variable, connection.Signal]
+    ] + [
+        OspInitialValue(variable='mass', value=OspReal(value=1.0)),
+        OspInteger(value=1),
+        OspBoolean(value=True),
+        OspString(value='value')
+    ]
+    for leaf in leaves:
+        assert not hasattr(leaf, '__dict__')
+    with pytest.raises(AttributeError):
+        leaves[0].comment = 'not an attribute of an endpoint'
+
+    # Test if the instances are copied and pickled as before
+    dict_xml = obj.to_dict_xml()
+    assert copy.deepcopy(obj).to_dict_xml() == dict_xml
+    assert pickle.loads(pickle.dumps(obj)).to_dict_xml() == dict_xml
+    assert pickle.loads(pickle.dumps(leaves[-4])).to_dict_xml() == leaves[-4].to_dict_xml()
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from pyOSPParser.model_description import OspUnitType
+from pyOSPParser.units import UnitTable, UnitConverter, UnitError, get_dimension_signatures, \
+    BASE_UNITS
+
+
+def create_unit(
+        name: str, factor: float = 1.0, offset: float = 0.0, display_units=(), **exponents
+):
+    dict_xml = {
+        '@name': name,
+        'BaseUnit': dict(
+            {f'@{key}': value for key, value in exponents.items()},
+            **{'@factor': factor, '@offset': offset}
+        )
+    }
+    if display_units:
+        dict_xml['DisplayUnit'] = [
+            {'@name': display_name, '@factor': display_factor, '@offset': display_offset}
+            for display_name, display_factor, display_offset in display_units
+        ]
+    return OspUnitType(dict_xml=dict_xml)
+
+
+def test_dimension_signatures():
+    exponents = np.random.randint(-32, 32, size=(1000, len(BASE_UNITS)))
+    signatures = get_dimension_signatures(exponents)
+    # The signatures are the same only for the same exponents
+    assert len(np.unique(signatures)) == len(np.unique(exponents, axis=0))
+    assert get_dimension_signatures([0] * 8) != get_dimension_signatures([0, 0, 0, 0, 0, 0, 0, 1])
+    with pytest.raises(UnitError):
+        get_dimension_signatures([0, 0, 0, 0, 0, 0, 0, 32])
+
+
+def test_unit_table():
+    table = UnitTable([
+        create_unit('m/s', m=1, s=-1),
+        create_unit('km/h', factor=1 / 3.6, m=1, s=-1),
+        create_unit('N', kg=1, m=1, s=-2),
+        create_unit('K', K=1, display_units=[('degC', 1.0, -273.15), ('degF', 1.8, -459.67)]),
+    ])
+    # The units of the same definition share the row
+    rows = table.add_units([
+        create_unit('N', kg=1, m=1, s=-2), create_unit('newton', kg=1, m=1, s=-2)
+    ])
+    assert rows['N'] == rows['newton'] == table.index['N']
+    assert len(table) == 6
+    assert table.exponents[table.index['N']].tolist() == [1, 1, -2, 0, 0, 0, 0, 0]
+
+    index = table.index
+    is_compatible, factors, offsets = table.get_conversions(
+        [index['km/h'], index['m/s'], index['degC'], index['degC'], index['N']],
+        [index['m/s'], index['km/h'], index['K'], index['degF'], index['m/s']]
+    )
+    assert is_compatible.tolist() == [True, True, True, True, False]
+    assert np.allclose(factors[:4], [1 / 3.6, 3.6, 1, 1.8])
+    assert np.allclose(offsets[:4], [0, 0, 273.15, 32])
+    assert np.isnan(factors[4]) and np.isnan(offsets[4])
+
+
+def test_unit_converter():
+    kelvin = create_unit('K', K=1, display_units=[('degC', 1.0, -273.15), ('degF', 1.8, -459.67)])
+    converter = UnitConverter([create_unit('m/s', m=1, s=-1), kelvin])
+    values = np.linspace(-50.0, 50.0, 101)
+    assert np.allclose(converter.convert(values, 'degC', 'degF'), values * 1.8 + 32)
+    assert np.allclose(converter.convert(values, 'degC', kelvin), values + 273.15)
+    assert converter.convert([1, 2], 'm/s', 'm/s').tolist() == [1.0, 2.0]
+
+    # A unit is added to the table when given
+    km_per_hour = create_unit('km/h', factor=1 / 3.6, m=1, s=-1)
+    assert np.allclose(converter.convert(values, km_per_hour, 'm/s'), values / 3.6)
+    assert converter.get_conversion('m/s', 'km/h') == pytest.approx((3.6, 0))
+
+    # The values are converted in place
+    speeds = values.copy()
+    assert converter.convert(speeds, 'm/s', 'km/h', out=speeds) is speeds
+    assert np.allclose(speeds, values * 3.6)
+    # An integer array is converted into a new float array, but not in place
+    integer_speeds = np.array([1, 2, 3])
+    assert np.allclose(converter.convert(integer_speeds, 'm/s', 'km/h'), [3.6, 7.2, 10.8])
+    with pytest.raises(TypeError):
+        converter.convert(integer_speeds, 'm/s', 'km/h', out=integer_speeds)
+
+    with pytest.raises(UnitError):
+        converter.convert(values, 'm/s', 'K')
+    with pytest.raises(UnitError):
+        converter.convert(values, 'm/s', 'mph')
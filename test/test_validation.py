@@ -0,0 +1,369 @@
+import json
+import os
+from typing import Dict
+
+import pytest
+
+from pyOSPParser.model_description import OspModelDescription, Causality, OspUnitType, \
+    get_variables_in_group, get_variable_groups_in_group
+from pyOSPParser.scenario import OSPScenario, OSPEvent
+from pyOSPParser.system_configuration import OspSystemStructure, OspConnections, \
+    OspVariableConnection, OspVariableEndpoint, OspSignalEndpoint, FunctionType, \
+    OspVariableGroupConnection, OspSignalGroupConnection
+from pyOSPParser.validation import validate_scenario, ValidationError, ValidationIssue, \
+    count_connections, validate_connections, validate_system, validate_causalities, \
+    validate_units, validate_group_types
+
+path_to_test_file_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'files')
+PATH_TO_TEST_SYSTEM_STRUCTURE = os.path.join(
+    path_to_test_file_dir, 'OspSystemStructure_QT_for_parsing_testing.xml'
+)
+
+
+def get_model_descriptions() -> Dict[str, OspModelDescription]:
+    return {
+        name: OspModelDescription(xml_source=os.path.join(
+            path_to_test_file_dir, f'{name}_OspModelDescription.xml'
+        )) for name in ['chassis', 'wheel', 'ground']
+    }
+
+
+def get_causalities() -> Dict[str, Dict[str, Causality]]:
+    with open(os.path.join(path_to_test_file_dir, 'fmu.json'), 'rt') as file:
+        fmus = json.load(file)
+    causalities = {}
+    for fmu in fmus:
+        causality = {name: Causality.no_variable for name in fmu['parameters'] + fmu['others']}
+        causality.update({name: Causality.input for name in fmu['inputs']})
+        causality.update({name: Causality.output for name in fmu['outputs']})
+        causalities[fmu['name']] = causality
+    return causalities
+
+
+def test_validate_scenario():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+    causalities = get_causalities()
+    scenario = OSPScenario(name='test', end=100)
+    scenario.add_event(OSPEvent(time=1, model='chassis', variable='p.f', action=1, value=1))
+    scenario.add_event(OSPEvent(time=2, model='wheel', variable='p1.e', action=2, value=1))
+    scenario.add_event(OSPEvent(time=3, model='wheel', variable='p1.e', action=3, value=0))
+    assert validate_scenario(scenario, system, model_descriptions, causalities) == []
+
+    # All the problems are reported together
+    scenario.add_event(OSPEvent(time=4, model='engine', variable='p.f', action=1, value=1))
+    scenario.add_event(OSPEvent(time=5, model='engine', variable='p.f', action=3, value=1))
+    scenario.add_event(OSPEvent(time=6, model='ground', variable='no.var', action=1, value=1))
+    issues = validate_scenario(scenario, system, model_descriptions, causalities)
+    assert [issue.subject for issue in issues] == [('engine', 'p.f'), ('ground', 'no.var')]
+    assert '2 events' in issues[0].message
+
+    # The causality is checked for the variables that are not in the model description
+    scenario = OSPScenario(name='test', end=100)
+    scenario.add_event(OSPEvent(time=1, model='chassis', variable='C.mChassis', action=1, value=1))
+    assert validate_scenario(scenario, system, causalities=causalities)[0].subject == \
+        ('chassis', 'C.mChassis')
+    with pytest.raises(ValidationError):
+        validate_scenario(scenario, system, causalities=causalities, raise_error=True)
+    assert validate_scenario(scenario, system) == []
+
+
+def test_validate_scenario_with_many_events():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+    causalities = get_causalities()
+    scenario = OSPScenario(name='test', end=1e6)
+    variables = [('chassis', 'p.f'), ('wheel', 'p1.e'), ('ground', 'p.e'), ('wheel', 'p.x')]
+    scenario.events = [
+        OSPEvent(time=i, model=variables[i % 4][0], variable=variables[i % 4][1],
+                 action=1 + i % 3, value=1.0)
+        for i in range(200000)
+    ]
+    issues = validate_scenario(scenario, system, model_descriptions, causalities)
+    assert len(issues) == 1
+    assert issues[0].subject == ('wheel', 'p.x')
+
+
+def test_validate_connections():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    causalities = get_causalities()
+    counts = count_connections(system, causalities)
+    assert counts.variable_fan_out[('chassis', 'p.e', False)] == 1
+    assert counts.variable_fan_in[('chassis', 'p.f', False)] == 1
+    assert counts.signal_fan_in[('Sum', 'sumSpeed', False)] == 1
+    assert ('wheel', 'p.f', False) in counts.variable_fan_out
+    # The group connection is not directed without the model descriptions
+    assert counts.unknown_direction == [(('wheel', 'shaft'), ('chassis', 'shaft'))]
+    assert len(count_connections(system).unknown_direction) == 3
+
+    # Only the inputs of the functions in the file are not connected
+    issues = validate_connections(system, causalities=causalities)
+    assert [issue.subject for issue in issues] == [
+        ('LTF', 'in'), ('sumSpeed1', 'in[0]'), ('sumSpeed1', 'in[1]'), ('sumSpeed2', 'in[0]'),
+        ('sumSpeed2', 'in[1]'), ('sumSpeed2', 'in[2]')
+    ]
+    assert all('not connected' in issue.message for issue in issues)
+
+    # An input driven by a variable connection and a signal connection
+    system.add_function(
+        function_name='gain', function_type=FunctionType.LinearTransformation, factor=2, offset=0
+    )
+    system.add_connection(
+        source=OspSignalEndpoint(function='gain', name='out'),
+        target=OspVariableEndpoint(simulator='wheel', name='p1.e'),
+        group=False
+    )
+    system.add_connection(
+        source=OspVariableEndpoint(simulator='chassis', name='p.e'),
+        target=OspSignalEndpoint(function='gain', name='in'),
+        group=False
+    )
+    issues = [
+        issue for issue in validate_connections(system, causalities=causalities)
+        if 'driven' in issue.message
+    ]
+    assert [(issue.subject, issue.message) for issue in issues] == [(
+        ('wheel', 'p1.e'), 'The variable "p1.e" of "wheel" is driven by 2 connections.'
+    )]
+    assert ('gain', 'in') not in {
+        issue.subject for issue in validate_connections(system, causalities=causalities)
+    }
+    with pytest.raises(ValidationError):
+        validate_connections(system, causalities=causalities, raise_error=True)
+
+
+def test_validate_connections_with_output_listed_second():
+    causalities = {
+        name: {'y': Causality.output, 'u': Causality.input} for name in ['a', 'b', 'c', 'd']
+    }
+    system = OspSystemStructure(Connections=OspConnections(VariableConnection=[
+        OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator=simulator, name='u'),
+            OspVariableEndpoint(simulator='a', name='y')
+        ]) for simulator in ['b', 'c']
+    ]))
+    counts = count_connections(system, causalities)
+    assert counts.variable_fan_out == {('a', 'y', False): 2}
+    assert counts.variable_fan_in == {('b', 'u', False): 1, ('c', 'u', False): 1}
+    assert validate_connections(system, causalities=causalities) == []
+
+    # An input driven twice is found whichever endpoint is listed first
+    system.Connections.VariableConnection.append(OspVariableConnection(Variable=[
+        OspVariableEndpoint(simulator='d', name='y'),
+        OspVariableEndpoint(simulator='b', name='u')
+    ]))
+    issues = validate_connections(system, causalities=causalities)
+    assert [issue.subject for issue in issues] == [('b', 'u')]
+
+    # The connections of unknown direction are skipped
+    assert validate_connections(system) == []
+    assert len(count_connections(system).unknown_direction) == 3
+
+
+def test_validate_connections_with_group_and_variable_of_same_name():
+    causalities = {name: {'y': Causality.output, 'p': Causality.input} for name in ['a', 'b']}
+    system = OspSystemStructure(Connections=OspConnections(
+        VariableConnection=[OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator='a', name='y'),
+            OspVariableEndpoint(simulator='b', name='p')
+        ])],
+        SignalGroupConnection=[OspSignalGroupConnection(
+            SignalGroup=OspSignalEndpoint(function='vectorSum', name='out'),
+            VariableGroup=OspVariableEndpoint(simulator='b', name='p')
+        )]
+    ))
+    counts = count_connections(system, causalities)
+    assert counts.variable_fan_in == {('b', 'p', False): 1, ('b', 'p', True): 1}
+    assert validate_connections(system, causalities=causalities) == []
+
+
+def test_validate_connections_with_many_connections():
+    system = OspSystemStructure(Connections=OspConnections(VariableConnection=[
+        OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator=f'simulator{i % 1000}', name=f'y{i % 7}'),
+            OspVariableEndpoint(simulator=f'simulator{(i + 1) % 1000}', name=f'u{i // 1000}')
+        ]) for i in range(100000)
+    ]))
+    # Add an input driven twice
+    system.Connections.VariableConnection.append(OspVariableConnection(Variable=[
+        OspVariableEndpoint(simulator='simulator0', name='y0'),
+        OspVariableEndpoint(simulator='simulator1', name='u0')
+    ]))
+    causalities = {
+        f'simulator{i}': {
+            **{f'y{j}': Causality.output for j in range(7)},
+            **{f'u{j}': Causality.input for j in range(100)}
+        } for i in range(1000)
+    }
+    issues = validate_connections(system, causalities=causalities)
+    assert [issue.subject for issue in issues] == [('simulator1', 'u0')]
+
+
+def test_validate_system():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+
+    # The initial values and the groups in the file are not in the model descriptions
+    issues = validate_system(system, model_descriptions)
+    assert {issue.subject for issue in issues} == {
+        ('wheel', 'shaft'), ('chassis', 'shaft'), ('ground', 'contact'),
+        ('chassis', 'C.mChassis'), ('chassis', 'C.kChassis'), ('chassis', 'R.dChassis'),
+        ('wheel', 'C.mWheel'), ('wheel', 'C.kWheel'), ('wheel', 'R.dWheel')
+    }
+
+    # Fix the system with the names in the model descriptions
+    for simulator in system.Simulators:
+        simulator.InitialValues = None
+    system.Connections.VariableGroupConnection = [OspVariableGroupConnection(VariableGroup=[
+        OspVariableEndpoint(simulator='wheel', name='chassis port'),
+        OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+    ])]
+    system.Connections.SignalGroupConnection[0].VariableGroup.name = 'linear mechanical port'
+    assert validate_system(system, model_descriptions) == []
+
+    # All the problems are reported together
+    system.Connections.VariableConnection.append(OspVariableConnection(Variable=[
+        OspVariableEndpoint(simulator='chassis', name='p.x'),
+        OspVariableEndpoint(simulator='boat', name='p.e')
+    ]))
+    system.Connections.VariableGroupConnection[0].VariableGroup[0].name = 'chassis force'
+    system.Connections.VariableGroupConnection[0].VariableGroup[1].name = 'force'
+    issues = validate_system(system, model_descriptions)
+    assert [issue.subject for issue in issues] == [('chassis', 'p.x'), ('boat', 'p.e')]
+    with pytest.raises(ValidationError):
+        validate_system(system, model_descriptions, raise_error=True)
+
+    # The model descriptions are loaded from the directory of the system
+    assert validate_system(system, directory=path_to_test_file_dir) == issues
+    assert validate_system(system) == [issues[1]]
+
+
+def test_validate_causalities():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+    causalities = get_causalities()
+    system.Connections.VariableGroupConnection = [OspVariableGroupConnection(VariableGroup=[
+        OspVariableEndpoint(simulator='wheel', name='chassis port'),
+        OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+    ])]
+    assert validate_causalities(system, causalities, model_descriptions) == []
+
+    # An output to an output and an input to an input
+    system.Connections.VariableConnection[0].Variable[1].name = 'p1.f'
+    system.Connections.VariableConnection[1].Variable[0].name = 'p1.e'
+    # The forces of both the ports of the wheel are connected to each other
+    system.Connections.VariableGroupConnection.append(OspVariableGroupConnection(VariableGroup=[
+        OspVariableEndpoint(simulator='wheel', name='ground port'),
+        OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+    ]))
+    issues = validate_causalities(system, causalities, model_descriptions)
+    assert [issue.subject for issue in issues] == [
+        (('chassis', 'p.e'), ('wheel', 'p1.f')),
+        (('wheel', 'p1.e'), ('chassis', 'p.f')),
+        (('wheel', 'ground port'), ('chassis', 'linear mechanical port')),
+    ]
+    assert 'both outputs' in issues[0].message
+    assert 'both inputs' in issues[1].message
+    assert '#0 (inputs), #1 (outputs)' in issues[2].message
+
+    # The group connections are not checked without the model descriptions
+    assert len(validate_causalities(system, causalities)) == 2
+    with pytest.raises(ValidationError):
+        validate_causalities(system, causalities, raise_error=True)
+
+
+def test_validate_causalities_with_many_connections():
+    number_connections = 100000
+    causalities = {
+        f'simulator{i}': {'y': Causality.output, 'u': Causality.input} for i in range(1000)
+    }
+    system = OspSystemStructure(Connections=OspConnections(VariableConnection=[
+        OspVariableConnection(Variable=[
+            OspVariableEndpoint(simulator=f'simulator{i % 1000}', name='y'),
+            OspVariableEndpoint(simulator=f'simulator{(i + 1) % 1000}', name='u')
+        ]) for i in range(number_connections)
+    ]))
+    system.Connections.VariableConnection[10].Variable[1].name = 'y'
+    issues = validate_causalities(system, causalities)
+    assert [issue.subject for issue in issues] == [(('simulator10', 'y'), ('simulator11', 'y'))]
+
+
+def test_validate_units():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+    system.Connections.VariableGroupConnection = [OspVariableGroupConnection(VariableGroup=[
+        OspVariableEndpoint(simulator='wheel', name='chassis port'),
+        OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+    ])]
+    assert validate_units(system, model_descriptions) == []
+
+    # The velocity of the wheel in km/h
+    wheel = model_descriptions['wheel']
+    wheel.UnitDefinition.add_unit_type(OspUnitType(dict_xml={
+        '@name': 'km/h', 'BaseUnit': {'@m': 1, '@s': -1, '@factor': 1 / 3.6, '@offset': 0.0}
+    }))
+    for variable in get_variables_in_group(wheel.VariableGroups):
+        if variable.ref == 'p1.e':
+            variable.unit = 'km/h'
+    # A force connected to a velocity
+    system.Connections.VariableConnection[1].Variable[1].name = 'p.e'
+    issues = validate_units(system, model_descriptions)
+    assert [issue.subject for issue in issues] == [
+        (('chassis', 'p.e'), ('wheel', 'p1.e')),
+        (('wheel', 'p1.f'), ('chassis', 'p.e')),
+        (('wheel', 'p1.e'), ('chassis', 'p.e')),
+    ]
+    assert issues[0].message == \
+        'The variables "p.e" of "chassis" in m/s and "p1.e" of "wheel" in km/h need a ' \
+        'conversion: p1.e = 3.6 * p.e + 0.'
+    assert 'different dimensions' in issues[1].message
+    with pytest.raises(ValidationError):
+        validate_units(system, model_descriptions, raise_error=True)
+
+
+def test_validate_group_types():
+    system = OspSystemStructure(xml_source=PATH_TO_TEST_SYSTEM_STRUCTURE)
+    model_descriptions = get_model_descriptions()
+    system.Connections.VariableGroupConnection = [
+        OspVariableGroupConnection(VariableGroup=[
+            OspVariableEndpoint(simulator='wheel', name='chassis port'),
+            OspVariableEndpoint(simulator='chassis', name='linear mechanical port')
+        ]),
+        OspVariableGroupConnection(VariableGroup=[
+            OspVariableEndpoint(simulator='wheel', name='ground port'),
+            OspVariableEndpoint(simulator='ground', name='force')
+        ]),
+        OspVariableGroupConnection(VariableGroup=[
+            OspVariableEndpoint(simulator='wheel', name='ground port'),
+            OspVariableEndpoint(simulator='ground', name='no such group')
+        ]),
+    ]
+    issues = validate_group_types(system, model_descriptions)
+    assert issues == [ValidationIssue(
+        subject=(('wheel', 'ground port'), ('ground', 'force')),
+        message='The variable groups "ground port" of "wheel" and "force" of "ground" are of '
+                'different types: LinearMechanicalPort and Force.'
+    )]
+
+    # Move the velocity of the chassis port into its force keeping the number of variables
+    groups = {
+        var_group.name: var_group
+        for var_group in get_variable_groups_in_group(model_descriptions['wheel'].VariableGroups)
+    }
+    groups['chassis force'].Variable.extend(groups['chassisVelocity'].Variable)
+    groups['chassisVelocity'].Variable = []
+    issues = validate_group_types(system, model_descriptions)
+    assert [issue.subject for issue in issues] == [
+        (('wheel', 'chassis port'), ('chassis', 'linear mechanical port')),
+        (('wheel', 'ground port'), ('ground', 'force')),
+    ]
+    assert 'sub groups of different types or sizes' in issues[0].message
+
+    # Remove the velocity of the chassis port
+    groups['chassis force'].Variable.pop()
+    issues = validate_group_types(system, model_descriptions)
+    assert issues[0].message == \
+        'The variable groups "chassis port" of "wheel" and "linear mechanical port" of ' \
+        '"chassis" have different numbers of variables: 1 and 2.'
+    with pytest.raises(ValidationError):
+        validate_group_types(system, model_descriptions, raise_error=True)